@@ -1,3 +1,4 @@
+import logging
 import os
 from threading import Lock
 from typing import Any, List, Optional
@@ -6,6 +7,10 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure
 
+from database.loop_guard import blocking_call_detector
+
+logger = logging.getLogger(__name__)
+
 
 class MongoDBManager:
     """Unified MongoDB connection manager providing both sync and async access."""
@@ -38,9 +43,14 @@ class MongoDBManager:
                 }
 
             # Initialize sync client
+            guard_off = blocking_call_detector.mode == "off"
+            event_listeners = [] if guard_off else [blocking_call_detector]
             try:
                 self._sync_client = MongoClient(
-                    self._mongo_url, serverSelectionTimeoutMS=5000, **tls_kwargs
+                    self._mongo_url,
+                    serverSelectionTimeoutMS=5000,
+                    event_listeners=event_listeners,
+                    **tls_kwargs,
                 )
                 self._sync_client.admin.command("ping")
                 print("Successfully connected to MongoDB")
@@ -60,6 +70,9 @@ class MongoDBManager:
     @property
     def sync_client(self) -> MongoClient:
         """Get synchronous MongoDB client."""
+        if blocking_call_detector.mode == "raise":
+            # Commands cannot be stopped from a listener: refuse the client itself
+            blocking_call_detector.check("sync_client")
         if not self._initialized:
             self.initialize()
         if self._sync_client is None:
@@ -131,12 +144,21 @@ class MongoDBManager:
 # Global instance
 db_manager = MongoDBManager()
 
-# Compatibility exports for existing code
-client = db_manager.sync_client
-db = db_manager.sync_db
-users_collection = db_manager.sync_users
-inventories_collection = db_manager.sync_inventories
-builds_collection = db_manager.sync_builds
+# Compatibility exports for existing code, resolved on first use so that importing
+# this module does not open the sync client
+_COMPATIBILITY_EXPORTS = {
+    "client": "sync_client",
+    "db": "sync_db",
+    "users_collection": "sync_users",
+    "inventories_collection": "sync_inventories",
+    "builds_collection": "sync_builds",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _COMPATIBILITY_EXPORTS:
+        return getattr(db_manager, _COMPATIBILITY_EXPORTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Sync helper functions (from db_helpers.py)
@@ -1,15 +1,26 @@
+import asyncio
+import base64
+import json
 from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple, Union
 
 from bson import ObjectId
+from bson.errors import InvalidId
 from models.builds import BuildCreate, BuildUpdate
 from models.users import UserCreate
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 
-from database.db import (
-    connect_to_mongodb,
-    db_manager,
-    does_value_exists,
-)
+from database.db import db_manager
 from database.dynamic.security import hash_password
+from database.static.catalog import (
+    CATALOG_VERSION_ID,
+    META_COLLECTION,
+    CatalogPayload,
+    build_payload,
+    get_catalog,
+)
+from database.static.repository import get_static_repository
 
 
 async def create_user(user: UserCreate):
@@ -22,6 +33,7 @@ async def create_user(user: UserCreate):
         "username": user.username,
         "hashed_password": hash_password(user.password),
         "role": user.role.value if hasattr(user.role, "value") else user.role,
+        "build_count": 0,
     }
 
     res = await db_manager.users.insert_one(doc)
@@ -33,83 +45,148 @@ async def get_user_by_email(email: str):
     return await db_manager.users.find_one({"email": email})
 
 
-async def create_build(user_id: str, build: BuildCreate):
-    # Check user's existing builds count
-    build_count = await db_manager.builds.count_documents({"user_id": user_id})
-    if build_count >= 30:
-        raise ValueError("Maximum number of builds (30) reached")
-
-    # Validate warframe exists
-    client = connect_to_mongodb()
-    if not client:
-        raise ValueError("Could not connect to static database to validate warframe.")
-
-    if not does_value_exists(
-        client,
-        "cephalon_onni",
-        "warframes",
-        "uniqueName",
-        build.warframe_uniqueName,
-    ):
-        raise ValueError(
-            f"Warframe with uniqueName '{build.warframe_uniqueName}' not found"
+class BuildReferenceError(ValueError):
+    """Raised when a build references static documents that do not exist."""
+
+    def __init__(self, missing: Dict[str, List[str]]):
+        self.missing = missing
+        details = "; ".join(
+            f"{collection}: {', '.join(repr(name) for name in names)}"
+            for collection, names in missing.items()
         )
+        super().__init__(f"Unknown references in build - {details}")
+
+
+def collect_build_references(build: Union[BuildCreate, BuildUpdate]) -> Dict[str, Set[str]]:
+    """Collect every uniqueName referenced by a build, grouped by static collection."""
+    references: Dict[str, Set[str]] = {
+        "warframes": set(),
+        "mods": set(),
+        "arcanes": set(),
+        "weapons": set(),
+    }
+
+    if build.warframe_uniqueName is not None:
+        references["warframes"].add(build.warframe_uniqueName)
+    for mod in build.warframe_mods or []:
+        references["mods"].add(mod.uniqueName)
+    for arcane_name in build.warframe_arcanes or []:
+        references["arcanes"].add(arcane_name)
 
-    # Validate mods exist
-    for mod in build.warframe_mods:
-        if not does_value_exists(
-            client, "cephalon_onni", "mods", "uniqueName", mod.uniqueName
-        ):
-            raise ValueError(f"Mod with uniqueName '{mod.uniqueName}' not found")
-
-    # Validate arcanes exist
-    for arcane_name in build.warframe_arcanes:
-        if not does_value_exists(
-            client, "cephalon_onni", "arcanes", "uniqueName", arcane_name
-        ):
-            raise ValueError(f"Arcane with uniqueName '{arcane_name}' not found")
-
-    # Validate weapons and their mods/arcanes exist
     for weapon_field in [
         build.primary_weapon,
         build.secondary_weapon,
         build.melee_weapon,
     ]:
-        if weapon_field:
-            if not does_value_exists(
-                client,
-                "cephalon_onni",
-                "weapons",
-                "uniqueName",
-                weapon_field.weapon_uniqueName,
-            ):
-                raise ValueError(
-                    f"Weapon with uniqueName '{weapon_field.weapon_uniqueName}' not found"
-                )
-
-            # Validate weapon mods
-            for mod in weapon_field.mods:
-                if not does_value_exists(
-                    client, "cephalon_onni", "mods", "uniqueName", mod.uniqueName
-                ):
-                    raise ValueError(
-                        f"Weapon mod with uniqueName '{mod.uniqueName}' not found"
-                    )
-
-            # Validate weapon arcane
-            if weapon_field.arcane_uniqueName:
-                if not does_value_exists(
-                    client,
-                    "cephalon_onni",
-                    "arcanes",
-                    "uniqueName",
-                    weapon_field.arcane_uniqueName,
-                ):
-                    raise ValueError(
-                        f"Weapon arcane with uniqueName '{weapon_field.arcane_uniqueName}' not found"
-                    )
+        if not weapon_field or not weapon_field.weapon_uniqueName.strip():
+            continue
+        references["weapons"].add(weapon_field.weapon_uniqueName)
+        for mod in weapon_field.mods:
+            references["mods"].add(mod.uniqueName)
+        if weapon_field.arcane_uniqueName:
+            references["arcanes"].add(weapon_field.arcane_uniqueName)
+
+    return references
+
+
+async def validate_build_references(**references: Set[str]) -> None:
+    """
+    Check referenced uniqueNames against the in-memory catalog, or with one
+    $in query per collection when the catalog is not loaded.
+
+    Raises a BuildReferenceError listing every missing reference.
+    """
+    catalog = get_catalog()
+    missing: Dict[str, List[str]] = {}
+    for collection_name, names in references.items():
+        if not names:
+            continue
+        if catalog is not None:
+            not_found = catalog.missing(collection_name, names)
+        else:
+            not_found = await get_static_repository().missing_unique_names(
+                collection_name, names
+            )
+        if not_found:
+            missing[collection_name] = sorted(not_found)
 
-    doc = {
+    if missing:
+        raise BuildReferenceError(missing)
+
+
+MAX_BUILDS_PER_USER = 30
+
+
+async def _init_build_counter(user_id: str) -> None:
+    """Initialize the build counter of a user created before counters existed."""
+    user_oid = ObjectId(user_id)
+    user = await db_manager.users.find_one({"_id": user_oid}, {"build_count": 1})
+    if not user:
+        raise ValueError("User not found")
+    if "build_count" in user:
+        return
+
+    count = await db_manager.builds.count_documents({"user_id": user_id})
+    await db_manager.users.update_one(
+        {"_id": user_oid, "build_count": {"$exists": False}},
+        {"$set": {"build_count": count}},
+    )
+
+
+async def reserve_build_slots(user_id: str, count: int = 1) -> None:
+    """Atomically take build slots from the user's quota counter."""
+    for attempt in range(2):
+        result = await db_manager.users.update_one(
+            {
+                "_id": ObjectId(user_id),
+                "build_count": {"$lte": MAX_BUILDS_PER_USER - count},
+            },
+            {"$inc": {"build_count": count}},
+        )
+        if result.modified_count:
+            return
+        if attempt == 0:
+            # The counter may be missing on older accounts
+            await _init_build_counter(user_id)
+
+    raise ValueError(f"Maximum number of builds ({MAX_BUILDS_PER_USER}) reached")
+
+
+async def release_build_slots(user_id: str, count: int = 1) -> None:
+    """Give build slots back to the user's quota counter."""
+    await db_manager.users.update_one(
+        {"_id": ObjectId(user_id), "build_count": {"$gte": count}},
+        {"$inc": {"build_count": -count}},
+    )
+
+
+async def reconcile_build_counters() -> int:
+    """
+    Repair job: reset every user's build counter to their actual number of builds.
+
+    Returns the number of users whose counter was corrected.
+    """
+    counts: Dict[str, int] = {}
+    async for row in db_manager.builds.aggregate(
+        [{"$group": {"_id": "$user_id", "count": {"$sum": 1}}}]
+    ):
+        counts[row["_id"]] = row["count"]
+
+    ops = []
+    async for user in db_manager.users.find({}, {"build_count": 1}):
+        expected = counts.get(str(user["_id"]), 0)
+        if user.get("build_count") != expected:
+            ops.append(
+                UpdateOne({"_id": user["_id"]}, {"$set": {"build_count": expected}})
+            )
+
+    if ops:
+        await db_manager.users.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+def _build_document(user_id: str, build: BuildCreate) -> dict:
+    return {
         "name": build.name,
         "warframe_uniqueName": build.warframe_uniqueName,
         "warframe_mods": [mod.dict() for mod in build.warframe_mods],
@@ -124,165 +201,461 @@ async def create_build(user_id: str, build: BuildCreate):
         "updated_at": datetime.now(),
     }
 
-    res = await db_manager.builds.insert_one(doc)
+
+async def create_build(user_id: str, build: BuildCreate):
+    # Validate every referenced static document at once
+    await validate_build_references(**collect_build_references(build))
+
+    doc = _build_document(user_id, build)
+    doc["snapshot"] = await resolve_build_snapshot(doc)
+
+    # Take a slot from the quota counter, and give it back if the insert fails
+    await reserve_build_slots(user_id)
+    try:
+        res = await db_manager.builds.insert_one(doc)
+    except Exception:
+        await release_build_slots(user_id)
+        raise
+
     doc["_id"] = res.inserted_id
     print(f"DEBUG: Inserted build with user_id: {user_id}, _id: {res.inserted_id}")
     return doc
 
 
-async def get_user_builds(
-    user_id: str,
-    skip: int = 0,
-    limit: int = 30,
-    include_warframe_details: bool = False,
-):
-    print(f"DEBUG: Querying builds for user_id: {user_id}")
+async def import_builds(user_id: str, builds: List[BuildCreate]) -> List[ObjectId]:
+    """
+    Insert a batch of builds at once.
 
-    # Debug: Check all builds in database
-    total_builds = await db_manager.builds.count_documents({})
-    print(f"DEBUG: Total builds in database: {total_builds}")
+    References of the whole batch are validated with one query per collection, the
+    quota is reserved for the whole batch, then every build is written by one
+    insert_many.
+    """
+    if not builds:
+        return []
 
-    # Debug: Check builds for this specific user
-    user_build_count = await db_manager.builds.count_documents({"user_id": user_id})
-    print(f"DEBUG: Builds for user {user_id}: {user_build_count}")
+    references: Dict[str, Set[str]] = {}
+    for build in builds:
+        for collection_name, names in collect_build_references(build).items():
+            references.setdefault(collection_name, set()).update(names)
+    await validate_build_references(**references)
 
-    cursor = (
-        db_manager.builds.find({"user_id": user_id})
-        .sort("created_at", -1)
-        .skip(skip)
-        .limit(limit)
-    )
-    builds = []
-    mongo_client = connect_to_mongodb() if include_warframe_details else None
+    docs = [_build_document(user_id, build) for build in builds]
+    for doc, snapshot in zip(docs, await resolve_build_snapshots(docs)):
+        doc["snapshot"] = snapshot
 
-    build_count = 0
+    await reserve_build_slots(user_id, len(docs))
+    try:
+        res = await db_manager.builds.insert_many(docs, ordered=True)
+    except BulkWriteError as e:
+        # Ordered inserts stop at the first failure: release the slots not used
+        await release_build_slots(user_id, len(docs) - e.details.get("nInserted", 0))
+        raise
+    except Exception:
+        await release_build_slots(user_id, len(docs))
+        raise
+
+    return res.inserted_ids
+
+
+EXPORT_FIELDS = [
+    "name",
+    "warframe_uniqueName",
+    "warframe_mods",
+    "warframe_arcanes",
+    "primary_weapon",
+    "secondary_weapon",
+    "melee_weapon",
+    "created_at",
+    "updated_at",
+]
+
+
+async def export_builds(user_id: str) -> AsyncIterator[dict]:
+    """Stream a user's builds, oldest first, straight from the database cursor."""
+    cursor = db_manager.builds.find(
+        {"user_id": user_id}, {"_id": 0, **{field: 1 for field in EXPORT_FIELDS}}
+    ).sort([("created_at", 1), ("_id", 1)])
     async for build in cursor:
-        build_count += 1
-        build_dict = dict(build)
-
-        # Convert string lists and nested objects to match model structure
-        if "warframe_mods" not in build_dict:
-            build_dict["warframe_mods"] = []
-        if "warframe_arcanes" not in build_dict:
-            build_dict["warframe_arcanes"] = []
-        if "primary_weapon" not in build_dict:
-            build_dict["primary_weapon"] = None
-        if "secondary_weapon" not in build_dict:
-            build_dict["secondary_weapon"] = None
-        if "melee_weapon" not in build_dict:
-            build_dict["melee_weapon"] = None
-
-        if include_warframe_details and mongo_client:
-            db = mongo_client["cephalon_onni"]
-            warframes_collection = db["warframes"]
-            abilities_collection = db["warframe_abilities"]
-            warframe = warframes_collection.find_one(
-                {"uniqueName": build["warframe_uniqueName"]}
+        yield build
+
+
+ABILITY_PROJECTION = {
+    "_id": 0,
+    "abilityUniqueName": 1,
+    "abilityName": 1,
+    "description": 1,
+}
+
+
+async def fetch_static_documents(
+    references: Dict[str, Set[str]],
+) -> Dict[str, Dict[str, dict]]:
+    """
+    Resolve uniqueNames per static collection, keyed by uniqueName.
+
+    Reads the in-memory catalog when it is loaded, otherwise runs one $in query
+    per collection, concurrently.
+    """
+    catalog = get_catalog()
+    if catalog is not None:
+        documents: Dict[str, Dict[str, dict]] = {}
+        for collection_name, names in references.items():
+            documents[collection_name] = {}
+            for name in names:
+                doc = catalog.get(collection_name, name)
+                if doc is not None:
+                    documents[collection_name][name] = doc
+        return documents
+
+    repository = get_static_repository()
+    collection_names = [name for name, names in references.items() if names]
+    results = await asyncio.gather(
+        *(
+            repository.find_by_unique_names(name, references[name])
+            for name in collection_names
+        )
+    )
+    documents = {name: {} for name in references}
+    documents.update(zip(collection_names, results))
+    return documents
+
+
+async def fetch_warframe_abilities(
+    warframe_unique_names: Set[str],
+) -> Dict[str, List[dict]]:
+    """Get the abilities of several warframes at once, keyed by warframe uniqueName."""
+    if not warframe_unique_names:
+        return {}
+
+    catalog = get_catalog()
+    if catalog is not None:
+        return {name: catalog.abilities(name) for name in warframe_unique_names}
+
+    abilities: Dict[str, List[dict]] = {name: [] for name in warframe_unique_names}
+    for ability in await get_static_repository().find(
+        "warframe_abilities",
+        {"warframe_uniqueName": {"$in": list(warframe_unique_names)}},
+        {**ABILITY_PROJECTION, "warframe_uniqueName": 1},
+    ):
+        abilities[ability.pop("warframe_uniqueName")].append(ability)
+    return abilities
+
+
+def _warframe_details(
+    unique_name: str,
+    warframes: Dict[str, dict],
+    abilities: Dict[str, List[dict]],
+) -> Optional[dict]:
+    """Build the warframe details of a build, or None if it is missing or invalid."""
+    warframe = warframes.get(unique_name)
+    # Only include warframe if found and valid
+    if not warframe or not warframe.get("name"):
+        return None
+
+    warframe = dict(warframe)
+    warframe["abilities"] = list(abilities.get(unique_name, []))
+    return warframe
+
+
+def _static_details(doc: Optional[dict]) -> Optional[dict]:
+    """Copy a static document for embedding in a build, without its own _id."""
+    if doc is None:
+        return None
+    return {key: value for key, value in doc.items() if key != "_id"}
+
+
+async def current_catalog_version() -> Optional[str]:
+    """Version of the static data, from the loaded catalog or the stamp left by db_init."""
+    catalog = get_catalog()
+    if catalog is not None:
+        return catalog.version
+
+    meta = await get_static_repository().find_one(
+        META_COLLECTION, {"_id": CATALOG_VERSION_ID}
+    )
+    return meta.get("version") if meta else None
+
+
+def _snapshot_references(build: dict) -> Dict[str, Set[str]]:
+    """The static documents a build snapshot embeds, per collection."""
+    weapons = [
+        build[f"{slot}_weapon"]
+        for slot in ["primary", "secondary", "melee"]
+        if build.get(f"{slot}_weapon")
+    ]
+    arcane_names = set(build.get("warframe_arcanes", []))
+    arcane_names.update(
+        weapon["arcane_uniqueName"] for weapon in weapons if weapon["arcane_uniqueName"]
+    )
+    return {
+        "warframes": {build["warframe_uniqueName"]},
+        "weapons": {weapon["weapon_uniqueName"] for weapon in weapons},
+        "arcanes": arcane_names,
+    }
+
+
+async def resolve_build_snapshots(builds: List[dict]) -> List[dict]:
+    """
+    Resolve the warframe, weapon and arcane details of builds, using a constant number
+    of queries for the whole batch, into snapshots tagged with the catalog version they
+    were built from.
+    """
+    references: Dict[str, Set[str]] = {
+        "warframes": set(),
+        "weapons": set(),
+        "arcanes": set(),
+    }
+    for build in builds:
+        for collection_name, names in _snapshot_references(build).items():
+            references[collection_name].update(names)
+
+    version, documents, abilities = await asyncio.gather(
+        current_catalog_version(),
+        fetch_static_documents(references),
+        fetch_warframe_abilities(references["warframes"]),
+    )
+    return [_build_snapshot(build, version, documents, abilities) for build in builds]
+
+
+async def resolve_build_snapshot(build: dict) -> dict:
+    """The snapshot of a single build, see resolve_build_snapshots."""
+    return (await resolve_build_snapshots([build]))[0]
+
+
+def _build_snapshot(
+    build: dict,
+    version: Optional[str],
+    documents: Dict[str, Dict[str, dict]],
+    abilities: Dict[str, List[dict]],
+) -> dict:
+    snapshot: Dict[str, Any] = {
+        "catalog_version": version,
+        "warframe": _static_details(
+            _warframe_details(
+                build["warframe_uniqueName"], documents["warframes"], abilities
             )
-            # Only include warframe if found and valid, with field name mapping
-            if warframe and warframe.get("name"):
-                # Fetch abilities for this warframe
-                abilities = list(
-                    abilities_collection.find(
-                        {"warframe_uniqueName": build["warframe_uniqueName"]},
-                        {
-                            "_id": 0,
-                            "abilityUniqueName": 1,
-                            "abilityName": 1,
-                            "description": 1,
-                        },
-                    )
-                )
-                # Transform database field names to match the model
-                warframe["abilities"] = abilities
-                build_dict["warframe"] = warframe
-            else:
-                build_dict["warframe"] = None
-        builds.append(build_dict)
+        ),
+    }
 
-    print(f"DEBUG: Found {build_count} builds total in database")
-    return builds
+    # Get weapon details
+    for slot in ["primary", "secondary", "melee"]:
+        weapon = build.get(f"{slot}_weapon")
+        if not weapon:
+            continue
+        snapshot[f"{slot}_weapon_details"] = _static_details(
+            documents["weapons"].get(weapon["weapon_uniqueName"])
+        )
+        if weapon["arcane_uniqueName"]:
+            snapshot[f"{slot}_arcane_details"] = _static_details(
+                documents["arcanes"].get(weapon["arcane_uniqueName"])
+            )
 
+    # Get arcane details
+    snapshot["warframe_arcanes_details"] = [
+        _static_details(documents["arcanes"][arcane_name])
+        for arcane_name in build.get("warframe_arcanes", [])
+        if arcane_name in documents["arcanes"]
+    ]
+    return snapshot
+
+
+def apply_build_snapshot(build: dict, snapshot: dict) -> dict:
+    """Expose the details held by a snapshot as top-level fields of the build."""
+    for key, value in snapshot.items():
+        if key != "catalog_version":
+            build[key] = value
+    return build
+
+
+async def refresh_build_snapshot(build: dict) -> dict:
+    """
+    Rebuild the snapshot of a build and apply it to the build. It is stored only when
+    the catalog version is known: an unversioned snapshot could never be reused.
+    """
+    snapshot = await resolve_build_snapshot(build)
+    if snapshot["catalog_version"] is not None:
+        # Only store it if the build was not modified meanwhile
+        await db_manager.builds.update_one(
+            {"_id": build["_id"], "updated_at": build.get("updated_at")},
+            {"$set": {"snapshot": snapshot}},
+        )
+    build["snapshot"] = snapshot
+    return apply_build_snapshot(build, snapshot)
 
-async def get_available_warframes():
-    """Get all available warframes for build creation"""
-    mongo_client = connect_to_mongodb()
-    if not mongo_client:
-        raise ValueError("Could not connect to static database")
 
-    db = mongo_client["cephalon_onni"]
-    warframes_collection = db["warframes"]
+async def enrich_build_details(build: dict) -> dict:
+    """
+    Attach warframe, weapon and arcane details to a build.
+
+    Uses the stored snapshot when it matches the current catalog version, and rebuilds
+    it otherwise (missing, or static data reloaded by db_init since it was taken).
+    """
+    snapshot = build.get("snapshot")
+    if snapshot:
+        version = await current_catalog_version()
+        if version is not None and snapshot.get("catalog_version") == version:
+            return apply_build_snapshot(build, snapshot)
+
+    return await refresh_build_snapshot(build)
 
-    warframes = list(
-        warframes_collection.find(
-            {}, {"_id": 0, "uniqueName": 1, "name": 1, "masteryReq": 1}
+
+async def enrich_build_listing(builds: List[dict]) -> List[dict]:
+    """Attach warframe details to a page of builds with one query per collection."""
+    warframe_names = {build["warframe_uniqueName"] for build in builds}
+    documents, abilities = await asyncio.gather(
+        fetch_static_documents({"warframes": warframe_names}),
+        fetch_warframe_abilities(warframe_names),
+    )
+
+    for build in builds:
+        build["warframe"] = _warframe_details(
+            build["warframe_uniqueName"], documents["warframes"], abilities
         )
+    return builds
+
+
+async def get_available_documents(
+    collection_name: str, fields: List[str]
+) -> List[dict]:
+    """List every document of a static collection, reduced to the given fields."""
+    catalog = get_catalog()
+    if catalog is not None:
+        return catalog.project(collection_name, fields)
+
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    return await get_static_repository().find(collection_name, {}, projection)
+
+
+def _normalize_build(build: dict) -> dict:
+    # Convert string lists and nested objects to match model structure
+    if "warframe_mods" not in build:
+        build["warframe_mods"] = []
+    if "warframe_arcanes" not in build:
+        build["warframe_arcanes"] = []
+    if "primary_weapon" not in build:
+        build["primary_weapon"] = None
+    if "secondary_weapon" not in build:
+        build["secondary_weapon"] = None
+    if "melee_weapon" not in build:
+        build["melee_weapon"] = None
+    return build
+
+
+def encode_build_cursor(build: dict) -> str:
+    """Encode the (created_at, _id) keyset position of a build as an opaque token."""
+    payload = json.dumps(
+        {"created_at": build["created_at"].isoformat(), "id": str(build["_id"])}
     )
-    return warframes
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
 
 
-async def get_available_weapons():
-    """Get all available weapons for build creation"""
-    mongo_client = connect_to_mongodb()
-    if not mongo_client:
-        raise ValueError("Could not connect to static database")
+def decode_build_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by encode_build_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["created_at"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+async def ensure_build_indexes():
+    """Create the index backing keyset pagination of a user's builds."""
+    await db_manager.builds.create_index(
+        [("user_id", 1), ("created_at", -1), ("_id", -1)],
+        name="user_id_created_at_id",
+    )
 
-    db = mongo_client["cephalon_onni"]
-    weapons_collection = db["weapons"]
 
-    weapons = list(
-        weapons_collection.find(
-            {},
-            {
-                "_id": 0,
-                "uniqueName": 1,
-                "name": 1,
-                "masteryReq": 1,
-                "productCategory": 1,
-            },
-        )
+async def get_user_builds(
+    user_id: str,
+    cursor: Optional[str] = None,
+    limit: int = 30,
+    include_warframe_details: bool = False,
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Get a page of a user's builds, newest first.
+
+    Returns the builds and the cursor of the next page (None on the last page).
+    """
+    limit = max(1, min(limit, 100))
+
+    query: Dict[str, Any] = {"user_id": user_id}
+    if cursor:
+        created_at, last_id = decode_build_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+        ]
+
+    # Fetch one extra build to know whether another page follows
+    documents = (
+        db_manager.builds.find(query, {"snapshot": 0})
+        .sort([("created_at", -1), ("_id", -1)])
+        .limit(limit + 1)
     )
-    return weapons
+    builds = [_normalize_build(dict(build)) async for build in documents]
 
+    next_cursor = None
+    if len(builds) > limit:
+        builds = builds[:limit]
+        next_cursor = encode_build_cursor(builds[-1])
 
-async def get_available_mods():
-    """Get all available mods for build creation"""
-    mongo_client = connect_to_mongodb()
-    if not mongo_client:
-        raise ValueError("Could not connect to static database")
+    if include_warframe_details and builds:
+        await enrich_build_listing(builds)
 
-    db = mongo_client["cephalon_onni"]
-    mods_collection = db["mods"]
+    return builds, next_cursor
 
-    mods = list(
-        mods_collection.find(
-            {},
-            {
-                "_id": 0,
-                "uniqueName": 1,
-                "name": 1,
-                "type": 1,
-                "rarity": 1,
-                "polarity": 1,
-            },
-        )
+
+# Payloads built while the catalog is not loaded, per (collection, fields), with the
+# catalog version they were built from
+_available_payloads: Dict[Tuple[str, Tuple[str, ...]], Tuple[str, CatalogPayload]] = {}
+
+
+async def get_available_payload(
+    collection_name: str, fields: List[str]
+) -> CatalogPayload:
+    """Serialized list of a static collection, cached per catalog version when loaded."""
+    catalog = get_catalog()
+    if catalog is not None:
+        return catalog.payload(collection_name, fields)
+
+    key = (collection_name, tuple(fields))
+    version = await current_catalog_version()
+    cached = _available_payloads.get(key)
+    if version is not None and cached is not None and cached[0] == version:
+        return cached[1]
+
+    payload = build_payload(await get_available_documents(collection_name, fields))
+    if version is not None:
+        _available_payloads[key] = (version, payload)
+    return payload
+
+
+async def get_available_warframes() -> CatalogPayload:
+    """Get all available warframes for build creation"""
+    return await get_available_payload(
+        "warframes", ["uniqueName", "name", "masteryReq"]
     )
-    return mods
 
 
-async def get_available_arcanes():
-    """Get all available arcanes for build creation"""
-    mongo_client = connect_to_mongodb()
-    if not mongo_client:
-        raise ValueError("Could not connect to static database")
+async def get_available_weapons() -> CatalogPayload:
+    """Get all available weapons for build creation"""
+    return await get_available_payload(
+        "weapons", ["uniqueName", "name", "masteryReq", "productCategory"]
+    )
 
-    db = mongo_client["cephalon_onni"]
-    arcanes_collection = db["arcanes"]
 
-    arcanes = list(
-        arcanes_collection.find({}, {"_id": 0, "uniqueName": 1, "name": 1, "rarity": 1})
+async def get_available_mods() -> CatalogPayload:
+    """Get all available mods for build creation"""
+    return await get_available_payload(
+        "mods", ["uniqueName", "name", "type", "rarity", "polarity"]
     )
-    return arcanes
+
+
+async def get_available_arcanes() -> CatalogPayload:
+    """Get all available arcanes for build creation"""
+    return await get_available_payload("arcanes", ["uniqueName", "name", "rarity"])
 
 
 async def get_build_by_id(
@@ -296,89 +669,9 @@ async def get_build_by_id(
         if not build:
             return None
 
-        # Convert string lists and nested objects to match model structure
-        if "warframe_mods" not in build:
-            build["warframe_mods"] = []
-        if "warframe_arcanes" not in build:
-            build["warframe_arcanes"] = []
-        if "primary_weapon" not in build:
-            build["primary_weapon"] = None
-        if "secondary_weapon" not in build:
-            build["secondary_weapon"] = None
-        if "melee_weapon" not in build:
-            build["melee_weapon"] = None
-
+        _normalize_build(build)
         if include_warframe_details:
-            mongo_client = connect_to_mongodb()
-            if not mongo_client:
-                raise ValueError(
-                    "Could not connect to static database to validate warframe."
-                )
-
-            db = mongo_client["cephalon_onni"]
-
-            # Get warframe details
-            warframes_collection = db["warframes"]
-            abilities_collection = db["warframe_abilities"]
-            warframe = warframes_collection.find_one(
-                {"uniqueName": build["warframe_uniqueName"]}
-            )
-            if warframe and warframe.get("name"):
-                abilities = list(
-                    abilities_collection.find(
-                        {"warframe_uniqueName": build["warframe_uniqueName"]},
-                        {
-                            "_id": 0,
-                            "abilityUniqueName": 1,
-                            "abilityName": 1,
-                            "description": 1,
-                        },
-                    )
-                )
-                warframe["abilities"] = abilities
-                build["warframe"] = warframe
-            else:
-                build["warframe"] = None
-
-            # Get weapon details
-            weapons_collection = db["weapons"]
-            if build["primary_weapon"]:
-                build["primary_weapon_details"] = weapons_collection.find_one(
-                    {"uniqueName": build["primary_weapon"]["weapon_uniqueName"]}
-                )
-                if build["primary_weapon"]["arcane_uniqueName"]:
-                    arcanes_collection = db["arcanes"]
-                    build["primary_arcane_details"] = arcanes_collection.find_one(
-                        {"uniqueName": build["primary_weapon"]["arcane_uniqueName"]}
-                    )
-
-            if build["secondary_weapon"]:
-                build["secondary_weapon_details"] = weapons_collection.find_one(
-                    {"uniqueName": build["secondary_weapon"]["weapon_uniqueName"]}
-                )
-                if build["secondary_weapon"]["arcane_uniqueName"]:
-                    arcanes_collection = db["arcanes"]
-                    build["secondary_arcane_details"] = arcanes_collection.find_one(
-                        {"uniqueName": build["secondary_weapon"]["arcane_uniqueName"]}
-                    )
-
-            if build["melee_weapon"]:
-                build["melee_weapon_details"] = weapons_collection.find_one(
-                    {"uniqueName": build["melee_weapon"]["weapon_uniqueName"]}
-                )
-                if build["melee_weapon"]["arcane_uniqueName"]:
-                    arcanes_collection = db["arcanes"]
-                    build["melee_arcane_details"] = arcanes_collection.find_one(
-                        {"uniqueName": build["melee_weapon"]["arcane_uniqueName"]}
-                    )
-
-            # Get arcane details
-            arcanes_collection = db["arcanes"]
-            build["warframe_arcanes_details"] = []
-            for arcane_name in build.get("warframe_arcanes", []):
-                arcane = arcanes_collection.find_one({"uniqueName": arcane_name})
-                if arcane:
-                    build["warframe_arcanes_details"].append(arcane)
+            await enrich_build_details(build)
 
         return build
     except:
@@ -387,56 +680,21 @@ async def get_build_by_id(
 
 async def update_build(build_id: str, user_id: str, build_update: BuildUpdate):
     update_data = {}
-    client = connect_to_mongodb()
 
     if build_update.name is not None:
         update_data["name"] = build_update.name
 
     if build_update.warframe_uniqueName is not None:
-        if not client:
-            raise ValueError(
-                "Could not connect to static database to validate warframe."
-            )
-
-        if not does_value_exists(
-            client,
-            "cephalon_onni",
-            "warframes",
-            "uniqueName",
-            build_update.warframe_uniqueName,
-        ):
-            raise ValueError(
-                f"Warframe with uniqueName '{build_update.warframe_uniqueName}' not found"
-            )
         update_data["warframe_uniqueName"] = build_update.warframe_uniqueName
 
     if build_update.warframe_mods is not None:
-        if not client:
-            raise ValueError("Could not connect to static database to validate mods.")
-
-        for mod in build_update.warframe_mods:
-            if not does_value_exists(
-                client, "cephalon_onni", "mods", "uniqueName", mod.uniqueName
-            ):
-                raise ValueError(f"Mod with uniqueName '{mod.uniqueName}' not found")
         update_data["warframe_mods"] = [
             mod.dict() for mod in build_update.warframe_mods
         ]
 
     if build_update.warframe_arcanes is not None:
-        if not client:
-            raise ValueError(
-                "Could not connect to static database to validate arcanes."
-            )
-
-        for arcane_name in build_update.warframe_arcanes:
-            if not does_value_exists(
-                client, "cephalon_onni", "arcanes", "uniqueName", arcane_name
-            ):
-                raise ValueError(f"Arcane with uniqueName '{arcane_name}' not found")
         update_data["warframe_arcanes"] = build_update.warframe_arcanes
 
-    # Validate weapons
     for weapon_field, weapon_key in [
         (build_update.primary_weapon, "primary_weapon"),
         (build_update.secondary_weapon, "secondary_weapon"),
@@ -447,50 +705,29 @@ async def update_build(build_id: str, user_id: str, build_update: BuildUpdate):
             if not weapon_field.weapon_uniqueName or weapon_field.weapon_uniqueName.strip() == "":
                 update_data[weapon_key] = None
             else:
-                if not client:
-                    raise ValueError(
-                        "Could not connect to static database to validate weapons."
-                    )
-
-                if not does_value_exists(
-                    client,
-                    "cephalon_onni",
-                    "weapons",
-                    "uniqueName",
-                    weapon_field.weapon_uniqueName,
-                ):
-                    raise ValueError(
-                        f"Weapon with uniqueName '{weapon_field.weapon_uniqueName}' not found"
-                    )
-
-                for mod in weapon_field.mods:
-                    if not does_value_exists(
-                        client, "cephalon_onni", "mods", "uniqueName", mod.uniqueName
-                    ):
-                        raise ValueError(
-                            f"Weapon mod with uniqueName '{mod.uniqueName}' not found"
-                        )
-
-                if weapon_field.arcane_uniqueName and not does_value_exists(
-                    client,
-                    "cephalon_onni",
-                    "arcanes",
-                    "uniqueName",
-                    weapon_field.arcane_uniqueName,
-                ):
-                    raise ValueError(
-                        f"Weapon arcane with uniqueName '{weapon_field.arcane_uniqueName}' not found"
-                    )
-
                 update_data[weapon_key] = weapon_field.dict()
 
-    if update_data:
-        update_data["updated_at"] = datetime.now()
-        await db_manager.builds.update_one(
-            {"_id": ObjectId(build_id), "user_id": user_id}, {"$set": update_data}
+    # Validate every referenced static document at once
+    await validate_build_references(**collect_build_references(build_update))
+
+    if not update_data:
+        return await get_build_by_id(build_id, user_id, include_warframe_details=True)
+
+    update_data["updated_at"] = datetime.now()
+    try:
+        build = await db_manager.builds.find_one_and_update(
+            {"_id": ObjectId(build_id), "user_id": user_id},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
         )
+    except InvalidId:
+        return None
+
+    if not build:
+        return None
 
-    return await get_build_by_id(build_id, user_id)
+    # Rebuild the snapshot from the updated build, and return the build enriched with it
+    return await refresh_build_snapshot(_normalize_build(build))
 
 
 async def delete_build(build_id: str, user_id: str):
@@ -498,6 +735,9 @@ async def delete_build(build_id: str, user_id: str):
         result = await db_manager.builds.delete_one(
             {"_id": ObjectId(build_id), "user_id": user_id}
         )
-        return result.deleted_count > 0
+        if result.deleted_count == 0:
+            return False
+        await release_build_slots(user_id)
+        return True
     except:
         return False
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import os
+import traceback
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# "warn" logs synchronous pymongo calls issued from the event loop, "raise" refuses them
+# (meant for tests and CI), "off" disables the check
+MONGO_LOOP_GUARD = os.getenv("MONGO_LOOP_GUARD", "warn").lower()
+
+
+class BlockingCallError(RuntimeError):
+    """A synchronous pymongo call was made on an asyncio event loop thread."""
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Not on an event loop thread (scripts, executors, Motor worker threads)
+        return False
+    return True
+
+
+class BlockingCallDetector(monitoring.CommandListener):
+    """Detects synchronous pymongo commands running on an asyncio event loop thread."""
+
+    def __init__(self, mode: str = MONGO_LOOP_GUARD):
+        self.mode = mode
+        self.violations = 0
+
+    def check(self, operation: str) -> None:
+        """Count a blocking call made on the event loop; refuse it in "raise" mode."""
+        if self.mode == "off" or not on_event_loop():
+            return
+
+        self.violations += 1
+        message = (
+            f"Blocking pymongo '{operation}' on the event loop "
+            f"(use the Motor client instead)"
+        )
+        if self.mode == "raise":
+            raise BlockingCallError(message)
+        stack = "".join(traceback.format_stack(limit=8)[:-2])
+        logger.warning(f"{message}:\n{stack}")
+
+    def started(self, event):
+        try:
+            self.check(event.command_name)
+        except BlockingCallError as e:
+            # pymongo swallows listener exceptions, so the command still runs: only
+            # calls through MongoDBManager.sync_client are refused before being sent
+            logger.error(str(e))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+blocking_call_detector = BlockingCallDetector()
@@ -0,0 +1,240 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from psycopg import AsyncConnection
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+
+from database.static.age_helper import (
+    GRAPH_INDEXES_SQL,
+    GRAPH_LABELS_SQL,
+    GRAPH_STATS_ADJUST_SQL,
+    GRAPH_STATS_SQL,
+    GRAPH_STATS_TABLE_SQL,
+    PREPARED_CACHE_SIZE,
+    VERTEX_LABELS_SQL,
+    check_cypher_shape,
+    graph_stats_model,
+    graph_stats_refresh_statements,
+    match_cypher,
+    merge_node_cypher,
+    merge_relationship_cypher,
+    name_index_report,
+    name_index_statements,
+    search_result_node,
+    search_vertex_result,
+    search_vertices_sql,
+    validate_identifier,
+)
+from models.age_models import GraphNode, GraphStats
+
+logger = logging.getLogger(__name__)
+
+AGE_POOL_MIN_SIZE = int(os.getenv("AGE_POOL_MIN_SIZE", "2"))
+AGE_POOL_MAX_SIZE = int(os.getenv("AGE_POOL_MAX_SIZE", "10"))
+AGE_POOL_TIMEOUT = float(os.getenv("AGE_POOL_TIMEOUT", "5"))
+
+
+async def setup_async_age_session(conn: AsyncConnection) -> None:
+    """Per-session AGE setup, run once on every connection the pool opens."""
+    await conn.execute("CREATE EXTENSION IF NOT EXISTS age")
+    await conn.execute("LOAD 'age'")
+    await conn.execute("SET search_path = ag_catalog, public")
+    conn.prepared_max = PREPARED_CACHE_SIZE
+
+
+def create_async_age_pool(
+    min_size: int = AGE_POOL_MIN_SIZE,
+    max_size: int = AGE_POOL_MAX_SIZE,
+    timeout: float = AGE_POOL_TIMEOUT,
+) -> AsyncConnectionPool:
+    """A closed pool of async AGE sessions; open it with `await pool.open()`."""
+    conninfo = make_conninfo(
+        user=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        dbname=os.getenv("POSTGRES_DB"),
+        host=os.getenv("POSTGRES_HOST"),
+        port=os.getenv("POSTGRES_PORT"),
+    )
+    return AsyncConnectionPool(
+        conninfo,
+        min_size=min(min_size, max_size),
+        max_size=max_size,
+        timeout=timeout,
+        kwargs={"autocommit": True, "row_factory": dict_row},
+        configure=setup_async_age_session,
+        check=AsyncConnectionPool.check_connection,
+        name="age",
+        open=False,
+    )
+
+
+class AsyncAgeDB:
+    """
+    AgeDB's query methods on an async psycopg connection, so graph queries wait on
+    the event loop instead of blocking the worker.
+
+    Parameters are bound server-side, and psycopg keeps the statements of repeated
+    query shapes prepared on the connection.
+    """
+
+    def __init__(self, conn: AsyncConnection):
+        self.conn = conn
+
+    async def _fetch(
+        self, query: str, params: Optional[Any] = None, prepare: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        async with self.conn.cursor() as cur:
+            await cur.execute(query, params, prepare=prepare)
+            return await cur.fetchall() if cur.description else []
+
+    def transaction(self) -> Any:
+        """`async with age.transaction():` runs the queries inside as one."""
+        return self.conn.transaction()
+
+    # ------------------------------------------------------------------
+    # Cypher execution
+    # ------------------------------------------------------------------
+
+    async def cypher(
+        self,
+        graph: str,
+        query: str,
+        columns: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Execute a Cypher query, with the same arguments as AgeDB.cypher."""
+        validate_identifier(graph, "graph name")
+        check_cypher_shape(query, columns)
+        if params is None:
+            statement = f"SELECT * FROM cypher('{graph}', $$ {query} $$) AS ({columns})"
+            return await self._fetch(statement, prepare=False)
+
+        # Only the parameters placeholder may be read as one
+        query = query.replace("%", "%%")
+        statement = f"SELECT * FROM cypher('{graph}', $$ {query} $$, %s) AS ({columns})"
+        return await self._fetch(statement, (json.dumps(params),), prepare=True)
+
+    # ------------------------------------------------------------------
+    # Convenience helpers
+    # ------------------------------------------------------------------
+
+    async def create_node(
+        self,
+        graph: str,
+        label: str,
+        properties: Dict[str, Any],
+        return_node: bool = False,
+    ):
+        cypher, params = merge_node_cypher(label, properties, return_node)
+        await self.cypher(graph, cypher, "_ agtype", params)
+
+    async def create_relationship(
+        self,
+        graph: str,
+        from_label: str,
+        from_match: dict,
+        rel_type: str,
+        to_label: str,
+        to_match: dict,
+        rel_props: dict | None = None,
+    ) -> None:
+        cypher, params = merge_relationship_cypher(
+            from_label, from_match, rel_type, to_label, to_match, rel_props
+        )
+        await self.cypher(graph, cypher, "_ agtype", params)
+
+    async def get_node(self, graph: str, node_name: str) -> GraphNode:
+        results = await self.search_vertices(graph, node_name, limit=1)
+        return search_result_node(results[0])
+
+    async def match(
+        self,
+        graph: str,
+        label: str,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        cypher, params = match_cypher(label, filters, limit)
+        return await self.cypher(graph, cypher, "n agtype", params)
+
+    async def graph_exists(self, graph_name: str) -> bool:
+        rows = await self._fetch(
+            "SELECT 1 FROM ag_catalog.ag_graph WHERE name = %s", (graph_name,)
+        )
+        return bool(rows)
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    async def ensure_graph_stats_table(self) -> None:
+        await self.conn.execute(GRAPH_STATS_TABLE_SQL)
+
+    async def graph_stats(self, graph: str) -> GraphStats:
+        return graph_stats_model(await self._fetch(GRAPH_STATS_SQL, (graph,)))
+
+    async def refresh_graph_stats(self, graph: str) -> GraphStats:
+        async with self.transaction():
+            await self.ensure_graph_stats_table()
+            labels = await self._fetch(GRAPH_LABELS_SQL, (graph,))
+            for statement, params in graph_stats_refresh_statements(graph, labels):
+                await self.conn.execute(statement, params)
+        return await self.graph_stats(graph)
+
+    async def adjust_graph_stats(
+        self, graph: str, label: str, kind: str, delta: int
+    ) -> None:
+        """Add delta to the count of a vertex ('v') or edge ('e') label."""
+        if delta:
+            params = {"graph": graph, "label": label, "kind": kind, "delta": delta}
+            await self.conn.execute(GRAPH_STATS_ADJUST_SQL, params)
+
+    # ------------------------------------------------------------------
+    # Name indexes
+    # ------------------------------------------------------------------
+
+    async def vertex_labels(self, graph: str) -> List[str]:
+        return [row["name"] for row in await self._fetch(VERTEX_LABELS_SQL, (graph,))]
+
+    async def list_name_indexes(self, graph: str) -> List[Dict[str, Any]]:
+        existing = await self._fetch(GRAPH_INDEXES_SQL, (graph,))
+        return name_index_report(await self.vertex_labels(graph), existing)
+
+    async def ensure_name_indexes(
+        self, graph: str, rebuild: bool = False
+    ) -> List[Dict[str, Any]]:
+        await self.conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for index in await self.list_name_indexes(graph):
+            for statement in name_index_statements(graph, index, rebuild):
+                await self.conn.execute(statement)
+        return await self.list_name_indexes(graph)
+
+    async def search_vertices(
+        self,
+        graph: str,
+        name: str,
+        label: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Vertices whose name contains the given text, as {id, label, properties}."""
+        query, params = search_vertices_sql(graph, name, label, limit)
+        return [search_vertex_result(row) for row in await self._fetch(query, params)]
+
+
+# Global pool instance
+_async_age_pool: Optional[AsyncConnectionPool] = None
+
+
+def get_async_age_pool() -> Optional[AsyncConnectionPool]:
+    """Get the global async AGE pool instance."""
+    return _async_age_pool
+
+
+def set_async_age_pool(pool: Optional[AsyncConnectionPool]) -> None:
+    """Set the global async AGE pool instance."""
+    global _async_age_pool
+    _async_age_pool = pool
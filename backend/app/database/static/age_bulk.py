@@ -0,0 +1,223 @@
+import json
+import logging
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import psycopg2.extras
+from psycopg2 import sql
+
+from database.static.age_helper import AgeDB
+
+logger = logging.getLogger(__name__)
+
+# Rows sent per INSERT statement
+BULK_BATCH_SIZE = 5000
+
+# (label, properties as canonical JSON): the key AgeDB's MERGE matches vertices on
+VertexKey = Tuple[str, str]
+
+
+def _properties_key(properties: Dict[str, Any]) -> str:
+    return json.dumps(properties, sort_keys=True)
+
+
+class BulkLoadStats(NamedTuple):
+    vertices: int
+    edges: int
+    vertex_seconds: float
+    edge_seconds: float
+
+    @property
+    def seconds(self) -> float:
+        return self.vertex_seconds + self.edge_seconds
+
+    def describe(self) -> str:
+        def rate(count: int, seconds: float) -> str:
+            return f"{count / seconds:.0f}/s" if seconds > 0 else "n/a"
+
+        return (
+            f"{self.vertices} vertices ({rate(self.vertices, self.vertex_seconds)}) and "
+            f"{self.edges} edges ({rate(self.edges, self.edge_seconds)}) "
+            f"in {self.seconds:.2f}s"
+        )
+
+
+class GraphBulkLoader:
+    """
+    Collects vertices and edges with the create_node / create_relationship signatures of
+    AgeDB, then writes them all at once by inserting into AGE's label tables directly,
+    in batches and inside a single transaction.
+
+    It follows the MERGE semantics of AgeDB in memory. AgeDB merges a vertex on its label
+    and whole property map, so vertices are deduplicated on label plus every property,
+    not on name alone: two vertices sharing a name but differing in any other property
+    are both kept. An edge links every vertex its match maps select (none if they select
+    nothing), and merging an edge again updates its properties. It is meant for filling
+    an empty graph: nothing already stored in the graph is matched.
+    """
+
+    def __init__(self, graph: str = "loot_tables", batch_size: int = BULK_BATCH_SIZE):
+        self.graph = graph
+        self.batch_size = batch_size
+        self._vertices: Dict[VertexKey, Dict[str, Any]] = {}
+        self._by_label: Dict[str, List[VertexKey]] = {}
+        # (from vertex, type, to vertex) -> edge properties
+        self._edges: Dict[Tuple[VertexKey, str, VertexKey], Dict[str, Any]] = {}
+
+    # ------------------------------------------------------------------
+    # Collection, mirroring AgeDB
+    # ------------------------------------------------------------------
+
+    def _check_graph(self, graph: str) -> None:
+        if graph != self.graph:
+            raise ValueError(f"Bulk loader targets graph '{self.graph}', not '{graph}'")
+
+    def create_node(
+        self,
+        graph: str,
+        label: str,
+        properties: Dict[str, Any],
+        return_node: bool = False,
+    ) -> None:
+        self._check_graph(graph)
+        key = (label, _properties_key(properties))
+        if key not in self._vertices:
+            self._vertices[key] = dict(properties)
+            self._by_label.setdefault(label, []).append(key)
+
+    def _matching(self, label: str, match: dict) -> List[VertexKey]:
+        key = (label, _properties_key(match))
+        if key in self._vertices:
+            return [key]
+        # A match map selects every vertex having at least those properties
+        return [
+            candidate
+            for candidate in self._by_label.get(label, [])
+            if all(self._vertices[candidate].get(k) == v for k, v in match.items())
+        ]
+
+    def create_relationship(
+        self,
+        graph: str,
+        from_label: str,
+        from_match: dict,
+        rel_type: str,
+        to_label: str,
+        to_match: dict,
+        rel_props: dict | None = None,
+    ) -> None:
+        self._check_graph(graph)
+        for start in self._matching(from_label, from_match):
+            for end in self._matching(to_label, to_match):
+                properties = self._edges.setdefault((start, rel_type, end), {})
+                properties.update(rel_props or {})
+
+    def close(self) -> None:
+        """Nothing to release: the loader only opens a connection in flush()."""
+
+    def pending(self) -> Tuple[int, int]:
+        return len(self._vertices), len(self._edges)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _existing_labels(self, cur: Any) -> set:
+        cur.execute(
+            """
+            SELECT l.name
+            FROM ag_catalog.ag_label l
+            JOIN ag_catalog.ag_graph g ON l.graph = g.graphid
+            WHERE g.name = %s
+            """,
+            (self.graph,),
+        )
+        return {row["name"] for row in cur.fetchall()}
+
+    def _create_labels(self, cur: Any) -> None:
+        existing = self._existing_labels(cur)
+        for label in self._by_label:
+            if label not in existing:
+                cur.execute("SELECT create_vlabel(%s, %s);", (self.graph, label))
+        for rel_type in {rel_type for _, rel_type, _ in self._edges}:
+            if rel_type not in existing:
+                cur.execute("SELECT create_elabel(%s, %s);", (self.graph, rel_type))
+
+    def _insert_vertices(self, cur: Any) -> Dict[VertexKey, str]:
+        ids: Dict[VertexKey, str] = {}
+        for label, keys in self._by_label.items():
+            query = sql.SQL("INSERT INTO {}.{} (properties) VALUES %s RETURNING id").format(
+                sql.Identifier(self.graph), sql.Identifier(label)
+            )
+            # RETURNING yields the ids in the order of the VALUES rows
+            rows = psycopg2.extras.execute_values(
+                cur,
+                query,
+                [(json.dumps(self._vertices[key]),) for key in keys],
+                template="(%s::agtype)",
+                page_size=self.batch_size,
+                fetch=True,
+            )
+            for key, row in zip(keys, rows):
+                ids[key] = str(row["id"])
+        return ids
+
+    def _insert_edges(self, cur: Any, ids: Dict[VertexKey, str]) -> None:
+        by_type: Dict[str, List[Tuple[str, str, str]]] = {}
+        for (start, rel_type, end), properties in self._edges.items():
+            by_type.setdefault(rel_type, []).append(
+                (ids[start], ids[end], json.dumps(properties))
+            )
+        for rel_type, rows in by_type.items():
+            query = sql.SQL(
+                "INSERT INTO {}.{} (start_id, end_id, properties) VALUES %s"
+            ).format(sql.Identifier(self.graph), sql.Identifier(rel_type))
+            psycopg2.extras.execute_values(
+                cur,
+                query,
+                rows,
+                template="(%s::graphid, %s::graphid, %s::agtype)",
+                page_size=self.batch_size,
+            )
+
+    def flush(self, age: Optional[AgeDB] = None) -> BulkLoadStats:
+        """
+        Write everything collected in one transaction, then forget it.
+
+        Uses the given session or a dedicated one; rolls back entirely on any error.
+        """
+        owned = age is None
+        age = age or AgeDB()
+        if not age.graph_exists(self.graph):
+            age.create_graph(self.graph)
+
+        conn = age.conn
+        autocommit = conn.autocommit
+        conn.autocommit = False
+        try:
+            with age.cursor() as cur:
+                self._create_labels(cur)
+
+                started = time.perf_counter()
+                ids = self._insert_vertices(cur)
+                vertex_seconds = time.perf_counter() - started
+
+                started = time.perf_counter()
+                self._insert_edges(cur, ids)
+                edge_seconds = time.perf_counter() - started
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.autocommit = autocommit
+            if owned:
+                age.close()
+
+        stats = BulkLoadStats(len(ids), len(self._edges), vertex_seconds, edge_seconds)
+        logger.info(f"Bulk loaded {stats.describe()} into graph {self.graph}")
+
+        self._vertices.clear()
+        self._by_label.clear()
+        self._edges.clear()
+        return stats
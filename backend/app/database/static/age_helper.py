@@ -1,41 +1,414 @@
+import hashlib
+import json
 import os
+import re
+from collections import OrderedDict
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
-from models.age_models import GraphEdge, GraphNode
+from models.age_models import GraphEdge, GraphNode, GraphStats
 from psycopg2 import sql
 
+from database.static.agtype import decode_agtype
 
-def get_dict_from_agtype(agtype_value: str) -> Any:
-    import json
-    import re
+# Prepared Cypher statements kept per connection before the least recently used is freed
+PREPARED_CACHE_SIZE = int(os.getenv("AGE_PREPARED_CACHE_SIZE", "128"))
+
+# properties->name, spelled the way AGE compiles `n.name`, so Cypher can use the index
+NAME_EXPRESSION = (
+    "ag_catalog.agtype_access_operator("
+    "VARIADIC ARRAY[properties, '\"name\"'::ag_catalog.agtype])"
+)
+
+# Index kind -> (access method, indexed expression)
+NAME_INDEXES = {
+    "name_btree": ("btree", NAME_EXPRESSION),
+    "name_trgm": ("gin", f"({NAME_EXPRESSION}::text) gin_trgm_ops"),
+}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_COLUMNS = re.compile(
+    r"^\s*[A-Za-z_][A-Za-z0-9_]*\s+agtype(\s*,\s*[A-Za-z_][A-Za-z0-9_]*\s+agtype)*\s*$"
+)
+# String literals and backquoted names, whose commas and keywords are not Cypher's
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`")
+_RETURN = re.compile(r"\bRETURN\b(\s+DISTINCT\b)?", re.IGNORECASE)
+# What may follow the returned items
+_AFTER_RETURN = re.compile(r"\b(ORDER\s+BY|SKIP|LIMIT|UNION)\b", re.IGNORECASE)
+
+
+def validate_identifier(name: str, kind: str = "identifier") -> str:
+    """
+    Check a label, relationship type or property key before it is written into Cypher.
 
-    if not agtype_value:
+    Those cannot be query parameters, so anything but a plain identifier is refused.
+    """
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid {kind}: {name!r}")
+    return name
+
+
+def get_dict_from_agtype(agtype_value: str) -> Any:
+    """Decode an agtype value, with vertices and edges as plain dicts."""
+    return decode_agtype(agtype_value)
+
+
+# ----------------------------------------------------------------------
+# Query builders, shared with AsyncAgeDB: plain SQL with %s placeholders
+# ----------------------------------------------------------------------
+
+
+def _top_level(query: str) -> str:
+    """The query with string literals and bracketed expressions blanked out."""
+    query = _LITERALS.sub(lambda m: " " * len(m.group()), query)
+    chars, depth = [], 0
+    for char in query:
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif depth:
+            char = " "
+        chars.append(char)
+    return "".join(chars)
+
+
+def returned_columns(query: str) -> Optional[int]:
+    """
+    How many columns the final RETURN of a query yields.
+
+    None when that cannot be told from the text: no RETURN, or RETURN *.
+    """
+    top = _top_level(query)
+    returns = list(_RETURN.finditer(top))
+    if not returns:
         return None
+    items = top[returns[-1].end():]
+    end = _AFTER_RETURN.search(items)
+    items = (items[: end.start()] if end else items).strip()
+    if not items or items == "*":
+        return None
+    return items.count(",") + 1
+
+
+def check_cypher_shape(query: str, columns: str) -> None:
+    """
+    Refuse what would break out of the cypher() call wrapping a query, or what
+    Postgres would only reject with an opaque column definition list error.
+    """
+    if "$$" in query:
+        raise ValueError("Cypher query cannot contain '$$'")
+    if not _COLUMNS.match(columns):
+        raise ValueError(f"Invalid column definitions: {columns!r}")
+    returned = returned_columns(query)
+    defined = columns.count(",") + 1
+    if returned is not None and returned != defined:
+        raise ValueError(
+            f"Cypher query returns {returned} column(s) "
+            f"but {defined} are defined: {columns!r}"
+        )
 
-    # Handle arrays: remove suffix from each element
-    if agtype_value.startswith("[") and agtype_value.endswith("]"):
-        # Remove ::edge, ::vertex etc. from each element in the array
-        cleaned = re.sub(r"::\w+", "", agtype_value)
-        return json.loads(cleaned)
 
-    # Handle single values: remove suffix
-    json_part = agtype_value.split("::")[0]
-    return json.loads(json_part)
+def _params(props: dict, prefix: str) -> Dict[str, Any]:
+    """Parameter values of a property map, named {prefix}_{key}."""
+    return {
+        f"{prefix}_{validate_identifier(k, 'property key')}": v
+        for k, v in props.items()
+    }
+
+
+def _param_map(props: dict, prefix: str) -> str:
+    """A Cypher map of the same keys referring to the parameters from _params."""
+    if not props:
+        return ""
+    keys = [validate_identifier(k, "property key") for k in props]
+    return "{" + ", ".join(f"{k}: ${prefix}_{k}" for k in keys) + "}"
+
+
+def _param_conditions(variable: str, props: dict, prefix: str) -> str:
+    """WHERE equalities of every key to its parameter from _params."""
+    keys = [validate_identifier(k, "property key") for k in props]
+    return " AND ".join(f"{variable}.{k} = ${prefix}_{k}" for k in keys)
+
+
+def _param_assignments(variable: str, props: dict, prefix: str) -> str:
+    """SET assignments of every key to its parameter from _params."""
+    keys = [validate_identifier(k, "property key") for k in props]
+    return ", ".join(f"{variable}.{k} = ${prefix}_{k}" for k in keys)
+
+
+def merge_node_cypher(
+    label: str, properties: Dict[str, Any], return_node: bool = False
+) -> Tuple[str, Dict[str, Any]]:
+    validate_identifier(label, "label")
+    cypher = f"MERGE (n:{label} {_param_map(properties, 'p')})"
+    if return_node:
+        cypher += " RETURN n"
+    return cypher, _params(properties, "p")
+
+
+def merge_relationship_cypher(
+    from_label: str,
+    from_match: dict,
+    rel_type: str,
+    to_label: str,
+    to_match: dict,
+    rel_props: dict | None = None,
+) -> Tuple[str, Dict[str, Any]]:
+    rel_props = rel_props or {}
+    validate_identifier(from_label, "label")
+    validate_identifier(to_label, "label")
+    validate_identifier(rel_type, "relationship type")
+
+    # WHERE equalities rather than property maps, so the name indexes apply
+    cypher = f"MATCH (f:{from_label}), (t:{to_label})"
+    conditions = [
+        _param_conditions("f", from_match, "from"),
+        _param_conditions("t", to_match, "to"),
+    ]
+    conditions = [condition for condition in conditions if condition]
+    if conditions:
+        cypher += " WHERE " + " AND ".join(conditions)
+    cypher += f" MERGE (f)-[r:{rel_type}]->(t)"
+    if rel_props:
+        cypher += " SET " + _param_assignments("r", rel_props, "rel")
+
+    return cypher, {
+        **_params(from_match, "from"),
+        **_params(to_match, "to"),
+        **_params(rel_props, "rel"),
+    }
+
+
+def match_cypher(
+    label: str, filters: Optional[Dict[str, Any]] = None, limit: Optional[int] = None
+) -> Tuple[str, Dict[str, Any]]:
+    filters = filters or {}
+    validate_identifier(label, "label")
+    where = ""
+    if filters:
+        where = "WHERE " + _param_conditions("n", filters, "f")
+
+    limit_clause = f"LIMIT {int(limit)}" if limit else ""
+
+    cypher = f"""
+    MATCH (n:{label})
+    {where}
+    RETURN n
+    {limit_clause}
+    """
+    return cypher, _params(filters, "f")
+
+
+def _table(graph: str, label: str) -> str:
+    return (
+        f'"{validate_identifier(graph, "graph name")}".'
+        f'"{validate_identifier(label, "label")}"'
+    )
+
+
+VERTEX_LABELS_SQL = """
+SELECT l.name
+FROM ag_catalog.ag_label l
+JOIN ag_catalog.ag_graph g ON l.graph = g.graphid
+WHERE g.name = %s AND l.kind = 'v' AND l.name NOT LIKE '\\_ag\\_%%'
+ORDER BY l.name
+"""
+
+GRAPH_INDEXES_SQL = """
+SELECT c.relname AS index_name, x.indisvalid AS valid,
+       pg_relation_size(c.oid) AS size_bytes
+FROM pg_index x
+JOIN pg_class c ON c.oid = x.indexrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %s
+"""
+
+
+def name_index_report(
+    labels: List[str], existing: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Every name index expected on the labels, whether it exists, and its size."""
+    by_name = {row["index_name"]: row for row in existing}
+    indexes = []
+    for label in labels:
+        for kind, (method, _) in NAME_INDEXES.items():
+            name = f"{label}_{kind}"
+            row = by_name.get(name)
+            indexes.append(
+                {
+                    "label": label,
+                    "index": name,
+                    "kind": kind,
+                    "method": method,
+                    "exists": row is not None,
+                    "valid": bool(row and row["valid"]),
+                    "size_bytes": row["size_bytes"] if row else 0,
+                }
+            )
+    return indexes
+
+
+def name_index_statements(
+    graph: str, index: Dict[str, Any], rebuild: bool = False
+) -> List[str]:
+    """Statements creating a missing name index, or reindexing it with rebuild."""
+    graph = validate_identifier(graph, "graph name")
+    if index["exists"]:
+        if not rebuild:
+            return []
+        name = validate_identifier(index["index"], "index")
+        return [f'REINDEX INDEX "{graph}"."{name}"']
+    method, expression = NAME_INDEXES[index["kind"]]
+    table = _table(graph, index["label"])
+    return [
+        f'CREATE INDEX "{index["index"]}" ON {table} USING {method} ({expression})',
+        f"ANALYZE {table}",
+    ]
+
+
+def search_vertices_sql(
+    graph: str, name: str, label: Optional[str] = None, limit: int = 50
+) -> Tuple[str, List[Any]]:
+    """
+    SQL finding vertices whose name contains the given text, on the label tables,
+    where the trigram indexes serve the substring match; Cypher's CONTAINS cannot.
+    """
+    query = f"""
+    SELECT v.id::text AS id,
+           ag_catalog._label_name(g.graphid, v.id)::text AS label,
+           v.properties::text AS properties
+    FROM {_table(graph, "_ag_label_vertex")} v, ag_catalog.ag_graph g
+    WHERE g.name = %s
+    """
+    params: List[Any] = [graph]
+    if name:
+        # Names are matched in their agtype text form, where they are JSON-escaped
+        escaped = json.dumps(name, ensure_ascii=False)[1:-1]
+        query += f" AND ({NAME_EXPRESSION})::text LIKE %s"
+        params.append("%" + re.sub(r"([\\%_])", r"\\\1", escaped) + "%")
+    if label:
+        query += " AND ag_catalog._label_name(g.graphid, v.id)::text = %s"
+        params.append(label)
+    query += " LIMIT %s"
+    params.append(int(limit))
+    return query, params
+
+
+def search_vertex_result(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": row["id"],
+        "label": row["label"],
+        "properties": get_dict_from_agtype(row["properties"]) or {},
+    }
+
+
+def search_result_node(result: Dict[str, Any]) -> GraphNode:
+    """The GraphNode get_node returns for a search_vertices result."""
+    properties = result["properties"]
+    return GraphNode(
+        id=result["id"],
+        name=properties.get("name") or "Unknown",
+        type=properties.get("type") or "Unknown",
+        label=result["label"],
+        properties=properties,
+    )
+
+
+# Vertex and edge counts per label of each graph, kept so statistics are read without
+# counting the graph: rebuilt after a reload, adjusted by the admin routes in between
+GRAPH_STATS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS public.graph_stats (
+    graph text NOT NULL,
+    label text NOT NULL,
+    kind "char" NOT NULL,
+    count bigint NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (graph, label)
+)
+"""
+
+GRAPH_LABELS_SQL = """
+SELECT l.name, l.kind
+FROM ag_catalog.ag_label l
+JOIN ag_catalog.ag_graph g ON l.graph = g.graphid
+WHERE g.name = %s AND l.name NOT LIKE '\\_ag\\_%%'
+ORDER BY l.name
+"""
+
+GRAPH_STATS_SQL = """
+SELECT label, kind, count, updated_at FROM public.graph_stats WHERE graph = %s
+"""
+
+GRAPH_STATS_ADJUST_SQL = """
+INSERT INTO public.graph_stats AS s (graph, label, kind, count)
+VALUES (%(graph)s, %(label)s, %(kind)s, GREATEST(%(delta)s, 0))
+ON CONFLICT (graph, label)
+DO UPDATE SET count = GREATEST(s.count + %(delta)s, 0), updated_at = now()
+"""
+
+
+def graph_stats_refresh_statements(
+    graph: str, labels: List[Dict[str, Any]]
+) -> List[Tuple[str, Tuple[Any, ...]]]:
+    """Statements replacing the stats rows of a graph with exact label counts."""
+    statements: List[Tuple[str, Tuple[Any, ...]]] = [
+        ("DELETE FROM public.graph_stats WHERE graph = %s", (graph,))
+    ]
+    for row in labels:
+        # ONLY: the rows of this label, not those of labels inheriting from it
+        statements.append(
+            (
+                "INSERT INTO public.graph_stats (graph, label, kind, count) "
+                f"SELECT %s, %s, %s, count(*) FROM ONLY {_table(graph, row['name'])}",
+                (graph, row["name"], row["kind"]),
+            )
+        )
+    return statements
+
+
+def graph_stats_model(rows: List[Dict[str, Any]]) -> GraphStats:
+    """GraphStats from the stats rows of a graph: one per label, no counting."""
+    node_types = {row["label"]: row["count"] for row in rows if row["kind"] == "v"}
+    updated = [row["updated_at"] for row in rows if row["updated_at"] is not None]
+    return GraphStats(
+        totalNodes=sum(node_types.values()),
+        totalEdges=sum(row["count"] for row in rows if row["kind"] == "e"),
+        nodeTypes=node_types,
+        lastUpdated=max(updated).isoformat() if updated else "",
+    )
+
+
+class AgeConnection(psycopg2.extensions.connection):
+    """A connection remembering the Cypher statements prepared on its session."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (graph, query, columns) -> prepared statement name, least recently used first
+        self.prepared_statements: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def connect_age() -> Any:
+    """Open a new autocommit connection to the AGE database."""
+    conn = psycopg2.connect(
+        user=os.getenv("POSTGRES_USER"),
+        password=os.getenv("POSTGRES_PASSWORD"),
+        database=os.getenv("POSTGRES_DB"),
+        host=os.getenv("POSTGRES_HOST"),
+        port=os.getenv("POSTGRES_PORT"),
+        connection_factory=AgeConnection,
+    )
+    conn.autocommit = True
+    return conn
 
 
 class AgeDB:
     def __init__(self):
-        self.conn = psycopg2.connect(
-            user=os.getenv("POSTGRES_USER"),
-            password=os.getenv("POSTGRES_PASSWORD"),
-            database=os.getenv("POSTGRES_DB"),
-            host=os.getenv("POSTGRES_HOST"),
-            port=os.getenv("POSTGRES_PORT"),
-        )
-        self.conn.autocommit = True
+        self.conn = connect_age()
+        self._prepared = self.conn.prepared_statements
         self._ensure_age()
 
     # ------------------------------------------------------------------
@@ -52,34 +425,6 @@ class AgeDB:
             if not self.graph_exists("loot_tables"):
                 self.create_graph("loot_tables")
 
-    def _to_cypher_map(self, props: dict) -> str:
-        """
-        Convert a Python dict to a Cypher map literal.
-        """
-
-        def serialize(v):
-            if v is None:
-                return "null"
-            if isinstance(v, bool):
-                return "true" if v else "false"
-            if isinstance(v, (int, float)):
-                return str(v)
-            if isinstance(v, str):
-                import json
-
-                return json.dumps(v)
-            if isinstance(v, list):
-                return "[" + ", ".join(serialize(x) for x in v) + "]"
-            if isinstance(v, dict):
-                return (
-                    "{"
-                    + ", ".join(f"{k}: {serialize(val)}" for k, val in v.items())
-                    + "}"
-                )
-            raise TypeError(f"Unsupported property type: {type(v)}")
-
-        return "{" + ", ".join(f"{k}: {serialize(v)}" for k, v in props.items()) + "}"
-
     @contextmanager
     def cursor(self) -> Any:
         cur = self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
@@ -89,7 +434,10 @@ class AgeDB:
             cur.close()
 
     def close(self):
-        self.conn.close()
+        if self.conn is None:
+            return
+        conn, self.conn = self.conn, None
+        conn.close()
 
     # ------------------------------------------------------------------
     # Graph management
@@ -120,22 +468,32 @@ class AgeDB:
         graph: str,
         query: str,
         columns: str,
+        params: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Execute a Cypher query.
 
         Args:
             graph: Graph name
-            query: Cypher query
+            query: Cypher query, referring to parameters as $name
             columns: Column definitions, e.g. "n agtype", "n agtype, count agtype"
+            params: Parameter values. When given, even empty, the query runs as a
+                prepared statement cached on the connection, so repeated queries of
+                the same shape skip parsing and planning.
 
         Example:
             db.cypher(
                 "loot_tables",
-                "MATCH (n:Mission) RETURN n",
-                "n agtype"
+                "MATCH (n:Mission) WHERE n.planet = $planet RETURN n",
+                "n agtype",
+                {"planet": "Earth"},
             )
         """
+        if params is not None:
+            return self._execute_prepared(graph, query, columns, params)
+
+        check_cypher_shape(query, columns)
+
         sql = f"""
         SELECT *
         FROM cypher(%s, $$ {query} $$)
@@ -145,6 +503,43 @@ class AgeDB:
             cur.execute(sql, (graph,))
             return [dict(row) for row in cur.fetchall()]
 
+    def _prepare(self, graph: str, query: str, columns: str) -> str:
+        """Name of the statement prepared for this query shape, preparing it if needed."""
+        key = (graph, query, columns)
+        name = self._prepared.get(key)
+        if name is not None:
+            self._prepared.move_to_end(key)
+            return name
+
+        check_cypher_shape(query, columns)
+
+        digest = hashlib.sha1("\0".join(key).encode()).hexdigest()[:16]
+        name = f"cypher_{digest}"
+        statement = sql.SQL(
+            "PREPARE {name} (agtype) AS SELECT * FROM cypher({graph}, $$ "
+        ).format(name=sql.Identifier(name), graph=sql.Literal(graph))
+        statement += sql.SQL(query + f" $$, $1) AS ({columns})")
+        with self.cursor() as cur:
+            cur.execute(statement)
+
+        self._prepared[key] = name
+        while len(self._prepared) > PREPARED_CACHE_SIZE:
+            _, evicted = self._prepared.popitem(last=False)
+            with self.cursor() as cur:
+                cur.execute(sql.SQL("DEALLOCATE {}").format(sql.Identifier(evicted)))
+        return name
+
+    def _execute_prepared(
+        self, graph: str, query: str, columns: str, params: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        name = self._prepare(graph, query, columns)
+        with self.cursor() as cur:
+            cur.execute(
+                sql.SQL("EXECUTE {} (%s)").format(sql.Identifier(name)),
+                (json.dumps(params),),
+            )
+            return [dict(row) for row in cur.fetchall()] if cur.description else []
+
     # ------------------------------------------------------------------
     # Convenience helpers
     # ------------------------------------------------------------------
@@ -186,24 +581,8 @@ class AgeDB:
         properties: Dict[str, Any],
         return_node: bool = False,
     ):
-        prop_map = self._to_cypher_map(properties)
-
-        cypher = f"""
-        MERGE (n:{label} {prop_map})
-        """
-
-        if return_node:
-            cypher += "\nRETURN n"
-
-        sql = f"""
-        SELECT 1
-        FROM cypher(%s, $$
-        {cypher}
-        $$) AS (_ agtype)
-        """
-
-        with self.cursor() as cur:
-            cur.execute(sql, (graph,))
+        cypher, params = merge_node_cypher(label, properties, return_node)
+        self.cypher(graph, cypher, "_ agtype", params)
 
     def create_relationship(
         self,
@@ -215,68 +594,13 @@ class AgeDB:
         to_match: dict,
         rel_props: dict | None = None,
     ) -> None:
-        rel_props = rel_props or {}
-
-        from_map = self._to_cypher_map(from_match)
-        to_map = self._to_cypher_map(to_match)
-        rel_map = self._to_cypher_map(rel_props) if rel_props else ""
-
-        cypher = f"""
-        MATCH (f:{from_label} {from_map})
-        MATCH (t:{to_label} {to_map})
-        MERGE (f)-[r:{rel_type}]->(t)
-        """
-
-        if rel_props:
-            cypher += f"\nSET r += {rel_map}"
-
-        query = sql.SQL("""
-        SELECT 1
-        FROM cypher({graph}, $$
-        {cypher}
-        $$) AS (_ agtype)
-        """).format(
-            graph=sql.Literal(graph),
-            cypher=sql.SQL(cypher),
+        cypher, params = merge_relationship_cypher(
+            from_label, from_match, rel_type, to_label, to_match, rel_props
         )
-
-        with self.cursor() as cur:
-            cur.execute(query)
+        self.cypher(graph, cypher, "_ agtype", params)
 
     def get_node(self, graph: str, node_name: str) -> GraphNode:
-        where_clause = f"n.name CONTAINS '{node_name}'"
-        query = f"""
-        MATCH (n)
-        WHERE {where_clause}
-        RETURN n, labels(n) as node_labels
-        LIMIT 50
-        """
-
-        result = self.cypher("loot_tables", query, "n agtype, node_labels agtype")[0]
-        node_data = get_dict_from_agtype(result["n"])
-        node_labels = result["node_labels"]
-        node_id = node_data.get("id")
-        node_name = node_data["properties"].get("name")
-        type = node_data["properties"].get("type")
-        properties = node_data.get("properties", {})
-
-        label = "Unknown"
-        if node_labels and len(node_labels) > 0:
-            if isinstance(node_labels, str):
-                label = node_labels.strip('[]"')
-            elif isinstance(node_labels, list):
-                if isinstance(node_labels[0], str):
-                    label = node_labels[0]
-                else:
-                    label = str(node_labels[0])
-
-        return GraphNode(
-            id=str(node_id or ""),
-            name=node_name or "Unknown",
-            type=type or "Unknown",
-            label=label,
-            properties=properties,
-        )
+        return search_result_node(self.search_vertices(graph, node_name, limit=1)[0])
 
     # ------------------------------------------------------------------
     # Query helpers
@@ -289,31 +613,8 @@ class AgeDB:
         filters: Optional[Dict[str, Any]] = None,
         limit: Optional[int] = None,
     ) -> List[Dict[str, Any]]:
-        filters = filters or {}
-        where = ""
-        if filters:
-            conds = [f"n.{k} = '{v}'" for k, v in filters.items()]
-            where = "WHERE " + " AND ".join(conds)
-
-        limit_clause = f"LIMIT {limit}" if limit else ""
-
-        cypher = f"""
-        MATCH (n:{label})
-        {where}
-        RETURN n
-        {limit_clause}
-        """
-
-        with self.cursor() as cur:
-            cur.execute(
-                f"""
-                SELECT n
-                FROM cypher(%s, $$ {cypher} $$)
-                AS (n agtype)
-                """,
-                (graph,),
-            )
-            return [dict(row) for row in cur.fetchall()]
+        cypher, params = match_cypher(label, filters, limit)
+        return self.cypher(graph, cypher, "n agtype", params)
 
     # ------------------------------------------------------------------
     # Deletion
@@ -354,3 +655,76 @@ class AgeDB:
                 (graph_name,),
             )
         return True
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def graph_stats(self, graph: str) -> GraphStats:
+        with self.cursor() as cur:
+            cur.execute(GRAPH_STATS_SQL, (graph,))
+            return graph_stats_model(cur.fetchall())
+
+    def refresh_graph_stats(self, graph: str) -> GraphStats:
+        """Recount every label of the graph into the stats table, in one transaction."""
+        conn = self.conn
+        autocommit = conn.autocommit
+        conn.autocommit = False
+        try:
+            with self.cursor() as cur:
+                cur.execute(GRAPH_STATS_TABLE_SQL)
+                cur.execute(GRAPH_LABELS_SQL, (graph,))
+                labels = cur.fetchall()
+                for statement, params in graph_stats_refresh_statements(graph, labels):
+                    cur.execute(statement, params)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.autocommit = autocommit
+        return self.graph_stats(graph)
+
+    # ------------------------------------------------------------------
+    # Name indexes
+    # ------------------------------------------------------------------
+
+    def vertex_labels(self, graph: str) -> List[str]:
+        """Vertex labels of a graph, without AGE's internal parent label."""
+        with self.cursor() as cur:
+            cur.execute(VERTEX_LABELS_SQL, (graph,))
+            return [row["name"] for row in cur.fetchall()]
+
+    def list_name_indexes(self, graph: str) -> List[Dict[str, Any]]:
+        """Every name index expected on the vertex labels, and whether it exists."""
+        with self.cursor() as cur:
+            cur.execute(GRAPH_INDEXES_SQL, (graph,))
+            existing = cur.fetchall()
+        return name_index_report(self.vertex_labels(graph), existing)
+
+    def ensure_name_indexes(
+        self, graph: str, rebuild: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Create the missing btree (equality) and trigram (substring) indexes on the name
+        of every vertex label. With rebuild, existing ones are reindexed as well.
+        """
+        with self.cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+            for index in self.list_name_indexes(graph):
+                for statement in name_index_statements(graph, index, rebuild):
+                    cur.execute(statement)
+        return self.list_name_indexes(graph)
+
+    def search_vertices(
+        self,
+        graph: str,
+        name: str,
+        label: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Vertices whose name contains the given text, as {id, label, properties}."""
+        query, params = search_vertices_sql(graph, name, label, limit)
+        with self.cursor() as cur:
+            cur.execute(query, params)
+            return [search_vertex_result(row) for row in cur.fetchall()]
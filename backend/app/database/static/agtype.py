@@ -0,0 +1,160 @@
+import json
+import re
+from typing import Any, Callable, List, Optional, Tuple
+
+from models.age_models import GraphEdge, GraphNode
+
+# Type annotation following a value: {...}::vertex, {...}::edge, [...]::path, 1.5::numeric
+_SUFFIX = re.compile(r"::([A-Za-z_]+)")
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+Converter = Callable[[Any, Optional[str]], Any]
+
+
+def _keep(value: Any, suffix: Optional[str]) -> Any:
+    return value
+
+
+def _vertex(value: dict) -> GraphNode:
+    properties = value.get("properties") or {}
+    return GraphNode(
+        id=str(value["id"]),
+        name=properties.get("name", ""),
+        type=value["label"],
+        label=value["label"],
+        properties=properties,
+    )
+
+
+def _edge(value: dict) -> GraphEdge:
+    return GraphEdge(
+        id=str(value["id"]),
+        from_node=str(value["start_id"]),
+        to_node=str(value["end_id"]),
+        relationship_type=value["label"],
+        properties=value.get("properties") or {},
+    )
+
+
+def _to_model(value: Any, suffix: Optional[str]) -> Any:
+    if suffix == "vertex":
+        return _vertex(value)
+    if suffix == "edge":
+        return _edge(value)
+    return value
+
+
+# The annotation of an array element, then the separator or end of the array
+_AFTER_ITEM = re.compile(r"(?:::([A-Za-z_]+))?[ \t\n\r]*([,\]])[ \t\n\r]*")
+
+_decoder = json.JSONDecoder()
+# The C scanner behind raw_decode: (value, end) from a position, StopIteration if none
+_scan_once = _decoder.scan_once
+
+
+def _scan_value(text: str, pos: int, convert: Converter) -> Tuple[Any, int]:
+    """Decode the JSON value at pos, without its annotation."""
+    if text.startswith("[", pos):
+        return _scan_list(text, pos, convert)
+    try:
+        return _scan_once(text, pos)
+    except StopIteration:
+        raise ValueError(f"Malformed agtype value at position {pos}")
+    except json.JSONDecodeError:
+        if not text.startswith("{", pos):
+            raise
+        # A map holding annotated values, which the JSON scanner alone cannot read
+        return _scan_map(text, pos, convert)
+
+
+def _scan_map(text: str, pos: int, convert: Converter) -> Tuple[dict, int]:
+    result = {}
+    pos = _WHITESPACE.match(text, pos + 1).end()
+    if text.startswith("}", pos):
+        return result, pos + 1
+    while True:
+        key, pos = _scan_once(text, pos)
+        pos = _WHITESPACE.match(text, pos).end()
+        if not text.startswith(":", pos):
+            raise ValueError(f"Malformed agtype map at position {pos}")
+        result[key], pos = _scan(text, pos + 1, convert)
+        pos = _WHITESPACE.match(text, pos).end()
+        if text.startswith(",", pos):
+            pos = _WHITESPACE.match(text, pos + 1).end()
+        elif text.startswith("}", pos):
+            return result, pos + 1
+        else:
+            raise ValueError(f"Malformed agtype map at position {pos}")
+
+
+def _scan_list(text: str, pos: int, convert: Converter) -> Tuple[list, int]:
+    result = []
+    append = result.append
+    pos = _WHITESPACE.match(text, pos + 1).end()
+    if text.startswith("]", pos):
+        return result, pos + 1
+    while True:
+        value, pos = _scan_value(text, pos, convert)
+        after = _AFTER_ITEM.match(text, pos)
+        if after is None:
+            raise ValueError(f"Malformed agtype array at position {pos}")
+        append(convert(value, after.group(1)))
+        pos = after.end()
+        if after.group(2) == "]":
+            return result, pos
+
+
+def _scan(text: str, pos: int, convert: Converter) -> Tuple[Any, int]:
+    """Decode the value at pos and its optional annotation, in a single left-to-right pass."""
+    pos = _WHITESPACE.match(text, pos).end()
+    value, pos = _scan_value(text, pos, convert)
+    suffix = _SUFFIX.match(text, pos)
+    if suffix:
+        return convert(value, suffix.group(1)), suffix.end()
+    return convert(value, None), pos
+
+
+def _decode(text: str, convert: Converter) -> Any:
+    if not text:
+        return None
+    if "::" not in text:
+        # Plain JSON: no annotation anywhere
+        return json.loads(text)
+    value, pos = _scan(text, 0, convert)
+    if _WHITESPACE.match(text, pos).end() != len(text):
+        raise ValueError(f"Unexpected data after agtype value at position {pos}")
+    return value
+
+
+def decode_agtype(text: str) -> Any:
+    """Decode an agtype string, leaving vertices and edges as plain dicts."""
+    return _decode(text, _keep)
+
+
+def decode_graph(text: str) -> Any:
+    """Decode an agtype string, turning vertices and edges into GraphNode / GraphEdge."""
+    return _decode(text, _to_model)
+
+
+def decode_vertex(text: str) -> GraphNode:
+    node = decode_graph(text)
+    if not isinstance(node, GraphNode):
+        raise ValueError(f"agtype value is not a vertex: {text[:80]}")
+    return node
+
+
+def decode_edge(text: str) -> GraphEdge:
+    edge = decode_graph(text)
+    if not isinstance(edge, GraphEdge):
+        raise ValueError(f"agtype value is not an edge: {text[:80]}")
+    return edge
+
+
+def decode_path(text: str) -> Tuple[List[GraphNode], List[GraphEdge]]:
+    """The vertices and edges of a path, in path order."""
+    elements = decode_graph(text)
+    if not isinstance(elements, list):
+        raise ValueError(f"agtype value is not a path: {text[:80]}")
+    nodes = [element for element in elements if isinstance(element, GraphNode)]
+    edges = [element for element in elements if isinstance(element, GraphEdge)]
+    return nodes, edges
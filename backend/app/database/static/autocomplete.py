@@ -0,0 +1,389 @@
+import heapq
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database.static.catalog import (
+    CATALOG_VERSION_ID,
+    META_COLLECTION,
+    CatalogManager,
+    get_catalog,
+)
+from database.static.drop_index import DROP_TABLES_VERSION_ID, DROPS_COLLECTION
+from database.static.search import normalize_search_key
+
+logger = logging.getLogger(__name__)
+
+# Best entries kept on every trie node, so completing a prefix never walks its subtree
+TOP_PER_NODE = 32
+
+# Static collections whose names are suggested, with the kind reported for them
+CATALOG_KINDS = {
+    "warframes": "warframe",
+    "weapons": "weapon",
+    "mods": "mod",
+    "arcanes": "arcane",
+    "relics": "relic",
+}
+
+
+class Suggestion(NamedTuple):
+    name: str
+    kind: str
+    popularity: int
+    unique_name: Optional[str] = None
+
+
+# Deletion-neighbourhood tables, as (prefix length, typos): every name prefix of that
+# length is indexed under its variants with up to that many characters deleted
+DELETION_TABLES = ((3, 1), (4, 1), (5, 1), (6, 2))
+
+
+def max_distance_for(key: str) -> int:
+    """Typos tolerated for a query: none under 3 characters, then 1, then 2 from 6."""
+    if len(key) < 3:
+        return 0
+    return 1 if len(key) < 6 else 2
+
+
+def _deletions(text: str, count: int) -> Set[str]:
+    """text with up to count characters deleted, anywhere."""
+    variants = {text}
+    frontier = {text}
+    for _ in range(count):
+        frontier = {
+            variant[:i] + variant[i + 1 :]
+            for variant in frontier
+            for i in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def _deletion_keys(text: str, count: int, length: int) -> Set[str]:
+    """
+    Deletion variants of text cut to length. Two prefixes within count edits of each
+    other (aligned on their first length + count characters) always share one.
+    """
+    return {
+        variant[:length]
+        for variant in _deletions(text, count)
+        if len(variant) >= length
+    }
+
+
+# (-popularity, name, index, kind) of a suggestion, in ranking order
+Entry = Tuple[int, str, int, str]
+
+
+class _TrieNode:
+    __slots__ = ("children", "top", "top_by_kind")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Best suggestions below this node
+        self.top: List[Entry] = []
+        # The same per kind, where top had to be cut (it holds everything otherwise)
+        self.top_by_kind: Optional[Dict[str, List[Entry]]] = None
+
+    def best(self, kind: Optional[str]) -> List[Entry]:
+        if not kind:
+            return self.top
+        if self.top_by_kind is not None:
+            return self.top_by_kind.get(kind, [])
+        return [entry for entry in self.top if entry[3] == kind]
+
+
+class AutocompleteIndex:
+    """Immutable trie of suggestion names, ranked by popularity, with fuzzy prefix search."""
+
+    def __init__(self, version: Optional[str], suggestions: Iterable[Suggestion]):
+        self.version = version
+        self._suggestions: List[Suggestion] = []
+        self._root = _TrieNode()
+        # (prefix length, typos) -> deletion key -> name prefixes having it
+        self._deletion_tables: Dict[Tuple[int, int], Dict[str, List[str]]] = {}
+
+        seen = set()
+        for suggestion in suggestions:
+            key = normalize_search_key(suggestion.name)
+            if not key or (key, suggestion.kind) in seen:
+                continue
+            seen.add((key, suggestion.kind))
+            self._suggestions.append(suggestion)
+            self._insert(key, len(self._suggestions) - 1)
+
+        self._finalize(self._root)
+        self._index_deletions({key for key, _ in seen})
+
+    def _insert(self, key: str, index: int) -> None:
+        suggestion = self._suggestions[index]
+        entry = (-suggestion.popularity, suggestion.name, index, suggestion.kind)
+        node = self._root
+        node.top.append(entry)
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            node.top.append(entry)
+
+    def _finalize(self, root: _TrieNode) -> None:
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if len(node.top) > TOP_PER_NODE:
+                # Once cut, top may hold nothing of a rarer kind: rank each kind too
+                by_kind: Dict[str, List[Entry]] = {}
+                for entry in node.top:
+                    by_kind.setdefault(entry[3], []).append(entry)
+                node.top_by_kind = {
+                    kind: heapq.nsmallest(TOP_PER_NODE, entries)
+                    for kind, entries in by_kind.items()
+                }
+                node.top = heapq.nsmallest(TOP_PER_NODE, node.top)
+            else:
+                node.top.sort()
+            stack.extend(node.children.values())
+
+    def _index_deletions(self, keys: Set[str]) -> None:
+        for length, typos in DELETION_TABLES:
+            table: Dict[str, List[str]] = {}
+            for prefix in {key[:length] for key in keys}:
+                for deletion_key in _deletion_keys(prefix, typos, length - typos):
+                    table.setdefault(deletion_key, []).append(prefix)
+            self._deletion_tables[(length, typos)] = table
+
+    def _candidate_prefixes(self, key: str, max_distance: int) -> Optional[Set[str]]:
+        """
+        Every prefix, up to the indexed length, of the names a typo-tolerant search can
+        reach; None when no deletion table fits the query, so the whole trie is walked.
+        """
+        lengths = [
+            length
+            for length, typos in self._deletion_tables
+            if typos == max_distance and length <= len(key)
+        ]
+        if not lengths:
+            return None
+        length = max(lengths)
+        table = self._deletion_tables[(length, max_distance)]
+
+        candidates: Set[str] = set()
+        deletion_keys = _deletion_keys(key[:length], max_distance, length - max_distance)
+        for deletion_key in deletion_keys:
+            for prefix in table.get(deletion_key, ()):
+                candidates.update(prefix[:end] for end in range(1, len(prefix) + 1))
+        return candidates
+
+    def _prefix_nodes(
+        self, key: str, max_distance: int
+    ) -> Dict[int, Tuple[int, _TrieNode]]:
+        """
+        Trie nodes whose path is within max_distance edits of the query, by distance.
+
+        Optimal-string-alignment rows (Levenshtein plus adjacent transpositions) computed
+        along the trie, pruning a branch as soon as its whole row exceeds max_distance,
+        or once no deeper node can complete the query more closely. Near the root, only
+        the branches the deletion tables point to are walked.
+        """
+        matches: Dict[int, Tuple[int, _TrieNode]] = {}
+        allowed = self._candidate_prefixes(key, max_distance)
+        if allowed is not None and not allowed:
+            return matches
+        guarded = max(len(prefix) for prefix in allowed) if allowed else 0
+
+        columns = range(1, len(key) + 1)
+        first_row = list(range(len(key) + 1))
+
+        # (node, its path, its row, its parent's row)
+        stack = [(self._root, "", first_row, None)]
+        while stack:
+            node, path, previous_row, before_row = stack.pop()
+            previous_char = path[-1:]
+            for char, child in node.children.items():
+                child_path = path + char
+                if len(child_path) <= guarded and child_path not in allowed:
+                    continue
+                cost = previous_row[0] + 1
+                row = [cost]
+                for column in columns:
+                    key_char = key[column - 1]
+                    # Insertion, deletion, substitution (free on a match), transposition
+                    cost += 1
+                    if previous_row[column] + 1 < cost:
+                        cost = previous_row[column] + 1
+                    if previous_row[column - 1] + (key_char != char) < cost:
+                        cost = previous_row[column - 1] + (key_char != char)
+                    if (
+                        key_char == previous_char
+                        and column > 1
+                        and key[column - 2] == char
+                        and before_row[column - 2] + 1 < cost
+                    ):
+                        cost = before_row[column - 2] + 1
+                    row.append(cost)
+                best = min(row)
+                if row[-1] <= max_distance:
+                    # A completed prefix: everything below it completes too
+                    known = matches.get(id(child))
+                    if known is None or row[-1] < known[0]:
+                        matches[id(child)] = (row[-1], child)
+                    if row[-1] == best:
+                        # Rows never decrease going down: nothing below does better
+                        continue
+                if best <= max_distance:
+                    stack.append((child, child_path, row, previous_row))
+        return matches
+
+    def complete(
+        self,
+        query: str,
+        limit: int = 10,
+        kind: Optional[str] = None,
+        max_distance: Optional[int] = None,
+    ) -> List[Tuple[Suggestion, int]]:
+        """
+        Most popular suggestions completing the query, with their edit distance. At most
+        TOP_PER_NODE are returned: a node ranks no more of the names below it.
+        """
+        limit = min(limit, TOP_PER_NODE)
+        key = normalize_search_key(query)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = max_distance_for(key)
+
+        # Exact prefixes first: a single walk down the trie
+        node: Optional[_TrieNode] = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                break
+
+        results: List[Tuple[Suggestion, int]] = []
+        taken = set()
+
+        def collect(top: List[Entry], distance: int) -> None:
+            for _, _, index, _ in top:
+                if len(results) >= limit:
+                    return
+                if index in taken:
+                    continue
+                taken.add(index)
+                results.append((self._suggestions[index], distance))
+
+        if node is not None:
+            collect(node.best(kind), 0)
+        if len(results) >= limit or max_distance == 0:
+            return results
+
+        # Then typo-tolerant prefixes, closest first, most popular within a distance
+        by_distance: Dict[int, List[Entry]] = {}
+        for distance, match in self._prefix_nodes(key, max_distance).values():
+            if distance > 0:
+                by_distance.setdefault(distance, []).extend(match.best(kind))
+        for distance in sorted(by_distance):
+            collect(sorted(by_distance[distance]), distance)
+        return results
+
+    def count(self) -> int:
+        return len(self._suggestions)
+
+
+async def load_autocomplete_index(
+    db: AsyncIOMotorDatabase, version: Optional[str]
+) -> AutocompleteIndex:
+    """Gather item, source, mission and catalog names, ranked by how often they drop."""
+    suggestions: List[Suggestion] = []
+    item_popularity: Dict[str, int] = {}
+
+    async for item in db[DROPS_COLLECTION].aggregate(
+        [{"$group": {"_id": "$item", "count": {"$sum": 1}}}]
+    ):
+        if item["_id"]:
+            item_popularity[normalize_search_key(item["_id"])] = item["count"]
+            suggestions.append(Suggestion(item["_id"], "item", item["count"]))
+
+    async for source in db[DROPS_COLLECTION].aggregate(
+        [
+            {
+                "$group": {
+                    "_id": {"source": "$source", "source_type": "$source_type"},
+                    "count": {"$sum": 1},
+                }
+            }
+        ]
+    ):
+        if source["_id"].get("source"):
+            suggestions.append(
+                Suggestion(
+                    source["_id"]["source"],
+                    source["_id"].get("source_type") or "source",
+                    source["count"],
+                )
+            )
+
+    async for mission in db["missions"].find({}, {"name": 1, "mission_name": 1}):
+        if mission.get("name"):
+            suggestions.append(
+                Suggestion(mission["name"], "mission", 0, mission.get("mission_name"))
+            )
+
+    catalog = get_catalog()
+    for collection_name, kind in CATALOG_KINDS.items():
+        if catalog is not None:
+            documents = catalog.project(collection_name, ["uniqueName", "name"])
+        else:
+            documents = await db[collection_name].find(
+                {}, {"_id": 0, "uniqueName": 1, "name": 1}
+            ).to_list(length=None)
+        for doc in documents:
+            if doc.get("name"):
+                popularity = item_popularity.get(normalize_search_key(doc["name"]), 0)
+                suggestions.append(
+                    Suggestion(doc["name"], kind, popularity, doc.get("uniqueName"))
+                )
+
+    return AutocompleteIndex(version, suggestions)
+
+
+class AutocompleteManager(CatalogManager):
+    """Keeps the current AutocompleteIndex, rebuilt when the catalog or drop tables change."""
+
+    description = "autocomplete index"
+
+    async def _read_version(self) -> Optional[str]:
+        versions = {
+            meta["_id"]: meta.get("version")
+            async for meta in self.db[META_COLLECTION].find(
+                {"_id": {"$in": [CATALOG_VERSION_ID, DROP_TABLES_VERSION_ID]}}
+            )
+        }
+        return (
+            f"{versions.get(CATALOG_VERSION_ID)}:{versions.get(DROP_TABLES_VERSION_ID)}"
+        )
+
+    async def load(self, version: Optional[str]) -> AutocompleteIndex:
+        return await load_autocomplete_index(self.db, version)
+
+    def summary(self, index: AutocompleteIndex) -> str:
+        return f"{index.count()} names"
+
+
+# Global manager instance
+_autocomplete_manager: Optional[AutocompleteManager] = None
+
+
+def get_autocomplete_manager() -> Optional[AutocompleteManager]:
+    """Get the global autocomplete manager instance."""
+    return _autocomplete_manager
+
+
+def set_autocomplete_manager(manager: Optional[AutocompleteManager]) -> None:
+    """Set the global autocomplete manager instance."""
+    global _autocomplete_manager
+    _autocomplete_manager = manager
+
+
+def get_autocomplete_index() -> Optional[AutocompleteIndex]:
+    """Get the current autocomplete index, or None if it is not built."""
+    return _autocomplete_manager.current if _autocomplete_manager else None
@@ -0,0 +1,229 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import MongoClient
+
+logger = logging.getLogger(__name__)
+
+CATALOG_POLL_INTERVAL = int(os.getenv("CATALOG_POLL_INTERVAL", "30"))
+
+META_COLLECTION = "static_meta"
+CATALOG_VERSION_ID = "catalog"
+
+# Collections filled by db_init_script.py, all keyed by uniqueName
+CATALOG_COLLECTIONS = [
+    "warframes",
+    "weapons",
+    "mods",
+    "arcanes",
+    "relics",
+    "recipes",
+    "images",
+]
+
+
+def stamp_static_version(
+    client: MongoClient, version_id: str, db_name: str = "cephalon_onni"
+) -> str:
+    """Write a new version under version_id, signaling running servers to reload it."""
+    version = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    client[db_name][META_COLLECTION].update_one(
+        {"_id": version_id},
+        {"$set": {"version": version, "updated_at": datetime.now()}},
+        upsert=True,
+    )
+    logger.info(f"Stamped {version_id} version {version}")
+    return version
+
+
+def stamp_catalog_version(client: MongoClient, db_name: str = "cephalon_onni") -> str:
+    """Write a new catalog version, signaling running servers to reload the catalog."""
+    return stamp_static_version(client, CATALOG_VERSION_ID, db_name)
+
+
+class CatalogPayload:
+    """A serialized JSON response body, its strong ETag and its gzip encoding."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    @cached_property
+    def gzip_body(self) -> bytes:
+        """Compressed on first use, once per payload."""
+        return gzip.compress(self.body, compresslevel=9)
+
+
+def build_payload(documents: List[dict]) -> CatalogPayload:
+    return CatalogPayload(
+        json.dumps(documents, separators=(",", ":"), default=str).encode("utf-8")
+    )
+
+
+class StaticCatalog:
+    """Immutable in-memory snapshot of the static collections, keyed by uniqueName."""
+
+    def __init__(
+        self,
+        version: Optional[str],
+        collections: Dict[str, Dict[str, dict]],
+        abilities: Dict[str, List[dict]],
+    ):
+        self.version = version
+        self.loaded_at = datetime.now()
+        self._collections: Mapping[str, Mapping[str, dict]] = MappingProxyType(
+            {name: MappingProxyType(docs) for name, docs in collections.items()}
+        )
+        self._abilities: Mapping[str, Tuple[dict, ...]] = MappingProxyType(
+            {name: tuple(items) for name, items in abilities.items()}
+        )
+        # Serialized projections, computed once per catalog version
+        self._payloads: Dict[Tuple[str, Tuple[str, ...]], CatalogPayload] = {}
+
+    def get(self, collection: str, unique_name: str) -> Optional[dict]:
+        """Return a copy of a document, so callers can enrich it freely."""
+        doc = self._collections.get(collection, {}).get(unique_name)
+        return dict(doc) if doc is not None else None
+
+    def has(self, collection: str, unique_name: str) -> bool:
+        return unique_name in self._collections.get(collection, {})
+
+    def missing(self, collection: str, unique_names: Iterable[str]) -> Set[str]:
+        docs = self._collections.get(collection, {})
+        return {name for name in unique_names if name not in docs}
+
+    def all(self, collection: str) -> List[dict]:
+        return [dict(doc) for doc in self._collections.get(collection, {}).values()]
+
+    def project(self, collection: str, fields: Iterable[str]) -> List[dict]:
+        """Return every document reduced to the given fields, like a Mongo projection."""
+        fields = list(fields)
+        return [
+            {field: doc[field] for field in fields if field in doc}
+            for doc in self._collections.get(collection, {}).values()
+        ]
+
+    def payload(self, collection: str, fields: Iterable[str]) -> CatalogPayload:
+        """Return a collection projection serialized as JSON, built on first use."""
+        key = (collection, tuple(fields))
+        payload = self._payloads.get(key)
+        if payload is None:
+            payload = build_payload(self.project(collection, key[1]))
+            self._payloads[key] = payload
+        return payload
+
+    def abilities(self, warframe_unique_name: str) -> List[dict]:
+        abilities = self._abilities.get(warframe_unique_name, ())
+        return [dict(ability) for ability in abilities]
+
+    def count(self, collection: str) -> int:
+        return len(self._collections.get(collection, {}))
+
+
+async def load_catalog(db: AsyncIOMotorDatabase, version: Optional[str]) -> StaticCatalog:
+    """Read every static collection into a new StaticCatalog."""
+    collections: Dict[str, Dict[str, dict]] = {}
+    for name in CATALOG_COLLECTIONS:
+        docs: Dict[str, dict] = {}
+        async for doc in db[name].find({}):
+            unique_name = doc.get("uniqueName")
+            if unique_name:
+                docs[unique_name] = doc
+        collections[name] = docs
+
+    abilities: Dict[str, List[dict]] = {}
+    async for ability in db["warframe_abilities"].find(
+        {},
+        {
+            "_id": 0,
+            "warframe_uniqueName": 1,
+            "abilityUniqueName": 1,
+            "abilityName": 1,
+            "description": 1,
+        },
+    ):
+        warframe_unique_name = ability.pop("warframe_uniqueName", None)
+        if warframe_unique_name:
+            abilities.setdefault(warframe_unique_name, []).append(ability)
+
+    return StaticCatalog(version, collections, abilities)
+
+
+class CatalogManager:
+    """Keeps the current StaticCatalog, hot-swapping it when db_init stamps a new version."""
+
+    version_id = CATALOG_VERSION_ID
+    description = "static catalog"
+
+    def __init__(self, db: AsyncIOMotorDatabase, interval: int = CATALOG_POLL_INTERVAL):
+        self.db = db
+        self.interval = interval
+        self.current = None
+        self.stop_requested = False
+        self._lock = asyncio.Lock()
+
+    async def _read_version(self) -> Optional[str]:
+        meta = await self.db[META_COLLECTION].find_one({"_id": self.version_id})
+        return meta.get("version") if meta else None
+
+    async def load(self, version: Optional[str]) -> StaticCatalog:
+        return await load_catalog(self.db, version)
+
+    def summary(self, catalog: StaticCatalog) -> str:
+        return ", ".join(f"{name}={catalog.count(name)}" for name in CATALOG_COLLECTIONS)
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Reload if the stamped version changed. Returns True if it was swapped."""
+        async with self._lock:
+            version = await self._read_version()
+            if not force and self.current is not None and self.current.version == version:
+                return False
+
+            loaded = await self.load(version)
+            # A single reference assignment: readers see either the old or the new data
+            self.current = loaded
+            logger.info(
+                f"Loaded {self.description} version {version} ({self.summary(loaded)})"
+            )
+            return True
+
+    async def watch(self) -> None:
+        """Poll the stamped version and reload on change."""
+        while not self.stop_requested:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"{self.description.capitalize()} refresh error: {e}")
+
+
+# Global manager instance
+_catalog_manager: Optional[CatalogManager] = None
+
+
+def get_catalog_manager() -> Optional[CatalogManager]:
+    """Get the global catalog manager instance."""
+    return _catalog_manager
+
+
+def set_catalog_manager(manager: Optional[CatalogManager]) -> None:
+    """Set the global catalog manager instance."""
+    global _catalog_manager
+    _catalog_manager = manager
+
+
+def get_catalog() -> Optional[StaticCatalog]:
+    """Get the current static catalog, or None if it is not loaded."""
+    return _catalog_manager.current if _catalog_manager else None
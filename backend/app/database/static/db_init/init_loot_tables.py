@@ -1,25 +1,92 @@
 import logging
 import re
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import requests
 from bs4 import BeautifulSoup
 from pymongo import MongoClient
 from pymongo.errors import PyMongoError
 
-from database.db import get_value_by_field
+from database.static.drop_index import DROPS_COLLECTION
+from database.static.search import search_fields
 
 logger = logging.getLogger(__name__)
 
 # -------------------------------------------------------------------------------------------------
 
 
+def parse_chance(text: str) -> Optional[float]:
+    """Parse a drop chance such as '12.50%' into a percentage (12.5)."""
+    match = re.search(r"(\d+(?:\.\d+)?)", text or "")
+    return float(match.group(1)) if match else None
+
+
+def parse_rotation(text: Optional[str]) -> Optional[str]:
+    """Reduce 'Rotation A' (or any header containing it) to 'A'."""
+    match = re.search(r"Rotation\s+([A-Z])", text or "")
+    return match.group(1) if match else None
+
+
+def make_drop(
+    item: str,
+    source: str,
+    source_type: str,
+    chance: str,
+    rotation: Optional[str] = None,
+    stage: Optional[str] = None,
+    **extra,
+) -> Dict:
+    """Build one normalized document of the drops collection."""
+    item = item.strip()
+    source = source.strip()
+    return {
+        "item": item,
+        "source": source,
+        "source_type": source_type,
+        "rotation": parse_rotation(rotation),
+        "stage": stage,
+        "chance": parse_chance(chance),
+        **extra,
+        **search_fields(item),
+        **{f"source_{key}": value for key, value in search_fields(source).items()},
+    }
+
+
+def insert_drops(client: MongoClient, db_name: str, drops: List[Dict]) -> None:
+    try:
+        if drops:
+            client[db_name][DROPS_COLLECTION].insert_many(drops, ordered=False)
+            logger.info(f"Inserted {len(drops)} drops")
+    except PyMongoError as e:
+        logger.error(f"Error inserting drops: {e}")
+
+
+def parse_item_row(item_name: str, probability: str) -> Optional[str]:
+    """Return the chance part of a '<rarity> (<chance>%)' cell, or None."""
+    prob_match = re.match(r"(.+?) \(([\d.]+%?)\)", probability.strip())
+    if not prob_match or not item_name.strip():
+        return None
+    return prob_match.group(2).strip()
+
+
+# -------------------------------------------------------------------------------------------------
+
+
 def handle_missions(
     row_list: List[str],
     client: MongoClient,
     db_name: str,
 ) -> None:
-    items = dict()
+    # Missions known from ExportRegions, looked up once instead of once per drop
+    mission_names = {
+        mission["name"]: mission["mission_name"]
+        for mission in client[db_name]["missions"].find(
+            {}, {"name": 1, "mission_name": 1}
+        )
+        if mission.get("name")
+    }
+
+    drops = []
     current_planet = ""
     current_mission_name = ""
     current_mission_type = ""
@@ -39,60 +106,27 @@ def handle_missions(
                     current_planet = planet.strip()
                     current_mission_name = name.strip()
                     current_mission_type = t.strip()
+                    current_rotation = ""
         elif len(row) == 2:
-            item_name, probability = row[0].strip(), row[1].strip()
-            prob_match = re.match(r"(.+?) \(([\d.]+%?)\)", probability)
-            if prob_match:
-                _, p_value = prob_match.groups()
-                items[item_name.strip()] = {
-                    "name": item_name.strip(),
-                    "source": current_mission_name,
-                    "chance": p_value.strip(),
-                    "rotation": current_rotation.strip(),
-                    "planet": current_planet,
-                    "type": current_mission_type,
-                }
+            p_value = parse_item_row(row[0], row[1])
+            if p_value is not None:
+                mission_uniqueName = mission_names.get(current_mission_name)
+                drops.append(
+                    make_drop(
+                        row[0],
+                        f"{current_planet}, {current_mission_name} ({current_mission_type})",
+                        "mission" if mission_uniqueName else "auxiliary_mission",
+                        p_value,
+                        current_rotation,
+                        mission_name=mission_uniqueName,
+                        planet=current_planet,
+                        mission_type=current_mission_type,
+                    )
+                )
         else:
             continue
 
-    # Update missions loot-tables
-    try:
-        for item in items.values():
-            mission_uniqueName = get_value_by_field(
-                client, db_name, "missions", "name", item["source"], "mission_name"
-            )
-            res = client[db_name]["missions"].update_one(
-                {"mission_name": mission_uniqueName},
-                {
-                    "$addToSet": {
-                        "drops": {
-                            "item": item["name"],
-                            "chance": item["chance"],
-                            "rotation": item["rotation"]
-                            if item["rotation"] != ""
-                            else None,
-                        }
-                    }
-                },
-            )
-            if res.matched_count == 0:
-                logger.info(
-                    f'Inserting new drop source: "{item["planet"]}, {item["source"]} ({item["type"]})" not found as mission, inserted as "auxiliary_mission"'
-                )
-                db = client[db_name]
-                collection = db["drop_sources"]
-                collection.insert_one(
-                    {
-                        "name": item["name"],
-                        "chance": item["chance"],
-                        "source": f"{item['planet']}, {item['source']} ({item['type']})",
-                        "source_type": "auxiliary_mission",
-                        "rotation": item["rotation"],
-                    }
-                )
-    except PyMongoError as e:
-        logger.error(f"Error updating mission loot-tables: {e}")
-        raise
+    insert_drops(client, db_name, drops)
 
 
 def handle_keys(
@@ -100,7 +134,7 @@ def handle_keys(
     client: MongoClient,
     db_name: str,
 ) -> None:
-    items = dict()
+    drops = []
     current_key_name = ""
     current_rotation = ""
     cursor = 0
@@ -112,29 +146,17 @@ def handle_keys(
                 current_rotation = row[0]
             else:
                 current_key_name = row[0]
+                current_rotation = ""
         elif len(row) == 2:
-            item_name, probability = row[0].strip(), row[1].strip()
-            prob_match = re.match(r"(.+?) \(([\d.]+%?)\)", probability)
-            if prob_match:
-                _, p_value = prob_match.groups()
-                items[item_name.strip()] = {
-                    "name": item_name.strip(),
-                    "chance": p_value.strip(),
-                    "source": current_key_name.strip(),
-                    "source_type": "key",
-                    "rotation": current_rotation.strip(),
-                }
+            p_value = parse_item_row(row[0], row[1])
+            if p_value is not None:
+                drops.append(
+                    make_drop(row[0], current_key_name, "key", p_value, current_rotation)
+                )
         else:
             continue
 
-    try:
-        db = client[db_name]
-        collection = db["drop_sources"]
-        if list(items.values()):
-            collection.insert_many(items.values())
-            logger.info(f"Inserted {len(items)} drop sources")
-    except PyMongoError as e:
-        logger.error(f"Error inserting drop sources: {e}")
+    insert_drops(client, db_name, drops)
 
 
 def handle_dynamic_location_items(
@@ -143,14 +165,11 @@ def handle_dynamic_location_items(
     db_name: str,
 ) -> None:
     # Early cleanup
-    for sub_list in row_list:
-        for element in sub_list:
-            if element == "":
-                sub_list.remove(element)
+    row_list = [[element for element in sub_list if element != ""] for sub_list in row_list]
 
-    items = dict()
+    drops = []
     current_dynamic_location_name = ""
-    current_rotation: str | None = ""
+    current_rotation = ""
     cursor = 0
     while cursor < len(row_list):
         row = row_list[cursor]
@@ -160,29 +179,23 @@ def handle_dynamic_location_items(
                 current_rotation = row[0]
             else:
                 current_dynamic_location_name = row[0]
+                current_rotation = ""
         elif len(row) == 2:
-            item_name, probability = row[0].strip(), row[1].strip()
-            prob_match = re.match(r"(.+?) \(([\d.]+%?)\)", probability)
-            if prob_match:
-                _, p_value = prob_match.groups()
-                items[item_name.strip()] = {
-                    "name": item_name.strip(),
-                    "source": current_dynamic_location_name.strip(),
-                    "type": "dynamic_location",
-                    "chance": p_value.strip(),
-                    "rotation": current_rotation.strip() if current_rotation else None,
-                }
+            p_value = parse_item_row(row[0], row[1])
+            if p_value is not None:
+                drops.append(
+                    make_drop(
+                        row[0],
+                        current_dynamic_location_name,
+                        "dynamic_location",
+                        p_value,
+                        current_rotation,
+                    )
+                )
         else:
             continue
 
-    try:
-        db = client[db_name]
-        collection = db["drop_sources"]
-        if list(items.values()):
-            collection.insert_many(items.values())
-            logger.info(f"Inserted {len(items)} drop sources")
-    except PyMongoError as e:
-        logger.error(f"Error inserting drop sources: {e}")
+    insert_drops(client, db_name, drops)
 
 
 def handle_sorties(
@@ -190,34 +203,14 @@ def handle_sorties(
     client: MongoClient,
     db_name: str,
 ) -> None:
-    items = dict()
-    cursor = 0
-    while cursor < len(row_list):
-        row = row_list[cursor]
-        cursor += 1
+    drops = []
+    for row in row_list:
         if len(row) == 2:
-            item_name, probability = row[0].strip(), row[1].strip()
-            prob_match = re.match(r"(.+?) \(([\d.]+%?)\)", probability)
-            if prob_match:
-                _, p_value = prob_match.groups()
-                items[item_name.strip()] = {
-                    "name": item_name.strip(),
-                    "source": "Sortie",
-                    "source_type": "sortie",
-                    "chance": p_value.strip(),
-                    "rotation": None,
-                }
-        else:
-            continue
+            p_value = parse_item_row(row[0], row[1])
+            if p_value is not None:
+                drops.append(make_drop(row[0], "Sortie", "sortie", p_value))
 
-    try:
-        db = client[db_name]
-        collection = db["drop_sources"]
-        if list(items.values()):
-            collection.insert_many(items.values())
-            logger.info(f"Inserted {len(items)} drop sources")
-    except PyMongoError as e:
-        logger.error(f"Error inserting drop sources: {e}")
+    insert_drops(client, db_name, drops)
 
 
 def handle_bounty_items(
@@ -232,7 +225,7 @@ def handle_bounty_items(
         parts = re.split(r",\s*|\s+and\s+", s)
         return [re.sub(r"\band\b", "", part).strip() for part in parts if part.strip()]
 
-    items = dict()
+    drops = []
     cursor = 0
     current_level_name = ""
     current_rotation = ""
@@ -248,28 +241,22 @@ def handle_bounty_items(
         elif len(row) == 2:
             current_stages = parse_stages(row[1])
         elif len(row) == 3:
-            item_name, probability = row[1].strip(), row[2].strip()
-            prob_match = re.match(r"(.+?) \(([\d.]+%?)\)", probability)
-            if prob_match:
-                _, p_value = prob_match.groups()
-                items[item_name.strip()] = {
-                    "name": item_name.strip(),
-                    "source": mission_title + " " + current_level_name,
-                    "source_type": "bounty",
-                    "chance": p_value.strip(),
-                    "rotation": f"{current_rotation} ({', '.join(current_stages)})",
-                }
+            p_value = parse_item_row(row[1], row[2])
+            if p_value is not None:
+                drops.append(
+                    make_drop(
+                        row[1],
+                        mission_title + " " + current_level_name,
+                        "bounty",
+                        p_value,
+                        current_rotation,
+                        ", ".join(current_stages) or None,
+                    )
+                )
         else:
             continue
 
-    try:
-        db = client[db_name]
-        collection = db["drop_sources"]
-        if list(items.values()):
-            collection.insert_many(items.values())
-            logger.info(f"Inserted {len(items)} drop sources")
-    except PyMongoError as e:
-        logger.error(f"Error inserting drop sources: {e}")
+    insert_drops(client, db_name, drops)
 
 
 def handle_general_drops(
@@ -278,7 +265,7 @@ def handle_general_drops(
     client: MongoClient,
     db_name: str,
 ) -> None:
-    items = dict()
+    drops = []
     cursor = 0
     current_source_name = ""
     current_global_drop_chance = ""
@@ -295,28 +282,21 @@ def handle_general_drops(
         elif len(row) == 3:
             if row[0] == "Source":
                 continue
-            item_name, probability = row[1].strip(), row[2].strip()
-            prob_match = re.match(r"(.+?) \(([\d.]+%?)\)", probability)
-            if prob_match:
-                _, p_value = prob_match.groups()
-                items[item_name.strip()] = {
-                    "name": item_name.strip(),
-                    "source": f"{current_source_name.strip()} ({current_global_drop_chance.strip()}%)",
-                    "source_type": "general_drop",
-                    "chance": p_value.strip(),
-                    "rotation": None,
-                }
+            p_value = parse_item_row(row[1], row[2])
+            if p_value is not None:
+                drops.append(
+                    make_drop(
+                        row[1],
+                        current_source_name,
+                        "general_drop",
+                        p_value,
+                        source_chance=parse_chance(current_global_drop_chance),
+                    )
+                )
         else:
             continue
 
-    try:
-        db = client[db_name]
-        collection = db["drop_sources"]
-        if list(items.values()):
-            collection.insert_many(items.values())
-            logger.info(f"Inserted {len(items)} drop sources")
-    except PyMongoError as e:
-        logger.error(f"Error inserting drop sources: {e}")
+    insert_drops(client, db_name, drops)
 
 
 # -------------------------------------------------------------------------------------------------
@@ -394,7 +374,22 @@ def init_loot_tables(
     if last_header:
         handle_read_values(last_header, reading_list, client, db_name)
 
+    index_loot_tables(client, db_name)
+
     return True
 
 
-# -------------------------------------------------------------------------------------------------
+def index_loot_tables(client: MongoClient, db_name: str = "cephalon_onni") -> None:
+    """Create the indexes of the drops collection."""
+    collection = client[db_name][DROPS_COLLECTION]
+    try:
+        collection.create_index([("item", 1), ("chance", -1)])
+        collection.create_index([("source", 1), ("rotation", 1)])
+        collection.create_index("search_grams")
+        collection.create_index([("source_type", 1), ("search_key", 1)])
+        collection.create_index("search_key")
+        collection.create_index("source_search_grams")
+        collection.create_index("source_search_key")
+        logger.info(f"Indexed {collection.estimated_document_count()} drops")
+    except PyMongoError as e:
+        logger.error(f"Error indexing drops: {e}")
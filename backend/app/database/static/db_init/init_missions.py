@@ -52,7 +52,7 @@ def fill_missions_db(
                 "node_type": mission.get("nodeType"),
                 "system_index": mission.get("systemIndex"),
                 "system_name": mission.get("systemName"),
-                "drops": [],  # NOTE: Is later added by "init_loot_tables.py"
+                # NOTE: Drops live in the "drops" collection, filled by "init_loot_tables.py"
             }
 
             ops.append(
@@ -0,0 +1,203 @@
+import bisect
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import MongoClient
+
+from database.static.catalog import CatalogManager, stamp_static_version
+from database.static.repository import StaticRepository
+from database.static.search import GRAM_SIZE, normalize_search_key, search_grams
+
+logger = logging.getLogger(__name__)
+
+DROP_TABLES_VERSION_ID = "drop_tables"
+
+# Flat collection of every drop, one document per (item, source, rotation, stage)
+DROPS_COLLECTION = "drops"
+
+
+def stamp_drop_tables_version(
+    client: MongoClient, db_name: str = "cephalon_onni"
+) -> str:
+    """Write a new drop-tables version, signaling running servers to rebuild the index."""
+    return stamp_static_version(client, DROP_TABLES_VERSION_ID, db_name)
+
+
+class DropEntry(NamedTuple):
+    """One item dropped by one source, as stored in the drops collection."""
+
+    item: str
+    source: str
+    source_type: str
+    source_id: str
+    chance: Optional[float]
+    rotation: Optional[str]
+
+
+def _by_chance(entry: DropEntry) -> tuple:
+    """Highest chance first, unknown chances last, as sorting on chance -1."""
+    return (entry.chance is None, -(entry.chance or 0))
+
+
+def _by_rotation(entry: DropEntry) -> tuple:
+    """No rotation first, then A, B, C, each by chance: rotation 1, chance -1."""
+    return (entry.rotation is not None, entry.rotation or "", *_by_chance(entry))
+
+
+def _shortest(key: str) -> tuple:
+    return (len(key), key)
+
+
+class _NameIndex:
+    """Entries grouped by normalized name, resolvable from a partial name."""
+
+    def __init__(self, groups: Dict[str, List[DropEntry]], order: Callable[..., tuple]):
+        self.entries: Dict[str, Tuple[DropEntry, ...]] = {
+            key: tuple(sorted(group, key=order)) for key, group in groups.items() if key
+        }
+        # Sorted keys for prefixes, and the keys holding each trigram for substrings
+        self.keys = sorted(self.entries)
+        grams: Dict[str, List[str]] = {}
+        for key in self.keys:
+            for gram in search_grams(key):
+                grams.setdefault(gram, []).append(key)
+        self.grams: Dict[str, Tuple[str, ...]] = {
+            gram: tuple(keys) for gram, keys in grams.items()
+        }
+
+    def partial(self, key: str) -> Optional[str]:
+        """
+        The shortest key starting with, else containing, key. Like search_filter, a key
+        shorter than a trigram only matches prefixes.
+        """
+        start = bisect.bisect_left(self.keys, key)
+        end = bisect.bisect_left(self.keys, key + "\uffff", start)
+        if start < end:
+            return min(self.keys[start:end], key=_shortest)
+        if len(key) < GRAM_SIZE:
+            return None
+
+        # Only the keys holding every trigram of the query can contain it: start from
+        # the rarest trigram, so the work is bounded by its number of keys
+        postings = sorted(
+            (self.grams.get(gram, ()) for gram in search_grams(key)), key=len
+        )
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(keys)
+        containing = [candidate for candidate in candidates if key in candidate]
+        return min(containing, key=_shortest) if containing else None
+
+
+class DropIndex:
+    """Immutable inverted index of the drop tables: item -> sources and source -> items."""
+
+    def __init__(self, version: Optional[str], entries: List[DropEntry]):
+        self.version = version
+        self.loaded_at = datetime.now()
+
+        by_item: Dict[str, List[DropEntry]] = {}
+        by_source: Dict[str, List[DropEntry]] = {}
+        for entry in entries:
+            by_item.setdefault(normalize_search_key(entry.item), []).append(entry)
+            by_source.setdefault(normalize_search_key(entry.source), []).append(entry)
+
+        # An item's sources by chance, a source's items by rotation then chance, as
+        # the drops collection sorts them
+        self._items = _NameIndex(by_item, _by_chance)
+        self._sources = _NameIndex(by_source, _by_rotation)
+
+    def resolve(self, name: str) -> Optional[Tuple[str, Tuple[DropEntry, ...]]]:
+        """
+        ("item", its sources) or ("source", its items) for a name: an exact item, else
+        an exact source, else the best partial item, else the best partial source.
+        """
+        key = normalize_search_key(name)
+        if not key:
+            return None
+        if key in self._items.entries:
+            return "item", self._items.entries[key]
+        if key in self._sources.entries:
+            return "source", self._sources.entries[key]
+
+        item = self._items.partial(key)
+        if item is not None:
+            return "item", self._items.entries[item]
+        source = self._sources.partial(key)
+        if source is not None:
+            return "source", self._sources.entries[source]
+        return None
+
+    def count(self) -> int:
+        return sum(len(entries) for entries in self._items.entries.values())
+
+
+async def shortest_drop_name(
+    repository: StaticRepository, field: str, query: Dict[str, Any]
+) -> Optional[str]:
+    """
+    The value of field (item or source) with the shortest search key among the drops
+    matching query, as DropIndex resolves partial names; None if none match.
+    """
+    if not query:
+        return None
+    names = await repository.collection(DROPS_COLLECTION).distinct(field, query)
+    keys = {normalize_search_key(name): name for name in names}
+    keys.pop("", None)
+    return keys[min(keys, key=_shortest)] if keys else None
+
+
+async def load_drop_index(db: AsyncIOMotorDatabase, version: Optional[str]) -> DropIndex:
+    """Read the drops collection into a new DropIndex."""
+    entries: List[DropEntry] = []
+    async for drop in db[DROPS_COLLECTION].find(
+        {}, {"item": 1, "source": 1, "source_type": 1, "chance": 1, "rotation": 1}
+    ):
+        entries.append(
+            DropEntry(
+                item=drop.get("item", ""),
+                source=drop.get("source", ""),
+                source_type=drop.get("source_type", "drop_source"),
+                source_id=str(drop["_id"]),
+                chance=drop.get("chance"),
+                rotation=drop.get("rotation"),
+            )
+        )
+    return DropIndex(version, entries)
+
+
+class DropIndexManager(CatalogManager):
+    """Keeps the current DropIndex, rebuilding it when the drop tables are re-ingested."""
+
+    version_id = DROP_TABLES_VERSION_ID
+    description = "drop index"
+
+    async def load(self, version: Optional[str]) -> DropIndex:
+        return await load_drop_index(self.db, version)
+
+    def summary(self, drop_index: DropIndex) -> str:
+        return f"{drop_index.count()} drops"
+
+
+# Global manager instance
+_drop_index_manager: Optional[DropIndexManager] = None
+
+
+def get_drop_index_manager() -> Optional[DropIndexManager]:
+    """Get the global drop index manager instance."""
+    return _drop_index_manager
+
+
+def set_drop_index_manager(manager: Optional[DropIndexManager]) -> None:
+    """Set the global drop index manager instance."""
+    global _drop_index_manager
+    _drop_index_manager = manager
+
+
+def get_drop_index() -> Optional[DropIndex]:
+    """Get the current drop index, or None if it is not built."""
+    return _drop_index_manager.current if _drop_index_manager else None
@@ -0,0 +1,158 @@
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from database.static.catalog import META_COLLECTION
+from database.static.drop_index import (
+    DROP_TABLES_VERSION_ID,
+    DROPS_COLLECTION,
+    get_drop_index,
+    shortest_drop_name,
+)
+from database.static.repository import StaticRepository
+from database.static.search import normalize_search_key, search_filter
+
+# Rotation reward cycle of endless missions is A, A, B, C: share of rewards rolled on each table
+ROTATION_WEIGHTS = {"A": 0.5, "B": 0.25, "C": 0.25}
+# Sources whose rotations follow that cycle; a bounty rotation is rolled once per stage
+ROTATION_SOURCE_TYPES = ["mission", "auxiliary_mission"]
+
+
+def rotation_weight(source_type: Optional[str], rotation: Optional[str]) -> float:
+    """Share of a source's reward rolls made on a rotation's table."""
+    if source_type not in ROTATION_SOURCE_TYPES:
+        return 1
+    return ROTATION_WEIGHTS.get(rotation, 1)
+
+# Rankings kept per drop-tables version before the least recently used is dropped
+FARMING_CACHE_SIZE = int(os.getenv("FARMING_CACHE_SIZE", "1024"))
+
+
+def farming_pipeline(item: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Rank the sources of an item by expected runs (reward rolls) to get it.
+
+    probability = chance * rotation weight (mission rotations only) * chance of the
+    table itself (enemy drop tables), and expected_runs = 1 / probability. The $match
+    uses the (item, chance) index.
+    """
+    rotational = {"$in": ["$source_type", ROTATION_SOURCE_TYPES]}
+    weight_branches = [
+        {
+            "case": {"$and": [rotational, {"$eq": ["$rotation", rotation]}]},
+            "then": weight,
+        }
+        for rotation, weight in ROTATION_WEIGHTS.items()
+    ]
+    return [
+        {"$match": {"item": item, "chance": {"$gt": 0}}},
+        {
+            "$addFields": {
+                "rotation_weight": {"$switch": {"branches": weight_branches, "default": 1}}
+            }
+        },
+        {
+            "$addFields": {
+                "probability": {
+                    "$multiply": [
+                        {"$divide": ["$chance", 100]},
+                        "$rotation_weight",
+                        {"$divide": [{"$ifNull": ["$source_chance", 100]}, 100]},
+                    ]
+                }
+            }
+        },
+        {"$match": {"probability": {"$gt": 0}}},
+        {"$addFields": {"expected_runs": {"$divide": [1, "$probability"]}}},
+        {"$sort": {"expected_runs": 1, "source": 1}},
+        {"$limit": limit},
+        {
+            "$project": {
+                "_id": 0,
+                "source": 1,
+                "source_type": 1,
+                "rotation": 1,
+                "stage": 1,
+                "chance": 1,
+                "rotation_weight": 1,
+                "probability": 1,
+                "expected_runs": 1,
+            }
+        },
+    ]
+
+
+class FarmingCache:
+    """
+    Ranked sources per item, least recently used first and at most max_size of them,
+    dropped as a whole when the drop-tables version changes.
+    """
+
+    def __init__(self, max_size: int = FARMING_CACHE_SIZE):
+        self.version: Optional[str] = None
+        self.max_size = max_size
+        self._results: "OrderedDict[Tuple[str, int], Tuple[str, List[dict]]]" = (
+            OrderedDict()
+        )
+
+    def get(self, version: str, key: Tuple[str, int]) -> Optional[Tuple[str, List[dict]]]:
+        if version != self.version or key not in self._results:
+            return None
+        self._results.move_to_end(key)
+        return self._results[key]
+
+    def put(self, version: str, key: Tuple[str, int], value: Tuple[str, List[dict]]):
+        if version != self.version:
+            self.version = version
+            self._results.clear()
+        self._results[key] = value
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+
+farming_cache = FarmingCache()
+
+
+async def drop_tables_version(repository: StaticRepository) -> Optional[str]:
+    """Version stamped after the last loot-table ingest."""
+    drop_index = get_drop_index()
+    if drop_index is not None:
+        return drop_index.version
+
+    meta = await repository.find_one(META_COLLECTION, {"_id": DROP_TABLES_VERSION_ID})
+    return meta.get("version") if meta else None
+
+
+async def best_farming_sources(
+    repository: StaticRepository, name: str, limit: int = 20
+) -> Tuple[Optional[str], Optional[str], List[dict]]:
+    """
+    Resolve an item name and rank its sources. Returns (version, item, sources), with
+    item None if no item matches the name.
+    """
+    version = await drop_tables_version(repository)
+    key = (normalize_search_key(name), limit)
+    if version is not None:
+        cached = farming_cache.get(version, key)
+        if cached is not None:
+            return version, cached[0], cached[1]
+
+    # The exact name, else the shortest name containing it
+    match = await repository.find_one(
+        DROPS_COLLECTION, {"search_key": key[0]}, {"item": 1}
+    )
+    if match:
+        item = match["item"]
+    else:
+        item = await shortest_drop_name(repository, "item", search_filter(name))
+    if item is None:
+        return version, None, []
+
+    sources = await repository.collection(DROPS_COLLECTION).aggregate(
+        farming_pipeline(item, limit)
+    ).to_list(length=None)
+
+    if version is not None:
+        farming_cache.put(version, key, (item, sources))
+    return version, item, sources
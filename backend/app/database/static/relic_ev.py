@@ -0,0 +1,215 @@
+import logging
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pymongo import MongoClient, ReplaceOne
+from pymongo.errors import PyMongoError
+
+from database.static.drop_index import DROPS_COLLECTION
+from database.static.farming import rotation_weight
+from database.static.search import normalize_search_key, search_fields
+
+logger = logging.getLogger(__name__)
+
+RELIC_EV_COLLECTION = "relic_ev"
+
+RARITIES = ["COMMON", "UNCOMMON", "RARE"]
+REFINEMENTS = ["Intact", "Exceptional", "Flawless", "Radiant"]
+
+# Chance of each single reward, in percent, per refinement and rarity (3 common, 2 uncommon, 1 rare)
+REWARD_CHANCES = np.array(
+    [
+        [25.33, 11.0, 2.0],
+        [23.33, 13.0, 4.0],
+        [20.0, 17.0, 6.0],
+        [16.67, 20.0, 10.0],
+    ]
+)
+STANDARD_COUNTS = np.array([3, 2, 1])
+
+# Share of the whole reward table taken by each rarity, per refinement
+RARITY_SHARES = REWARD_CHANCES * STANDARD_COUNTS / 100
+
+# Catalog collections used to give reward paths a display name
+NAMED_COLLECTIONS = ["warframes", "weapons", "mods", "arcanes", "relics"]
+
+_REFINEMENT_SUFFIX = re.compile(r"\s+(Intact|Exceptional|Flawless|Radiant)$", re.IGNORECASE)
+
+
+def relic_base_name(name: str) -> str:
+    """'Lith A1 Intact' -> 'Lith A1', as relics are named in the drop tables (minus ' Relic')."""
+    return _REFINEMENT_SUFFIX.sub("", name.strip())
+
+
+def reward_chances(
+    relic_indices: np.ndarray, rarity_indices: np.ndarray, relic_count: int
+) -> np.ndarray:
+    """
+    Chance of every reward, for every refinement: shape (refinements, rewards).
+
+    Each rarity's share is split evenly among the relic's rewards of that rarity, and the
+    shares are renormalized when a relic lacks a rarity, all in a handful of array ops.
+    """
+    slots = relic_indices * len(RARITIES) + rarity_indices
+    counts = np.bincount(slots, minlength=relic_count * len(RARITIES)).reshape(
+        relic_count, len(RARITIES)
+    )
+    present = (counts > 0).astype(float)
+
+    # (refinements, relics): the part of the table actually covered by a relic's rarities
+    totals = RARITY_SHARES @ present.T
+
+    shares = RARITY_SHARES[:, rarity_indices]
+    per_reward = shares / counts[relic_indices, rarity_indices]
+    return per_reward / totals[:, relic_indices]
+
+
+def best_relic_sources(client: MongoClient, db_name: str) -> Dict[str, dict]:
+    """Cheapest drop source of every relic, by expected runs, keyed by relic base name."""
+    drops = list(
+        client[db_name][DROPS_COLLECTION].find(
+            {"item": {"$regex": r" Relic$"}, "chance": {"$gt": 0}},
+            {
+                "_id": 0,
+                "item": 1,
+                "source": 1,
+                "source_type": 1,
+                "rotation": 1,
+                "chance": 1,
+                "source_chance": 1,
+            },
+        )
+    )
+    if not drops:
+        return {}
+
+    chances = np.array([drop["chance"] for drop in drops]) / 100
+    weights = np.array(
+        [rotation_weight(drop.get("source_type"), drop.get("rotation")) for drop in drops]
+    )
+    table_chances = np.array([drop.get("source_chance") or 100 for drop in drops]) / 100
+    expected_runs = 1 / (chances * weights * table_chances)
+
+    best: Dict[str, dict] = {}
+    for drop, runs in zip(drops, expected_runs.tolist()):
+        name = drop["item"][: -len(" Relic")]
+        if name not in best or runs < best[name]["expected_runs"]:
+            best[name] = {
+                "source": drop["source"],
+                "rotation": drop.get("rotation"),
+                "chance": drop["chance"],
+                "expected_runs": runs,
+            }
+    return best
+
+
+def _display_names(client: MongoClient, db_name: str) -> Dict[str, str]:
+    names: Dict[str, str] = {}
+    for collection_name in NAMED_COLLECTIONS:
+        for doc in client[db_name][collection_name].find(
+            {}, {"_id": 0, "uniqueName": 1, "name": 1}
+        ):
+            if doc.get("uniqueName") and doc.get("name"):
+                names[doc["uniqueName"]] = doc["name"]
+    return names
+
+
+def reward_display_name(unique_name: str, names: Dict[str, str]) -> str:
+    """Name of a reward path, falling back to its last path segment."""
+    path = unique_name.replace("/StoreItems", "")
+    return names.get(unique_name) or names.get(path) or path.rsplit("/", 1)[-1]
+
+
+def compute_relic_ev(client: MongoClient, db_name: str = "cephalon_onni") -> int:
+    """
+    Precompute, for every relic and refinement, each reward's chance per opening and the
+    expected openings (and farming runs) to get it, into the relic_ev collection.
+    """
+    db = client[db_name]
+    relics: Dict[str, dict] = {}
+    for relic in db["relics"].find({}, {"_id": 0, "uniqueName": 1, "name": 1, "relicRewards": 1}):
+        base_name = relic_base_name(relic.get("name", ""))
+        # Every refinement of a relic has the same rewards: keep the first one seen
+        if base_name and relic.get("relicRewards") and base_name not in relics:
+            relics[base_name] = relic
+
+    rewards: List[Tuple[int, dict]] = []
+    for relic_index, relic in enumerate(relics.values()):
+        for reward in relic["relicRewards"]:
+            if str(reward.get("rarity", "")).upper() in RARITIES:
+                rewards.append((relic_index, reward))
+    if not rewards:
+        logger.info("No relic rewards to compute")
+        return 0
+
+    relic_indices = np.array([relic_index for relic_index, _ in rewards])
+    rarity_indices = np.array(
+        [RARITIES.index(reward["rarity"].upper()) for _, reward in rewards]
+    )
+    chances = reward_chances(relic_indices, rarity_indices, len(relics))
+    openings = 1 / chances
+
+    sources = best_relic_sources(client, db_name)
+    names = _display_names(client, db_name)
+
+    docs: Dict[str, dict] = {}
+    computed_at = datetime.now()
+    for base_name, relic in relics.items():
+        docs[base_name] = {
+            "relic": base_name,
+            "unique_name": relic.get("uniqueName"),
+            "era": base_name.split(" ", 1)[0],
+            "best_source": sources.get(base_name),
+            "refinements": {refinement: [] for refinement in REFINEMENTS},
+            "reward_keys": [],
+            "computed_at": computed_at,
+            **search_fields(base_name),
+        }
+
+    relic_names = list(relics)
+    for column, (relic_index, reward) in enumerate(rewards):
+        doc = docs[relic_names[relic_index]]
+        reward_name = reward_display_name(reward.get("rewardName", ""), names)
+        doc["reward_keys"].append(normalize_search_key(reward_name))
+        farm_runs = doc["best_source"]["expected_runs"] if doc["best_source"] else None
+        for level, refinement in enumerate(REFINEMENTS):
+            probability = float(chances[level, column])
+            doc["refinements"][refinement].append(
+                {
+                    "reward": reward_name,
+                    "reward_unique_name": reward.get("rewardName"),
+                    "rarity": reward["rarity"].upper(),
+                    "item_count": reward.get("itemCount", 1),
+                    "probability": probability,
+                    "expected_openings": float(openings[level, column]),
+                    "expected_farm_runs": farm_runs / probability if farm_runs else None,
+                }
+            )
+
+    try:
+        collection = db[RELIC_EV_COLLECTION]
+        collection.bulk_write(
+            [ReplaceOne({"relic": name}, doc, upsert=True) for name, doc in docs.items()],
+            ordered=False,
+        )
+        collection.delete_many({"computed_at": {"$lt": computed_at}})
+        collection.create_index("relic", unique=True)
+        collection.create_index("reward_keys")
+        collection.create_index("search_key")
+        logger.info(f"Computed expected values of {len(docs)} relics")
+    except PyMongoError as e:
+        logger.error(f"Error storing relic expected values: {e}")
+        return 0
+    return len(docs)
+
+
+def relic_ev_query(relic: Optional[str], reward: Optional[str]) -> Optional[dict]:
+    """Filter of the relic_ev documents of a relic, or of the relics giving a reward."""
+    if relic:
+        key = normalize_search_key(relic_base_name(relic))
+        return {"search_key": key[: -len(" relic")] if key.endswith(" relic") else key}
+    if reward:
+        return {"reward_keys": normalize_search_key(reward)}
+    return None
@@ -0,0 +1,70 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+class StaticRepository:
+    """Non-blocking access to the static collections through the Motor client."""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+
+    def collection(self, name: str):
+        return self.db[name]
+
+    async def find_one(
+        self,
+        collection_name: str,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[dict]:
+        return await self.db[collection_name].find_one(query, projection)
+
+    async def find(
+        self,
+        collection_name: str,
+        query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+    ) -> List[dict]:
+        cursor = self.db[collection_name].find(query or {}, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=None)
+
+    async def find_by_unique_names(
+        self,
+        collection_name: str,
+        unique_names: Iterable[str],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, dict]:
+        """Fetch several documents with a single $in query, keyed by uniqueName."""
+        names = list(set(unique_names))
+        if not names:
+            return {}
+        documents = await self.find(
+            collection_name, {"uniqueName": {"$in": names}}, projection
+        )
+        return {doc["uniqueName"]: doc for doc in documents}
+
+    async def missing_unique_names(
+        self, collection_name: str, unique_names: Iterable[str]
+    ) -> Set[str]:
+        """Return the uniqueNames that do not exist in a collection (single $in query)."""
+        wanted = set(unique_names)
+        if not wanted:
+            return set()
+        found = await self.db[collection_name].distinct(
+            "uniqueName", {"uniqueName": {"$in": list(wanted)}}
+        )
+        return wanted - set(found)
+
+
+def get_static_repository() -> StaticRepository:
+    """Get a repository bound to the shared async database."""
+    from database.db import db_manager
+
+    return StaticRepository(db_manager.async_db)
@@ -0,0 +1,54 @@
+import re
+import unicodedata
+from typing import Any, Dict, List
+
+# Queries shorter than a gram fall back to an (index-backed) prefix match
+GRAM_SIZE = 3
+
+
+def normalize_search_key(text: str) -> str:
+    """Lowercase, strip accents and collapse punctuation/whitespace to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", stripped.casefold()).split())
+
+
+def search_grams(text: str) -> List[str]:
+    """Distinct trigrams of the normalized text, stored in a multikey index."""
+    key = normalize_search_key(text)
+    if len(key) < GRAM_SIZE:
+        return [key] if key else []
+    return sorted({key[i : i + GRAM_SIZE] for i in range(len(key) - GRAM_SIZE + 1)})
+
+
+def search_fields(text: str) -> Dict[str, Any]:
+    """Fields written at ingest next to a searchable name."""
+    return {"search_key": normalize_search_key(text), "search_grams": search_grams(text)}
+
+
+def prefix_filter(text: str, prefix: str = "") -> Dict[str, Any]:
+    """Mongo filter for names starting with the text, answered by the search_key index."""
+    key = normalize_search_key(text)
+    if not key:
+        return {}
+    return {f"{prefix}search_key": {"$regex": f"^{re.escape(key)}"}}
+
+
+def search_filter(text: str, prefix: str = "") -> Dict[str, Any]:
+    """
+    Mongo filter for a case-insensitive substring match on a field indexed by search_fields.
+
+    The trigram condition is answered by the multikey index on search_grams, and the
+    escaped regex on search_key only confirms the few candidates it returns.
+    """
+    key = normalize_search_key(text)
+    if not key:
+        return {}
+
+    if len(key) < GRAM_SIZE:
+        return prefix_filter(key, prefix)
+
+    return {
+        f"{prefix}search_grams": {"$all": search_grams(key)},
+        f"{prefix}search_key": {"$regex": re.escape(key)},
+    }
@@ -11,6 +11,7 @@ from database.db import (
     list_tables,
     preview_table,
 )
+from database.static.catalog import stamp_catalog_version
 from database.static.db_init.init_images import create_images_database, fill_img_db
 from database.static.db_init.init_items import create_item_database
 from database.static.db_init.init_loot_tables import init_loot_tables
@@ -31,6 +32,8 @@ from database.static.db_init.init_weapons import (
     fill_weapons_db,
 )
 from database.static.db_init.json_collector import JsonCollector
+from database.static.drop_index import stamp_drop_tables_version
+from database.static.relic_ev import compute_relic_ev
 from models.static_models import (
     Arcana,
     FetchedMission,
@@ -132,6 +135,8 @@ def main() -> None:
                 "weapons",
                 "missions",
                 "relics",
+                "drops",
+                "drop_sources",
             ],
             confirm=not skip_confirmation,
         )
@@ -205,11 +210,20 @@ def main() -> None:
         )
         fill_relic_db(client, relics)
 
+        # Running servers reload their in-memory catalog when this version changes
+        stamp_catalog_version(client)
+
         # -----------------------------------------------------------------------------------------
 
         loot_table_url = "https://www.warframe.com/fr/droptables"
         init_loot_tables(client, loot_table_url)
 
+        # Running servers rebuild their drop index when this version changes
+        stamp_drop_tables_version(client)
+
+        # Relic expected values need both the relics and the drop tables
+        compute_relic_ev(client)
+
         # -----------------------------------------------------------------------------------------
 
         tables = list_tables(client)
@@ -1,7 +1,7 @@
-from database.db import connect_to_mongodb
 from database.dynamic.auth import decode_token
-from database.static.age_helper import AgeDB
+from database.static.age_async import AsyncAgeDB, get_async_age_pool
 from fastapi import HTTPException, Request
+from psycopg_pool import PoolTimeout
 
 
 def get_current_user(request: Request):
@@ -22,17 +22,20 @@ def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Token expired or invalid")
 
 
-def get_age_helper():
+async def get_async_age():
+    """AsyncAgeDB on a pooled async session, given back once the request is done."""
+    pool = get_async_age_pool()
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Graph database is not available")
     try:
-        return AgeDB()
+        conn = await pool.getconn()
+    except PoolTimeout as e:
+        raise HTTPException(status_code=503, detail=f"Graph database is busy: {e}")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to initialize graph connection: {e}"
         )
-
-
-def get_static_db_client():
-    client = connect_to_mongodb()
-    if not client:
-        raise HTTPException(status_code=500, detail="Failed to connect to the database")
-    yield client
+    try:
+        yield AsyncAgeDB(conn)
+    finally:
+        await pool.putconn(conn)
@@ -4,6 +4,7 @@ from typing import List, Optional
 
 import requests
 from bs4 import BeautifulSoup
+from database.static.age_bulk import GraphBulkLoader
 from database.static.age_helper import AgeDB
 
 # -------------------------------------------------------------------------------------------------
@@ -13,6 +14,7 @@ def handle_missions(
     row_list: List[str],
     saved_json_path: Optional[str] = None,
     clean_and_refill_age: bool = True,
+    loader: Optional[GraphBulkLoader] = None,
 ) -> None:
     # Build the graph
     graph_data = {"missions": {}, "items": {}, "relationships": {}}
@@ -66,7 +68,7 @@ def handle_missions(
 
     # Store it in age
     if clean_and_refill_age:
-        age = AgeDB()
+        age = loader if loader is not None else AgeDB()
         total_operations = (
             len(graph_data["missions"])
             + len(graph_data["items"])
@@ -131,6 +133,7 @@ def handle_relics(
     row_list: List[str],
     saved_json_path: Optional[str] = None,
     clean_and_refill_age: bool = True,
+    loader: Optional[GraphBulkLoader] = None,
 ) -> None:
     # Build the graph
     graph_data = {"relics": {}, "contents": {}, "relationships": {}}
@@ -167,7 +170,7 @@ def handle_relics(
 
     # Store it in age
     if clean_and_refill_age:
-        age = AgeDB()
+        age = loader if loader is not None else AgeDB()
         total_operations = (
             len(graph_data["relics"])
             + len(graph_data["contents"])
@@ -235,6 +238,7 @@ def handle_keys(
     row_list: List[str],
     saved_json_path: Optional[str] = None,
     clean_and_refill_age: bool = True,
+    loader: Optional[GraphBulkLoader] = None,
 ) -> None:
     # Build the graph
     graph_data = {"keys": {}, "items": {}, "relationships": {}}
@@ -278,7 +282,7 @@ def handle_keys(
 
     # Store it in age
     if clean_and_refill_age:
-        age = AgeDB()
+        age = loader if loader is not None else AgeDB()
         total_operations = (
             len(graph_data["keys"])
             + len(graph_data["items"])
@@ -344,6 +348,7 @@ def handle_dynamic_location_items(
     row_list: List[List[str]],
     saved_json_path: Optional[str] = None,
     clean_and_refill_age: bool = True,
+    loader: Optional[GraphBulkLoader] = None,
 ) -> None:
     for sub_list in row_list:
         for element in sub_list:
@@ -397,7 +402,7 @@ def handle_dynamic_location_items(
 
     # Store it in age
     if clean_and_refill_age:
-        age = AgeDB()
+        age = loader if loader is not None else AgeDB()
         total_operations = (
             len(graph_data["dynamic_locations"])
             + len(graph_data["items"])
@@ -465,6 +470,7 @@ def handle_sorties(
     row_list: List[List[str]],
     saved_json_path: Optional[str] = None,
     clean_and_refill_age: bool = True,
+    loader: Optional[GraphBulkLoader] = None,
 ) -> None:
     # Build the graph
     graph_data = {"sorties": {"name": "Sortie"}, "items": {}, "relationships": {}}
@@ -497,7 +503,7 @@ def handle_sorties(
 
     # Store it in age
     if clean_and_refill_age:
-        age = AgeDB()
+        age = loader if loader is not None else AgeDB()
         total_operations = (
             len(graph_data["sorties"])
             + len(graph_data["items"])
@@ -564,6 +570,7 @@ def handle_bounty_items(
     mission_title: str,
     saved_json_path: Optional[str] = None,
     clean_and_refill_age: bool = True,
+    loader: Optional[GraphBulkLoader] = None,
 ) -> None:
     def parse_stages(s):
         if s.strip() == "Final Stage":
@@ -636,7 +643,7 @@ def handle_bounty_items(
 
     # Store it in age
     if clean_and_refill_age:
-        age = AgeDB()
+        age = loader if loader is not None else AgeDB()
         total_operations = (
             len(graph_data["bounties"])
             + len(graph_data["levels"])
@@ -724,6 +731,7 @@ def handle_general_drops(
     title: str,
     saved_json_path: Optional[str] = None,
     clean_and_refill_age: bool = True,
+    loader: Optional[GraphBulkLoader] = None,
 ) -> None:
     # Build the graph
     graph_data = {
@@ -782,7 +790,7 @@ def handle_general_drops(
 
     # Store it in age
     if clean_and_refill_age:
-        age = AgeDB()
+        age = loader if loader is not None else AgeDB()
         total_operations = (
             len(graph_data["sources"])
             + len(graph_data["drops"])
@@ -854,22 +862,31 @@ def handle_read_values(
     reading_list: list,
     temp_files_save_path: Optional[str],
     clean_and_refill_age: bool = True,
+    loader: Optional[GraphBulkLoader] = None,
 ) -> None:
     if title is None:
         return
 
     if title == "Missions:":
-        handle_missions(reading_list, temp_files_save_path, clean_and_refill_age)
+        handle_missions(
+            reading_list, temp_files_save_path, clean_and_refill_age, loader
+        )
     elif title == "Relics:":
-        handle_relics(reading_list, temp_files_save_path, clean_and_refill_age)
+        handle_relics(
+            reading_list, temp_files_save_path, clean_and_refill_age, loader
+        )
     elif title == "Keys:":
-        handle_keys(reading_list, temp_files_save_path, clean_and_refill_age)
+        handle_keys(
+            reading_list, temp_files_save_path, clean_and_refill_age, loader
+        )
     elif title == "Dynamic Location Rewards:":
         handle_dynamic_location_items(
-            reading_list, temp_files_save_path, clean_and_refill_age
+            reading_list, temp_files_save_path, clean_and_refill_age, loader
         )
     elif title == "Sorties:":
-        handle_sorties(reading_list, temp_files_save_path, clean_and_refill_age)
+        handle_sorties(
+            reading_list, temp_files_save_path, clean_and_refill_age, loader
+        )
     elif title in [
         "Cetus Bounty Rewards:",
         "Orb Vallis Bounty Rewards:",
@@ -879,7 +896,11 @@ def handle_read_values(
         "Hex Bounty Rewards:",
     ]:
         handle_bounty_items(
-            reading_list, title[:-1], temp_files_save_path, clean_and_refill_age
+            reading_list,
+            title[:-1],
+            temp_files_save_path,
+            clean_and_refill_age,
+            loader,
         )
     elif title in [
         "Mod Drops by Mod:",
@@ -893,6 +914,7 @@ def handle_read_values(
             title.replace("/", "-"),
             temp_files_save_path,
             clean_and_refill_age,
+            loader,
         )
     else:
         raise ValueError(f"Unknown title: {title}")
@@ -902,8 +924,16 @@ def handle_read_values(
 
 
 def compute_drop_tables(
-    temp_files_save_path: Optional[str] = None, clean_and_refill_age: bool = True
+    temp_files_save_path: Optional[str] = None,
+    clean_and_refill_age: bool = True,
+    bulk: bool = True,
 ):
+    """
+    Parse the official drop tables and, if asked, rebuild the loot_tables graph.
+
+    With bulk, the whole graph is collected first and written in a single transaction
+    straight into AGE's label tables, instead of one MERGE statement per node and edge.
+    """
     if temp_files_save_path:
         os.makedirs(temp_files_save_path, exist_ok=True)
 
@@ -918,6 +948,8 @@ def compute_drop_tables(
         age.create_graph("loot_tables")
         age.close()
 
+    loader = GraphBulkLoader("loot_tables") if clean_and_refill_age and bulk else None
+
     soup = BeautifulSoup(resp.text, "lxml")
     tables = soup.find_all("table")
 
@@ -928,7 +960,11 @@ def compute_drop_tables(
         title = h3.get_text(strip=True) if h3 else None
         if title != last_header:
             handle_read_values(
-                last_header, reading_list, temp_files_save_path, clean_and_refill_age
+                last_header,
+                reading_list,
+                temp_files_save_path,
+                clean_and_refill_age,
+                loader,
             )
             last_header = title
             reading_list = []
@@ -941,7 +977,28 @@ def compute_drop_tables(
             reading_list.append(values)
     if last_header:
         handle_read_values(
-            last_header, reading_list, temp_files_save_path, clean_and_refill_age
+            last_header,
+            reading_list,
+            temp_files_save_path,
+            clean_and_refill_age,
+            loader,
+        )
+
+    if loader is not None:
+        vertices, edges = loader.pending()
+        print(f"Bulk loading {vertices} vertices and {edges} edges...", flush=True)
+        stats = loader.flush()
+        print(f"Loaded {stats.describe()}")
+
+    if clean_and_refill_age:
+        age = AgeDB()
+        indexes = age.ensure_name_indexes("loot_tables")
+        graph_stats = age.refresh_graph_stats("loot_tables")
+        age.close()
+        print(f"Ensured {len(indexes)} name indexes on the graph's vertex labels")
+        print(
+            f"Graph holds {graph_stats.totalNodes} vertices and "
+            f"{graph_stats.totalEdges} edges"
         )
 
     if temp_files_save_path:
@@ -981,6 +1038,11 @@ if __name__ == "__main__":
         default=False,
         help="Clean and refill AGE database (default: False)",
     )
+    parser.add_argument(
+        "--per-statement",
+        action="store_true",
+        help="Write the graph one MERGE per node and edge instead of bulk loading it",
+    )
 
     args = parser.parse_args()
     if args.output_path == "None":
@@ -988,4 +1050,6 @@ if __name__ == "__main__":
     else:
         output_path = args.output_path
 
-    compute_drop_tables(output_path, args.clean_and_refill_age)
+    compute_drop_tables(
+        output_path, args.clean_and_refill_age, bulk=not args.per_statement
+    )
@@ -5,11 +5,12 @@ import webbrowser
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
 from routers import (
+    admin_age,
     auth,
     builds,
     inventory,
@@ -20,6 +21,7 @@ from routers import (
     worldstate,
 )
 from routers.admin import user as admin_user
+from routers.admin.user import get_current_admin_user
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +35,60 @@ async def lifespan(application: FastAPI):
     application.state.client = db_manager.async_client
     application.state.db = db_manager.async_db
 
+    from database.dynamic.crud import ensure_build_indexes
+
+    await ensure_build_indexes()
+
+    from database.static.catalog import CatalogManager, set_catalog_manager
+
+    catalog_manager = CatalogManager(db_manager.async_db)
+    try:
+        await catalog_manager.refresh(force=True)
+    except Exception as e:
+        logger.error(f"Failed to load static catalog, falling back to MongoDB: {e}")
+    set_catalog_manager(catalog_manager)
+    catalog_task = asyncio.create_task(catalog_manager.watch())
+
+    from database.static.drop_index import DropIndexManager, set_drop_index_manager
+
+    drop_index_manager = DropIndexManager(db_manager.async_db)
+    try:
+        await drop_index_manager.refresh(force=True)
+    except Exception as e:
+        logger.error(f"Failed to build drop index, falling back to MongoDB: {e}")
+    set_drop_index_manager(drop_index_manager)
+    drop_index_task = asyncio.create_task(drop_index_manager.watch())
+
+    from database.static.autocomplete import (
+        AutocompleteManager,
+        set_autocomplete_manager,
+    )
+
+    autocomplete_manager = AutocompleteManager(db_manager.async_db)
+    try:
+        await autocomplete_manager.refresh(force=True)
+    except Exception as e:
+        logger.error(f"Failed to build autocomplete index: {e}")
+    set_autocomplete_manager(autocomplete_manager)
+    autocomplete_task = asyncio.create_task(autocomplete_manager.watch())
+
+    from database.static.age_async import (
+        AGE_POOL_TIMEOUT,
+        AsyncAgeDB,
+        create_async_age_pool,
+        set_async_age_pool,
+    )
+
+    age_pool = create_async_age_pool()
+    try:
+        # Open the first sessions now rather than on the first graph request
+        await age_pool.open(wait=True, timeout=AGE_POOL_TIMEOUT)
+        async with age_pool.connection() as conn:
+            await AsyncAgeDB(conn).ensure_graph_stats_table()
+    except Exception as e:
+        logger.error(f"Failed to prewarm AGE pool: {e}")
+    set_async_age_pool(age_pool)
+
     from services.worldstate import (
         WorldStateCache,
         WorldStateFetcher,
@@ -55,6 +111,29 @@ async def lifespan(application: FastAPI):
         await fetch_task
     except asyncio.CancelledError:
         pass
+    catalog_manager.stop_requested = True
+    catalog_task.cancel()
+    try:
+        await catalog_task
+    except asyncio.CancelledError:
+        pass
+    set_catalog_manager(None)
+    drop_index_manager.stop_requested = True
+    drop_index_task.cancel()
+    try:
+        await drop_index_task
+    except asyncio.CancelledError:
+        pass
+    set_drop_index_manager(None)
+    autocomplete_manager.stop_requested = True
+    autocomplete_task.cancel()
+    try:
+        await autocomplete_task
+    except asyncio.CancelledError:
+        pass
+    set_autocomplete_manager(None)
+    set_async_age_pool(None)
+    await age_pool.close()
     await cache.disconnect()
     db_manager.close_all()
 
@@ -121,6 +200,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 
 
 app.include_router(admin_user.router)
+app.include_router(admin_age.router, dependencies=[Depends(get_current_admin_user)])
 app.include_router(auth.router)
 app.include_router(inventory.router)
 app.include_router(loottables.router)
@@ -37,6 +37,7 @@ class CypherRequest(BaseModel):
 
 class NodeSearchResponse(BaseModel):
     nodes: List[GraphNode]
+    next_cursor: Optional[str] = None
 
 
 class NodeNeighbor(BaseModel):
@@ -58,3 +59,62 @@ class NodeNeighborsResponse(BaseModel):
 class GraphResponse(BaseModel):
     nodes: List[GraphNode]
     edges: List[GraphEdge]
+    next_cursor: Optional[str] = None
+
+
+class FarmingSource(BaseModel):
+    source: str
+    source_type: str
+    rotation: Optional[str] = None
+    stage: Optional[str] = None
+    chance: float
+    rotation_weight: float
+    probability: float
+    expected_runs: float
+
+
+class FarmingResponse(BaseModel):
+    item: str
+    sources: List[FarmingSource]
+    drop_tables_version: Optional[str] = None
+
+
+class AutocompleteSuggestion(BaseModel):
+    name: str
+    kind: str
+    popularity: int
+    distance: int
+    unique_name: Optional[str] = None
+
+
+class AutocompleteResponse(BaseModel):
+    suggestions: List[AutocompleteSuggestion]
+
+
+class RelicRewardEV(BaseModel):
+    reward: str
+    reward_unique_name: Optional[str] = None
+    rarity: str
+    item_count: int = 1
+    probability: float
+    expected_openings: float
+    expected_farm_runs: Optional[float] = None
+
+
+class RelicSource(BaseModel):
+    source: str
+    rotation: Optional[str] = None
+    chance: float
+    expected_runs: float
+
+
+class RelicEV(BaseModel):
+    relic: str
+    unique_name: Optional[str] = None
+    era: str
+    best_source: Optional[RelicSource] = None
+    refinements: Dict[str, List[RelicRewardEV]]
+
+
+class RelicEVResponse(BaseModel):
+    relics: List[RelicEV]
@@ -167,11 +167,26 @@ class BuildUpdate(BaseModel):
     melee_weapon: Optional[WeaponBuild] = None
 
 
+class BuildSnapshot(BaseModel):
+    """Static details resolved for a build, valid while catalog_version is current."""
+
+    catalog_version: Optional[str] = None
+    warframe: Optional[dict] = None
+    primary_weapon_details: Optional[dict] = None
+    secondary_weapon_details: Optional[dict] = None
+    melee_weapon_details: Optional[dict] = None
+    primary_arcane_details: Optional[dict] = None
+    secondary_arcane_details: Optional[dict] = None
+    melee_arcane_details: Optional[dict] = None
+    warframe_arcanes_details: List[dict] = []
+
+
 class BuildInDB(BuildBase):
     id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
     user_id: str
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
+    snapshot: Optional[BuildSnapshot] = None
 
     class Config:
         arbitrary_types_allowed = True
@@ -222,6 +237,11 @@ class BuildPublic(BaseModel):
         return v
 
 
+class BuildPage(BaseModel):
+    builds: List[BuildPublic]
+    next_cursor: Optional[str] = None
+
+
 class BuildWithDetails(BaseModel):
     id: str
     name: str
@@ -2,6 +2,7 @@ from typing import List, Optional
 
 from bson import ObjectId
 from database.db import db_manager
+from database.dynamic.crud import reconcile_build_counters
 from database.dynamic.auth import decode_token
 from database.dynamic.security import hash_password
 from fastapi import APIRouter, Depends, HTTPException, Request
@@ -144,3 +145,12 @@ async def create_admin_user(
         "username": username,
         "role": UserRole.ADMINISTRATOR,
     }
+
+
+@router.post("/builds/reconcile-counters")
+async def reconcile_build_counters_endpoint(
+    current_admin: dict = Depends(get_current_admin_user),
+):
+    """Reset every user's build quota counter from their actual builds (admin only)"""
+    corrected = await reconcile_build_counters()
+    return {"message": f"Reconciled build counters of {corrected} users"}
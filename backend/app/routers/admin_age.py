@@ -1,12 +1,18 @@
 import logging
+from collections import Counter
+from typing import Optional
 
-from database.static.age_helper import AgeDB, get_dict_from_agtype
-from dependencies import get_age_helper
+from database.static.age_async import AsyncAgeDB, get_async_age_pool
+from database.static.age_helper import validate_identifier
+from database.static.agtype import decode_agtype, decode_edge, decode_vertex
+from dependencies import get_async_age
 from fastapi import APIRouter, Depends, HTTPException
 from models.age_models import (
     CypherRequest,
     GraphEdge,
     GraphNode,
+    GraphResponse,
+    GraphStats,
     NodeNeighbor,
     NodeNeighborsResponse,
     NodeSearchResponse,
@@ -16,34 +22,60 @@ from models.age_models import (
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/admin/graph", tags=["graph"])
 
+SUBGRAPH_PAGE_SIZE = 100
+MAX_SUBGRAPH_PAGE_SIZE = 500
+MAX_SUBGRAPH_DEPTH = 3
+
+
+def _graph_id(value: str) -> int:
+    """A vertex or edge id from the path, as the integer AGE compares id() with."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid graph id: {value}")
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """Session pool metrics: size, available sessions and waiting requests."""
+    pool = get_async_age_pool()
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Graph session pool is not running")
+    return pool.get_stats()
+
 
 @router.post("/cypher")
-async def execute_cypher(request: CypherRequest, age: AgeDB = Depends(get_age_helper)):
+async def execute_cypher(
+    request: CypherRequest, age: AsyncAgeDB = Depends(get_async_age)
+):
     """Execute a custom Cypher query."""
     try:
-        result = age.cypher("loot_tables", request.query, "result agtype")
+        result = await age.cypher("loot_tables", request.query, "result agtype")
         return {"results": result}
     except Exception as e:
         raise HTTPException(
             status_code=400, detail=f"Failed to execute Cypher query: {e}"
         )
-    finally:
-        age.close()
 
 
 @router.post("/nodes", response_model=GraphNode)
-async def create_node(node: GraphNode, age: AgeDB = Depends(get_age_helper)):
+async def create_node(node: GraphNode, age: AsyncAgeDB = Depends(get_async_age)):
     """Create a new node."""
     try:
         # Create node properties
         properties = {"name": node.label, **node.properties}
 
-        age.create_node(
-            graph="loot_tables",
-            label=node.type,
-            properties=properties,
-            return_node=True,
-        )
+        async with age.transaction():
+            # MERGE creates nothing when the node already exists
+            created = not await age.match("loot_tables", node.type, properties, 1)
+            await age.create_node(
+                graph="loot_tables",
+                label=node.type,
+                properties=properties,
+                return_node=True,
+            )
+            if created:
+                await age.adjust_graph_stats("loot_tables", node.type, "v", 1)
 
         if properties:
             return GraphNode(
@@ -55,30 +87,34 @@ async def create_node(node: GraphNode, age: AgeDB = Depends(get_age_helper)):
             )
 
         raise HTTPException(status_code=500, detail="Failed to create node")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create node: {e}")
-    finally:
-        age.close()
 
 
 @router.put("/nodes/{node_id}", response_model=GraphNode)
 async def update_node(
-    node_id: str, node: GraphNode, age: AgeDB = Depends(get_age_helper)
+    node_id: str, node: GraphNode, age: AsyncAgeDB = Depends(get_async_age)
 ):
     """Update an existing node."""
+    graph_id = _graph_id(node_id)
     try:
         # Build update query
         set_clauses = []
+        params = {"id": graph_id}
         for key, value in node.properties.items():
-            set_clauses.append(f"n.{key} = '{value}'")
+            validate_identifier(key, "property key")
+            set_clauses.append(f"n.{key} = $p_{key}")
+            params[f"p_{key}"] = value
 
         if set_clauses:
             query = f"""
-            MATCH (n) WHERE id(n) = {node_id}
+            MATCH (n) WHERE id(n) = $id
             SET {", ".join(set_clauses)}
             RETURN n
             """
-            age.cypher("loot_tables", query, "n agtype")
+            await age.cypher("loot_tables", query, "n agtype", params)
 
             return GraphNode(
                 id=node_id,
@@ -89,207 +125,214 @@ async def update_node(
             )
 
         raise HTTPException(status_code=404, detail="Node not found")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update node: {e}")
-    finally:
-        age.close()
 
 
 @router.delete("/nodes/{node_id}")
-async def delete_node(node_id: str, age: AgeDB = Depends(get_age_helper)):
+async def delete_node(node_id: str, age: AsyncAgeDB = Depends(get_async_age)):
     """Delete a node and all its relationships."""
+    graph_id = _graph_id(node_id)
     try:
-        query = f"MATCH (n) WHERE id(n) = {node_id} DETACH DELETE n"
-        age.cypher("loot_tables", query, "_ agtype")
+        async with age.transaction():
+            # What the deletion removes, to take it off the statistics
+            query = """
+            MATCH (n) WHERE id(n) = $id
+            OPTIONAL MATCH (n)-[r]-()
+            RETURN DISTINCT label(n), id(r), label(r)
+            """
+            columns = "node_label agtype, rel_id agtype, rel_label agtype"
+            rows = await age.cypher("loot_tables", query, columns, {"id": graph_id})
+
+            query = "MATCH (n) WHERE id(n) = $id DETACH DELETE n"
+            await age.cypher("loot_tables", query, "_ agtype", {"id": graph_id})
+
+            if rows:
+                node_label = decode_agtype(rows[0]["node_label"])
+                await age.adjust_graph_stats("loot_tables", node_label, "v", -1)
+                rel_labels = Counter(
+                    decode_agtype(row["rel_label"])
+                    for row in rows
+                    if decode_agtype(row["rel_id"]) is not None
+                )
+                for rel_label, count in rel_labels.items():
+                    await age.adjust_graph_stats("loot_tables", rel_label, "e", -count)
         return {"message": "Node deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete node: {e}")
-    finally:
-        age.close()
 
 
 @router.post("/edges", response_model=GraphEdge)
-async def create_edge(edge: GraphEdge, age: AgeDB = Depends(get_age_helper)):
+async def create_edge(edge: GraphEdge, age: AsyncAgeDB = Depends(get_async_age)):
     """Create a new edge between nodes."""
+    from_id, to_id = _graph_id(edge.from_node), _graph_id(edge.to_node)
     try:
-        # Create relationship
-        age.create_relationship(
-            graph="loot_tables",
-            from_label="Node",  # Generic, would need proper label matching
-            from_match={"id": edge.from_node},
-            rel_type=edge.relationship_type,
-            to_label="Node",  # Generic, would need proper label matching
-            to_match={"id": edge.to_node},
-            rel_props=edge.properties,
-        )
+        rel_type = validate_identifier(edge.relationship_type, "relationship type")
+        params = {"from_id": from_id, "to_id": to_id}
+        set_clauses = []
+        for key, value in edge.properties.items():
+            validate_identifier(key, "property key")
+            set_clauses.append(f"r.{key} = $p_{key}")
+            params[f"p_{key}"] = value
+
+        async with age.transaction():
+            # MERGE creates nothing when such an edge already exists
+            query = f"""
+            MATCH (f)-[r:{rel_type}]->(t)
+            WHERE id(f) = $from_id AND id(t) = $to_id
+            RETURN id(r) LIMIT 1
+            """
+            ends = {"from_id": from_id, "to_id": to_id}
+            created = not await age.cypher("loot_tables", query, "id agtype", ends)
+
+            query = f"""
+            MATCH (f), (t) WHERE id(f) = $from_id AND id(t) = $to_id
+            MERGE (f)-[r:{rel_type}]->(t)
+            {"SET " + ", ".join(set_clauses) if set_clauses else ""}
+            RETURN r
+            """
+            if not await age.cypher("loot_tables", query, "r agtype", params):
+                raise HTTPException(status_code=404, detail="Node not found")
+            if created:
+                await age.adjust_graph_stats("loot_tables", rel_type, "e", 1)
 
         return edge
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create edge: {e}")
-    finally:
-        age.close()
 
 
 @router.delete("/edges/{edge_id}")
-async def delete_edge(edge_id: str, age: AgeDB = Depends(get_age_helper)):
+async def delete_edge(edge_id: str, age: AsyncAgeDB = Depends(get_async_age)):
     """Delete an edge."""
+    graph_id = _graph_id(edge_id)
     try:
-        query = f"MATCH ()-[r]-() WHERE id(r) = {edge_id} DELETE r"
-        age.cypher("loot_tables", query, "_ agtype")
+        async with age.transaction():
+            query = "MATCH ()-[r]->() WHERE id(r) = $id RETURN label(r)"
+            rows = await age.cypher(
+                "loot_tables", query, "rel_label agtype", {"id": graph_id}
+            )
+
+            query = "MATCH ()-[r]-() WHERE id(r) = $id DELETE r"
+            await age.cypher("loot_tables", query, "_ agtype", {"id": graph_id})
+
+            if rows:
+                rel_label = decode_agtype(rows[0]["rel_label"])
+                await age.adjust_graph_stats("loot_tables", rel_label, "e", -1)
         return {"message": "Edge deleted successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete edge: {e}")
-    finally:
-        age.close()
+
+
+def _search_node(row: dict) -> GraphNode:
+    return GraphNode(
+        id=row["id"],
+        name=row["properties"].get("name") or "Unknown",
+        type=row["label"],
+        label=row["label"],
+        properties=row["properties"],
+    )
 
 
 @router.post("/search", response_model=NodeSearchResponse)
-async def search_nodes(request: SearchRequest, age: AgeDB = Depends(get_age_helper)):
+async def search_nodes(
+    request: SearchRequest, age: AsyncAgeDB = Depends(get_async_age)
+):
     """Search for nodes using the frontend's expected format."""
     try:
         # For now, treat the query as a name search
-        name = request.query
-        label = ""  # Default to empty label
-
-        # Build WHERE clause based on provided parameters
-        conditions = []
-        if name:
-            conditions.append(f"n.name CONTAINS '{name}'")
-        if label:
-            conditions.append(f"'{label}' IN labels(n)")
-
-        if not conditions:
+        if not request.query:
             return NodeSearchResponse(nodes=[])
 
-        where_clause = " AND ".join(conditions)
-        query = f"""
-        MATCH (n)
-        WHERE {where_clause}
-        RETURN n, labels(n) as node_labels
-        LIMIT 50
-        """
-
-        result = age.cypher("loot_tables", query, "n agtype, node_labels agtype")
-
-        nodes = []
-        for row in result:
-            node_data = get_dict_from_agtype(row["n"])
-            node_labels = row["node_labels"]
-
-            if isinstance(node_data, dict):
-                # Extract node ID (could be direct or in properties)
-                node_id = node_data.get("id")
-                if not node_id and "properties" in node_data:
-                    node_id = node_data["properties"].get("id")
-
-                # Extract node name (could be direct or in properties)
-                node_name = node_data.get("name")
-                if not node_name and "properties" in node_data:
-                    node_name = node_data["properties"].get("name")
-
-                # Extract properties
-                properties = node_data.get("properties", {})
-
-                # Fix label extraction - handle AGE response format
-                label = "Unknown"
-                if node_labels and len(node_labels) > 0:
-                    if isinstance(node_labels, str):
-                        label = node_labels.strip('[]"')
-                    elif isinstance(node_labels, list):
-                        if isinstance(node_labels[0], str):
-                            label = node_labels[0]
-                        else:
-                            label = str(node_labels[0])
-
-                nodes.append(
-                    GraphNode(
-                        id=str(node_id or ""),
-                        name=node_name or "Unknown",
-                        type=label,
-                        label=label,
-                        properties=properties,
-                    )
-                )
-
-        return NodeSearchResponse(nodes=nodes)
+        result = await age.search_vertices("loot_tables", request.query, limit=50)
+        return NodeSearchResponse(nodes=[_search_node(row) for row in result])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to search nodes: {e}")
-    finally:
-        age.close()
 
 
 @router.get("/search/nodes", response_model=NodeSearchResponse)
 async def search_nodes_by_name_or_label(
-    name: str = "", label: str = "", age: AgeDB = Depends(get_age_helper)
+    name: str = "", label: str = "", age: AsyncAgeDB = Depends(get_async_age)
 ):
     """Search for nodes by name and/or label."""
     try:
-        # Build WHERE clause based on provided parameters
-        conditions = []
-        if name:
-            conditions.append(f"n.name CONTAINS '{name}'")
-        if label:
-            conditions.append(f"'{label}' IN labels(n)")
-
-        if not conditions:
+        if not name and not label:
             raise HTTPException(
                 status_code=400, detail="At least name or label must be provided"
             )
 
-        where_clause = " AND ".join(conditions)
-        query = f"""
-        MATCH (n)
-        WHERE {where_clause}
-        RETURN n, labels(n) as node_labels
-        LIMIT 50
-        """
+        result = await age.search_vertices(
+            "loot_tables", name, label or None, limit=50
+        )
+        return NodeSearchResponse(nodes=[_search_node(row) for row in result])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search nodes: {e}")
 
-        result = age.cypher("loot_tables", query, "n agtype, node_labels agtype")
 
-        nodes = []
-        for row in result:
-            node_data = get_dict_from_agtype(row["n"])
-            node_labels = row["node_labels"]
-
-            if isinstance(node_data, dict):
-                node_id = node_data.get("id")
-                node_name = node_data["properties"].get("name")
-                properties = node_data.get("properties", {})
-
-                # Fix label extraction - handle AGE response format
-                label = "Unknown"
-                if node_labels and len(node_labels) > 0:
-                    if isinstance(node_labels, str):
-                        label = node_labels.strip('[]"')
-                    elif isinstance(node_labels, list):
-                        if isinstance(node_labels[0], str):
-                            label = node_labels[0]
-                        else:
-                            label = str(node_labels[0])
-
-                nodes.append(
-                    {
-                        "id": str(node_id or ""),
-                        "name": node_name or "Unknown",
-                        "label": label,
-                        "properties": properties,
-                    }
-                )
+@router.get("/stats", response_model=GraphStats)
+async def get_graph_stats(age: AsyncAgeDB = Depends(get_async_age)) -> GraphStats:
+    """
+    Vertex and edge counts, per vertex label, read from the stats table.
 
-        return NodeSearchResponse(nodes=nodes)
+    The counts are rebuilt after each drop tables reload and kept up to date by the
+    node and edge routes; queries run through /cypher are only seen on a refresh.
+    """
+    try:
+        stats = await age.graph_stats("loot_tables")
+        if not stats.lastUpdated:
+            # Never counted yet
+            stats = await age.refresh_graph_stats("loot_tables")
+        return stats
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to search nodes: {e}")
-    finally:
-        age.close()
+        raise HTTPException(status_code=500, detail=f"Failed to get graph stats: {e}")
+
+
+@router.post("/stats/refresh", response_model=GraphStats)
+async def refresh_graph_stats(age: AsyncAgeDB = Depends(get_async_age)) -> GraphStats:
+    """Recount every label of the graph into the stats table."""
+    try:
+        return await age.refresh_graph_stats("loot_tables")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to refresh graph stats: {e}"
+        )
+
+
+@router.get("/indexes")
+async def list_name_indexes(age: AsyncAgeDB = Depends(get_async_age)):
+    """Name indexes (btree and trigram) of every vertex label, with their size."""
+    try:
+        return {"indexes": await age.list_name_indexes("loot_tables")}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list indexes: {e}")
+
+
+@router.post("/indexes/rebuild")
+async def rebuild_name_indexes(age: AsyncAgeDB = Depends(get_async_age)):
+    """Create the missing name indexes and reindex the existing ones."""
+    try:
+        indexes = await age.ensure_name_indexes("loot_tables", rebuild=True)
+        return {"indexes": indexes}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild indexes: {e}")
 
 
 @router.get("/neighbors", response_model=NodeNeighborsResponse)
 async def get_node_neighbors(
     name: str = "",
     label: str = "",
-    age: AgeDB = Depends(get_age_helper),
+    age: AsyncAgeDB = Depends(get_async_age),
 ):
-    """Get the direct neighborGraphResponses of a node using name and/or label."""
+    """Get the direct neighbors of a node using name and/or label."""
     try:
         if not name and not label:
             raise HTTPException(
@@ -298,105 +341,55 @@ async def get_node_neighbors(
 
         # Build WHERE clause to find the start node
         conditions = []
+        params = {}
         if name:
-            conditions.append(f"start_node.name = '{name}'")
+            conditions.append("start_node.name = $name")
+            params["name"] = name
         if label:
-            conditions.append(f"'{label}' IN labels(start_node)")
+            conditions.append("$label IN labels(start_node)")
+            params["label"] = label
 
         where_clause = " AND ".join(conditions)
 
-        # Cypher query to get direct neighbors (depth = 1)
+        # Cypher query to get direct neighbors (depth = 1). Vertices carry their
+        # label, so labels() is not needed
         query = f"""
         MATCH (start_node)
         WHERE {where_clause}
         MATCH (start_node)-[r]->(end_node)
-        RETURN start_node, labels(start_node) as start_labels, r as rel, end_node, labels(end_node) as end_labels
+        RETURN start_node, r as rel, end_node
         LIMIT 200
         """
 
-        result = age.cypher(
+        result = await age.cypher(
             "loot_tables",
             query,
-            "start_node agtype, start_labels agtype, rel agtype, end_node agtype, end_labels agtype",
+            "start_node agtype, rel agtype, end_node agtype",
+            params,
         )
         if not result:
             raise HTTPException(
                 status_code=404, detail="No nodes found matching the criteria"
             )
 
-        neighbors = []
-        starting_node_data = None
+        # Every row has the same starting node
+        starting_node_data = decode_vertex(result[0]["start_node"])
+        starting_node_data.name = starting_node_data.name or "Unknown"
 
-        # Process the results to collect neighbors with relationship info
+        neighbors = []
         for row in result:
-            # Get starting node info from first row
-            if starting_node_data is None:
-                start_node_data = get_dict_from_agtype(row["start_node"])
-                start_node_labels = get_dict_from_agtype(row["start_labels"])
-
-                if isinstance(start_node_data, dict):
-                    start_id = str(start_node_data.get("id", ""))
-
-                    # Extract label from the returned labels
-                    start_label = "Unknown"
-                    if start_node_labels and len(start_node_labels) > 0:
-                        if isinstance(start_node_labels, str):
-                            start_label = start_node_labels.strip('[]"')
-                        elif (
-                            isinstance(start_node_labels, list)
-                            and len(start_node_labels) > 0
-                        ):
-                            start_label = str(start_node_labels[0])
-
-                    starting_node_data = GraphNode(
-                        id=start_id,
-                        name=start_node_data.get("properties", {}).get(
-                            "name", "Unknown"
-                        ),
-                        type=start_label,
-                        label=start_label,
-                        properties=start_node_data.get("properties", {}),
-                    )
-
-            end_node_data = get_dict_from_agtype(row["end_node"])
-            end_node_labels = get_dict_from_agtype(row["end_labels"])
-            rel_data = get_dict_from_agtype(row["rel"])
-
-            # Add neighbor node
-            if isinstance(end_node_data, dict):
-                end_id = str(end_node_data.get("id"))
-
-                # Extract label from the returned labels
-                end_label = "Unknown"
-                if end_node_labels and len(end_node_labels) > 0:
-                    if isinstance(end_node_labels, str):
-                        end_label = end_node_labels.strip('[]"')
-                    elif isinstance(end_node_labels, list) and len(end_node_labels) > 0:
-                        end_label = str(end_node_labels[0])
-
-                # Extract relationship information
-                relationship_type = (
-                    rel_data.get("label", "Unknown") if rel_data else "Unknown"
-                )
-                relationship_properties = (
-                    rel_data.get("properties", {}) if rel_data else {}
-                )
-
-                neighbor = NodeNeighbor(
-                    id=end_id,
-                    name=end_node_data.get("properties", {}).get("name", "Unknown"),
-                    type=end_label,
-                    properties=end_node_data.get("properties", {}),
-                    relationship_type=relationship_type,
-                    relationship_properties=relationship_properties,
+            end_node = decode_vertex(row["end_node"])
+            rel = decode_edge(row["rel"])
+            neighbors.append(
+                NodeNeighbor(
+                    id=end_node.id,
+                    name=end_node.name or "Unknown",
+                    type=end_node.type,
+                    properties=end_node.properties,
+                    relationship_type=rel.relationship_type,
+                    relationship_properties=rel.properties,
                     relationship_direction="outgoing",
                 )
-
-                neighbors.append(neighbor)
-
-        if not starting_node_data:
-            raise HTTPException(
-                status_code=404, detail="No starting node found matching the criteria"
             )
 
         return NodeNeighborsResponse(
@@ -410,5 +403,123 @@ async def get_node_neighbors(
         raise HTTPException(
             status_code=500, detail=f"Failed to get node neighbors: {e}"
         )
-    finally:
-        age.close()
+
+
+async def _subgraph_seed(
+    age: AsyncAgeDB, node_id: Optional[str], name: Optional[str]
+) -> Optional[GraphNode]:
+    if node_id:
+        query = "MATCH (n) WHERE id(n) = $id RETURN n"
+        params = {"id": _graph_id(node_id)}
+    else:
+        query = "MATCH (n) WHERE n.name = $name RETURN n ORDER BY id(n) LIMIT 1"
+        params = {"name": name}
+    result = await age.cypher("loot_tables", query, "n agtype", params)
+    return decode_vertex(result[0]["n"]) if result else None
+
+
+@router.get("/subgraph", response_model=GraphResponse)
+async def get_subgraph(
+    id: Optional[str] = None,
+    name: Optional[str] = None,
+    depth: int = 1,
+    limit: int = SUBGRAPH_PAGE_SIZE,
+    labels: Optional[str] = None,
+    cursor: Optional[str] = None,
+    age: AsyncAgeDB = Depends(get_async_age),
+) -> GraphResponse:
+    """
+    The vertices within depth hops of a seed vertex (by id or exact name), and the
+    edges between them, one page at a time.
+
+    Vertices are paged in id order, at most limit per page; pass the returned
+    next_cursor to get the next page. The seed comes with the first page. Every edge
+    is sent once, with the page holding the last of its two vertices, so the pages
+    together form the whole subgraph. labels (comma-separated) keeps only vertices
+    of those labels, besides the seed.
+    """
+    if not id and not name:
+        raise HTTPException(status_code=400, detail="Id or name must be provided")
+    depth = max(1, min(depth, MAX_SUBGRAPH_DEPTH))
+    limit = max(1, min(limit, MAX_SUBGRAPH_PAGE_SIZE))
+    after = _graph_id(cursor) if cursor else None
+
+    try:
+        label_filter = [
+            validate_identifier(label.strip(), "label")
+            for label in (labels or "").split(",")
+            if label.strip()
+        ]
+
+        seed = await _subgraph_seed(age, id, name)
+        if seed is None:
+            raise HTTPException(status_code=404, detail="Seed node not found")
+        seed_id = int(seed.id)
+
+        # The neighborhood of the seed, of the wanted labels, up to a vertex id
+        neighborhood = f"""
+        MATCH (s)-[*1..{depth}]-(n)
+        WHERE id(s) = $seed AND id(n) <> $seed
+        {"AND label(n) IN $labels" if label_filter else ""}
+        """
+        params = {"seed": seed_id, "labels": label_filter, "after": after}
+
+        # Keyset page: the next vertices after the cursor, one more to know if the
+        # page is the last
+        query = f"""
+        {neighborhood}
+        {"AND id(n) > $after" if after is not None else ""}
+        WITH DISTINCT n
+        ORDER BY id(n)
+        LIMIT {limit + 1}
+        RETURN n
+        """
+        result = await age.cypher("loot_tables", query, "n agtype", params)
+        page = [decode_vertex(row["n"]) for row in result]
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = page[-1].id
+
+        nodes = [] if after is not None else [seed]
+        nodes.extend(page)
+        page_ids = [int(node.id) for node in page]
+
+        # Edges whose last vertex arrives with this page: those within the page or to
+        # the seed, then those to vertices of the earlier pages
+        edges = []
+        seen = set()
+        if page_ids or after is None:
+            rows = await age.cypher(
+                "loot_tables",
+                "MATCH (a)-[r]-(b) WHERE id(a) IN $ids AND id(b) IN $ends RETURN r",
+                "r agtype",
+                {
+                    "ids": page_ids if after is not None else [seed_id, *page_ids],
+                    "ends": [seed_id, *page_ids],
+                },
+            )
+            if page_ids and after is not None:
+                query = f"""
+                {neighborhood}
+                AND id(n) <= $after
+                WITH DISTINCT n
+                MATCH (n)-[r]-(a)
+                WHERE id(a) IN $ids
+                RETURN r
+                """
+                params["ids"] = page_ids
+                rows += await age.cypher("loot_tables", query, "r agtype", params)
+            for row in rows:
+                edge = decode_edge(row["r"])
+                if edge.id not in seen:
+                    seen.add(edge.id)
+                    edges.append(edge)
+
+        return GraphResponse(nodes=nodes, edges=edges, next_cursor=next_cursor)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get subgraph: {e}")
@@ -1,22 +1,31 @@
-from typing import List
+import json
+from typing import Optional
 
 from database.dynamic.auth import decode_token
 from database.dynamic.crud import (
     create_build,
     delete_build,
+    export_builds,
     get_build_by_id,
     get_user_builds,
+    import_builds,
     update_build,
     get_available_warframes,
     get_available_weapons,
     get_available_mods,
     get_available_arcanes,
 )
-from fastapi import APIRouter, HTTPException, Request
-from models.builds import BuildCreate, BuildPublic, BuildUpdate, BuildWithDetails
+from database.static.catalog import CatalogPayload
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from models.builds import BuildCreate, BuildPage, BuildUpdate, BuildWithDetails
+from pydantic import ValidationError
 
 router = APIRouter(prefix="/api/builds", tags=["builds"])
 
+# Largest NDJSON body accepted by /import
+MAX_IMPORT_BYTES = 1024 * 1024
+
 
 async def get_current_user_id(request: Request) -> str:
     """Extract user_id from JWT token"""
@@ -78,19 +87,24 @@ async def create_build_endpoint(request: Request, build: BuildCreate):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/", response_model=List[BuildPublic])
-@router.get("", response_model=List[BuildPublic])
+@router.get("/", response_model=BuildPage)
+@router.get("", response_model=BuildPage)
 async def get_user_builds_endpoint(
-    request: Request, skip: int = 0, limit: int = 30, include_details: bool = False
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = 30,
+    include_details: bool = False,
 ):
-    """Get all builds for the current user"""
+    """Get a page of builds for the current user, with the cursor of the next page"""
     user_id = await get_current_user_id(request)
-    print(f"DEBUG: Getting builds for user_id: {user_id}")
 
-    builds = await get_user_builds(user_id, skip, limit, include_details)
-    print(f"DEBUG: Found {len(builds)} builds for user {user_id}")
+    try:
+        builds, next_cursor = await get_user_builds(
+            user_id, cursor, limit, include_details
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Build response and debug it
     response_data = [
         {
             "id": str(build["_id"]),
@@ -112,8 +126,75 @@ async def get_user_builds_endpoint(
         for build in builds
     ]
 
-    print(f"DEBUG: Response data: {response_data}")
-    return response_data
+    return {"builds": response_data, "next_cursor": next_cursor}
+
+
+@router.get("/export")
+async def export_builds_endpoint(request: Request):
+    """Stream the current user's builds as NDJSON, one build per line"""
+    user_id = await get_current_user_id(request)
+
+    async def lines():
+        async for build in export_builds(user_id):
+            yield json.dumps(build, default=str) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="builds.ndjson"'},
+    )
+
+
+async def _read_import_body(request: Request) -> bytes:
+    """The request body, refused with a 413 as soon as it exceeds MAX_IMPORT_BYTES."""
+    too_large = HTTPException(status_code=413, detail="Import file is too large")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit():
+        if int(content_length) > MAX_IMPORT_BYTES:
+            raise too_large
+
+    # Chunked bodies carry no Content-Length: stop reading past the limit
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > MAX_IMPORT_BYTES:
+            raise too_large
+    return bytes(body)
+
+
+@router.post("/import", status_code=201)
+async def import_builds_endpoint(request: Request):
+    """Import NDJSON builds (as produced by /export) in a single batch"""
+    user_id = await get_current_user_id(request)
+
+    body = await _read_import_body(request)
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Import file is not valid UTF-8")
+
+    builds = []
+    errors = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            builds.append(BuildCreate.model_validate_json(line))
+        except ValidationError as e:
+            errors.append(f"line {line_number}: {e.errors()[0]['msg']}")
+
+    if errors:
+        raise HTTPException(status_code=400, detail="; ".join(errors))
+    if not builds:
+        raise HTTPException(status_code=400, detail="No builds to import")
+
+    try:
+        inserted_ids = await import_builds(user_id, builds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"imported": len(inserted_ids), "ids": [str(_id) for _id in inserted_ids]}
 
 
 @router.get("/{build_id}", response_model=BuildWithDetails)
@@ -148,42 +229,15 @@ async def update_build_endpoint(
     """Update a specific build and return with full warframe details"""
     user_id = await get_current_user_id(request)
 
-    updated_build = await update_build(build_id, user_id, build_update)
+    # update_build returns the build already enriched with warframe details
+    try:
+        updated_build = await update_build(build_id, user_id, build_update)
+    except ValueError as e:
+        # BuildReferenceError lists every unknown reference at once
+        raise HTTPException(status_code=400, detail=str(e))
     if not updated_build:
         raise HTTPException(status_code=404, detail="Build not found")
 
-    # Enrich with warframe details for the response
-    from database.db import connect_to_mongodb
-
-    warframe = None
-    mongo_client = connect_to_mongodb()
-    if mongo_client:
-        db = mongo_client["cephalon_onni"]
-        warframes_collection = db["warframes"]
-        abilities_collection = db["warframe_abilities"]
-        warframe = warframes_collection.find_one(
-            {"uniqueName": updated_build["warframe_uniqueName"]}
-        )
-        if warframe and warframe.get("name"):
-            # Fetch abilities for this warframe
-            abilities = list(
-                abilities_collection.find(
-                    {"warframe_uniqueName": updated_build["warframe_uniqueName"]},
-                    {
-                        "_id": 0,
-                        "abilityUniqueName": 1,
-                        "abilityName": 1,
-                        "description": 1,
-                    },
-                )
-            )
-            warframe["abilities"] = abilities
-            updated_build["warframe"] = warframe
-        else:
-            updated_build["warframe"] = None
-    else:
-        updated_build["warframe"] = None
-
     # Return dictionary - FastAPI will validate against response_model
     return {
         "id": str(updated_build["_id"]),
@@ -214,49 +268,75 @@ async def delete_build_endpoint(request: Request, build_id: str):
         raise HTTPException(status_code=404, detail="Build not found")
 
 
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip: named, or through *, with q > 0."""
+    qualities = {}
+    for coding in accept_encoding.lower().split(","):
+        name, _, parameters = coding.partition(";")
+        quality = 1.0
+        for parameter in parameters.split(";"):
+            key, _, value = parameter.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def catalog_payload_response(request: Request, payload: CatalogPayload) -> Response:
+    """Serve a precomputed catalog payload, honoring If-None-Match and gzip."""
+    use_gzip = accepts_gzip(request.headers.get("accept-encoding", ""))
+    # Each encoding is a distinct representation, so it gets its own strong ETag
+    gzip_etag = payload.etag[:-1] + '-gzip"'
+    etag = gzip_etag if use_gzip else payload.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in candidates or payload.etag in candidates or gzip_etag in candidates:
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        body = payload.gzip_body
+    else:
+        body = payload.body
+    return Response(body, media_type="application/json", headers=headers)
+
+
 @router.get("/available/warframes")
-async def get_available_warframes_endpoint():
+async def get_available_warframes_endpoint(request: Request):
     """Get all available warframes for build creation"""
     try:
-        warframes = await get_available_warframes()
-        return warframes
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
+        return catalog_payload_response(request, await get_available_warframes())
+    except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/available/weapons")
-async def get_available_weapons_endpoint():
+async def get_available_weapons_endpoint(request: Request):
     """Get all available weapons for build creation"""
     try:
-        weapons = await get_available_weapons()
-        return weapons
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
+        return catalog_payload_response(request, await get_available_weapons())
+    except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/available/mods")
-async def get_available_mods_endpoint():
+async def get_available_mods_endpoint(request: Request):
     """Get all available mods for build creation"""
     try:
-        mods = await get_available_mods()
-        return mods
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
+        return catalog_payload_response(request, await get_available_mods())
+    except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
 @router.get("/available/arcanes")
-async def get_available_arcanes_endpoint():
+async def get_available_arcanes_endpoint(request: Request):
     """Get all available arcanes for build creation"""
     try:
-        arcanes = await get_available_arcanes()
-        return arcanes
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
+        return catalog_payload_response(request, await get_available_arcanes())
+    except Exception:
         raise HTTPException(status_code=500, detail="Internal server error")
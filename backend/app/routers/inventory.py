@@ -1,7 +1,7 @@
 from typing import List
 
 from bson import ObjectId
-from database.db import inventories_collection
+from database.db import db_manager
 from fastapi import APIRouter, HTTPException, Request
 from models.inventories import InventoryPublic
 
@@ -21,7 +21,7 @@ def get_user_id(request: Request):
 def get_inventory(request: Request):
     user_id = get_user_id(request)
 
-    items = inventories_collection.find({"user_id": user_id})
+    items = db_manager.sync_inventories.find({"user_id": user_id})
 
     return [
         {
@@ -42,7 +42,7 @@ def get_inventory(request: Request):
 def get_one(item_id: str, request: Request):
     user_id = get_user_id(request)
 
-    item = inventories_collection.find_one(
+    item = db_manager.sync_inventories.find_one(
         {"_id": ObjectId(item_id), "user_id": user_id}
     )
 
@@ -1,263 +1,401 @@
 import logging
+from typing import Any, Dict, Optional, Sequence, Tuple
 
+from bson import ObjectId
+from bson.errors import InvalidId
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from models.age_models import (
+    AutocompleteResponse,
+    AutocompleteSuggestion,
+    FarmingResponse,
+    FarmingSource,
     GraphNode,
     NodeNeighbor,
     NodeNeighborsResponse,
     NodeSearchResponse,
+    RelicEV,
+    RelicEVResponse,
+)
+from database.static.autocomplete import TOP_PER_NODE, get_autocomplete_index
+from database.static.drop_index import (
+    DROPS_COLLECTION,
+    DropEntry,
+    DropIndex,
+    get_drop_index,
+    shortest_drop_name,
+)
+from database.static.farming import best_farming_sources
+from database.static.relic_ev import RELIC_EV_COLLECTION, relic_ev_query
+from database.static.repository import StaticRepository, get_static_repository
+from database.static.search import (
+    normalize_search_key,
+    prefix_filter,
+    search_filter,
 )
-from pymongo import MongoClient
-
-from dependencies import get_static_db_client
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/loottables", tags=["loottables"])
 
+MISSION_SOURCE_TYPES = ["mission", "auxiliary_mission"]
+
+SEARCH_PAGE_SIZE = 50
+MAX_SEARCH_PAGE_SIZE = 200
+
+
+def format_chance(chance: Optional[float]) -> str:
+    """Display a numeric drop chance the way the drop tables do ('12.5%')."""
+    return f"{chance:g}%" if chance is not None else ""
+
+
+def _drop_node(drop: dict) -> GraphNode:
+    """A search result node for one document of the drops collection."""
+    if drop.get("source_type") in MISSION_SOURCE_TYPES:
+        return GraphNode(
+            id=str(drop["_id"]),
+            name=drop.get("item", ""),
+            type="Mission",
+            label="Mission",
+            properties={
+                "mission_name": drop.get("source", ""),
+                "mission_type": drop.get("mission_type", ""),
+                "planet": drop.get("planet", ""),
+                "drop_chance": format_chance(drop.get("chance")),
+                "drop_rotation": drop.get("rotation"),
+            },
+        )
+
+    source_type = drop.get("source_type", "drop_source")
+    return GraphNode(
+        id=str(drop["_id"]),
+        name=drop.get("item", ""),
+        type=source_type,
+        label=source_type,
+        properties={
+            "source": drop.get("source", ""),
+            "chance": format_chance(drop.get("chance")),
+            "rotation": drop.get("rotation"),
+            "stage": drop.get("stage"),
+        },
+    )
+
+
+def _drop_entry(drop: dict) -> DropEntry:
+    return DropEntry(
+        item=drop.get("item", ""),
+        source=drop.get("source", ""),
+        source_type=drop.get("source_type", "drop_source"),
+        source_id=str(drop["_id"]),
+        chance=drop.get("chance"),
+        rotation=drop.get("rotation"),
+    )
+
+
+def _item_neighbors(entries: Sequence[DropEntry]) -> NodeNeighborsResponse:
+    """An item and the sources dropping it."""
+    starting_node = GraphNode(
+        id=entries[0].item,
+        name=entries[0].item,
+        type="Item",
+        label="Item",
+        properties={},
+    )
+    neighbors = [
+        NodeNeighbor(
+            id=entry.source_id,
+            name=entry.source,
+            type=entry.source_type,
+            properties={},
+            relationship_type="DROPPED_BY",
+            relationship_properties={
+                "chance": format_chance(entry.chance),
+                "rotation": entry.rotation,
+            },
+            relationship_direction="incoming",
+        )
+        for entry in entries
+    ]
+    return NodeNeighborsResponse(
+        starting_node=starting_node, neighbors=neighbors, count=len(neighbors)
+    )
+
+
+def _source_neighbors(entries: Sequence[DropEntry]) -> NodeNeighborsResponse:
+    """A source and the items it drops."""
+    starting_node = GraphNode(
+        id=entries[0].source,
+        name=entries[0].source,
+        type=entries[0].source_type,
+        label=entries[0].source_type,
+        properties={},
+    )
+    neighbors = [
+        NodeNeighbor(
+            id=entry.source_id,
+            name=entry.item,
+            type="Item",
+            properties={},
+            relationship_type="DROPS",
+            relationship_properties={
+                "chance": format_chance(entry.chance),
+                "rotation": entry.rotation,
+            },
+            relationship_direction="outgoing",
+        )
+        for entry in entries
+    ]
+    return NodeNeighborsResponse(
+        starting_node=starting_node, neighbors=neighbors, count=len(neighbors)
+    )
+
+
+def _neighbors_from_index(
+    drop_index: DropIndex, name: str
+) -> Optional[NodeNeighborsResponse]:
+    """An item's sources or a source's items, as resolved by the in-memory drop index."""
+    match = drop_index.resolve(name)
+    if match is None:
+        return None
+    kind, entries = match
+    return _item_neighbors(entries) if kind == "item" else _source_neighbors(entries)
+
+
+# Name fields of the drops collection and the prefix of their search fields
+NAME_FIELDS = (("item", ""), ("source", "source_"))
+
+
+async def _resolve_in_database(
+    repository: StaticRepository, name: str
+) -> Optional[Tuple[str, str]]:
+    """(field, name) of the item or source a name designates, in DropIndex.resolve order."""
+    key = normalize_search_key(name)
+    if not key:
+        return None
+    for field, prefix in NAME_FIELDS:
+        match = await repository.find_one(
+            DROPS_COLLECTION, {f"{prefix}search_key": key}, {field: 1}
+        )
+        if match:
+            return field, match[field]
+    for field, prefix in NAME_FIELDS:
+        for query in (prefix_filter(key, prefix), search_filter(key, prefix)):
+            found = await shortest_drop_name(repository, field, query)
+            if found is not None:
+                return field, found
+    return None
+
+
+async def _neighbors_from_database(
+    repository: StaticRepository, name: str
+) -> Optional[NodeNeighborsResponse]:
+    """Same resolution and order as _neighbors_from_index, on the drops collection."""
+    match = await _resolve_in_database(repository, name)
+    if match is None:
+        return None
+    field, value = match
+    if field == "item":
+        drops = await repository.find(
+            DROPS_COLLECTION, {"item": value}, sort=[("chance", -1)]
+        )
+        return _item_neighbors([_drop_entry(drop) for drop in drops])
+
+    drops = await repository.find(
+        DROPS_COLLECTION, {"source": value}, sort=[("rotation", 1), ("chance", -1)]
+    )
+    return _source_neighbors([_drop_entry(drop) for drop in drops])
+
+
+def _search_query(name: str, label: str) -> Optional[Dict[str, Any]]:
+    """Filter of the drops matching a search, or None if nothing can match."""
+    mission_query = {
+        "source_type": {"$in": MISSION_SOURCE_TYPES},
+        **search_filter(name, "source_"),
+    }
+    if label:
+        if label.lower() == "missions" or label.lower() == "mission":
+            return mission_query
+        return {"source_type": label.lower(), **search_filter(name)}
+
+    name_query = search_filter(name)
+    if not name_query:
+        return None
+    return {"$or": [name_query, mission_query]}
+
 
 @router.get("/search/nodes", response_model=NodeSearchResponse)
 async def search_nodes_by_name_or_label(
     name: str = "",
     label: str = "",
-    client: MongoClient = Depends(get_static_db_client),
-) -> NodeSearchResponse:
-    """Search for nodes by name and/or label (type)."""
-    try:
-        db = client["cephalon_onni"]
-        
-        nodes = []
-        node_id_counter = 0
-
-        if label:
-            if label.lower() == "missions" or label.lower() == "mission":
-                query = {"mission_name": {"$regex": f".*{name}.*", "$options": "i"}} if name else {}
-                for mission in db["missions"].find(query).limit(50):
-                    drops = mission.get("drops", [])
-                    for drop in drops:
-                        nodes.append(
-                            {
-                                "id": str(node_id_counter),
-                                "name": drop.get("item", ""),
-                                "type": "Mission",
-                                "label": "Mission",
-                                "properties": {
-                                    "mission_name": mission.get("mission_name", ""),
-                                    "mission_type": mission.get("type", ""),
-                                    "planet": mission.get("planet", ""),
-                                    "drop_chance": drop.get("chance", ""),
-                                    "drop_rotation": drop.get("rotation"),
-                                },
-                            }
-                        )
-                        node_id_counter += 1
-            else:
-                query = {"source_type": label.lower()}
-                if name:
-                    query["name"] = {"$regex": f".*{name}.*", "$options": "i"}
-                
-                for item in db["drop_sources"].find(query).limit(50):
-                    nodes.append(
-                        {
-                            "id": str(item.get("_id", node_id_counter)),
-                            "name": item.get("name", ""),
-                            "type": item.get("source_type", "Unknown"),
-                            "label": item.get("source_type", "Unknown"),
-                            "properties": {
-                                "source": item.get("source", ""),
-                                "chance": item.get("chance", ""),
-                                "rotation": item.get("rotation"),
-                            },
-                        }
-                    )
-                    node_id_counter += 1
-        else:
-            if name:
-                name_query = name
-                
-                for item in db["drop_sources"].find({"name": {"$regex": f".*{name_query}.*", "$options": "i"}}).limit(25):
-                    nodes.append(
-                        {
-                            "id": str(item.get("_id", node_id_counter)),
-                            "name": item.get("name", ""),
-                            "type": item.get("source_type", "drop_source"),
-                            "label": item.get("source_type", "drop_source"),
-                            "properties": {
-                                "source": item.get("source", ""),
-                                "chance": item.get("chance", ""),
-                                "rotation": item.get("rotation"),
-                            },
-                        }
-                    )
-                    node_id_counter += 1
-
-                for mission in db["missions"].find(
-                    {"mission_name": {"$regex": f".*{name_query}.*", "$options": "i"}}
-                ).limit(25):
-                    drops = mission.get("drops", [])
-                    for drop in drops:
-                        nodes.append(
-                            {
-                                "id": str(node_id_counter),
-                                "name": drop.get("item", ""),
-                                "type": "Mission",
-                                "label": "Mission",
-                                "properties": {
-                                    "mission_name": mission.get("mission_name", ""),
-                                    "mission_type": mission.get("type", ""),
-                                    "planet": mission.get("planet", ""),
-                                    "drop_chance": drop.get("chance", ""),
-                                    "drop_rotation": drop.get("rotation"),
-                                },
-                            }
-                        )
-                        node_id_counter += 1
-
-        graph_nodes = [
-            GraphNode(
-                id=node["id"],
-                name=node["name"],
-                type=node["type"],
-                label=node["label"],
-                properties=node["properties"],
-            )
-            for node in nodes
-        ]
+    cursor: Optional[str] = None,
+    limit: int = SEARCH_PAGE_SIZE,
+    stream: bool = False,
+    repository: StaticRepository = Depends(get_static_repository),
+):
+    """
+    Search for nodes by name and/or label (type).
+
+    Results are paginated on the drop _id: pass the returned next_cursor to get the next
+    page. With stream=true, every match is streamed as NDJSON nodes instead.
+    """
+    query = _search_query(name, label)
+    if query is None:
+        return NodeSearchResponse(nodes=[])
 
-        return NodeSearchResponse(nodes=graph_nodes)
+    if cursor:
+        try:
+            query = {"$and": [query, {"_id": {"$gt": ObjectId(cursor)}}]}
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    documents = repository.collection(DROPS_COLLECTION).find(query).sort("_id", 1)
+
+    if stream:
+
+        async def lines():
+            async for drop in documents:
+                yield _drop_node(drop).model_dump_json() + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    limit = max(1, min(limit, MAX_SEARCH_PAGE_SIZE))
+    try:
+        # Fetch one extra drop to know whether another page follows
+        drops = await documents.limit(limit + 1).to_list(length=None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to search nodes: {e}")
 
+    next_cursor = None
+    if len(drops) > limit:
+        drops = drops[:limit]
+        next_cursor = str(drops[-1]["_id"])
+
+    return NodeSearchResponse(
+        nodes=[_drop_node(drop) for drop in drops], next_cursor=next_cursor
+    )
+
+
+@router.get("/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete_names(
+    q: str = "",
+    limit: int = 10,
+    kind: Optional[str] = None,
+    repository: StaticRepository = Depends(get_static_repository),
+) -> AutocompleteResponse:
+    """Suggest item, source, mission and catalog names completing q, tolerating typos."""
+    limit = max(1, min(limit, TOP_PER_NODE))
+
+    index = get_autocomplete_index()
+    if index is not None:
+        return AutocompleteResponse(
+            suggestions=[
+                AutocompleteSuggestion(
+                    name=suggestion.name,
+                    kind=suggestion.kind,
+                    popularity=suggestion.popularity,
+                    distance=distance,
+                    unique_name=suggestion.unique_name,
+                )
+                for suggestion, distance in index.complete(q, limit, kind)
+            ]
+        )
+
+    # Index not built yet: exact item matches from the drops collection
+    query = search_filter(q)
+    if not query or kind not in (None, "item"):
+        return AutocompleteResponse(suggestions=[])
+    items = await repository.collection(DROPS_COLLECTION).distinct("item", query)
+    return AutocompleteResponse(
+        suggestions=[
+            AutocompleteSuggestion(name=item, kind="item", popularity=0, distance=0)
+            for item in sorted(items, key=len)[:limit]
+        ]
+    )
+
 
 @router.get("/neighbors", response_model=NodeNeighborsResponse)
 async def get_node_neighbors(
     name: str = "",
-    client: MongoClient = Depends(get_static_db_client),
+    repository: StaticRepository = Depends(get_static_repository),
 ):
     """Get the direct neighbors of a node using name."""
     if not name:
         raise HTTPException(status_code=400, detail="Name must be provided")
 
     try:
-        db = client["cephalon_onni"]
-        
-        starting_node = None
-        neighbors = []
-        node_id = 0
-
-        drop_sources = list(db["drop_sources"].find({"name": {"$regex": f".*{name}.*", "$options": "i"}}))
-        
-        if drop_sources:
-            for drop_source in drop_sources:
-                if starting_node is None:
-                    starting_node = GraphNode(
-                        id=str(drop_source.get("_id", "")),
-                        name=drop_source.get("name", "Unknown"),
-                        type=drop_source.get("source_type", "drop_source"),
-                        label=drop_source.get("source_type", "drop_source"),
-                        properties={
-                            "source": drop_source.get("source", ""),
-                            "chance": drop_source.get("chance", ""),
-                            "rotation": drop_source.get("rotation"),
-                        },
-                    )
-
-                neighbors.append(
-                    NodeNeighbor(
-                        id=str(drop_source.get("_id", "")),
-                        name=drop_source.get("source", "Unknown"),
-                        type=drop_source.get("source_type", "source"),
-                        properties={},
-                        relationship_type="DROPPED_BY",
-                        relationship_properties={
-                            "chance": drop_source.get("chance", ""),
-                            "rotation": drop_source.get("rotation"),
-                        },
-                        relationship_direction="incoming",
-                    )
-                )
+        drop_index = get_drop_index()
+        if drop_index is not None:
+            response = _neighbors_from_index(drop_index, name)
+        elif search_filter(name):
+            # Drop index not built yet: query the drops collection
+            response = await _neighbors_from_database(repository, name)
         else:
-            missions = list(db["missions"].find({
-                "$or": [
-                    {"mission_name": {"$regex": f".*{name}.*", "$options": "i"}},
-                    {"drops.item": {"$regex": f".*{name}.*", "$options": "i"}},
-                ]
-            }))
-            
-            for mission in missions:
-                starting_node = GraphNode(
-                    id=str(mission.get("_id", "")),
-                    name=mission.get("mission_name", "Unknown"),
-                    type="Mission",
-                    label="Mission",
-                    properties={
-                        "mission_type": mission.get("type", ""),
-                        "planet": mission.get("planet", ""),
-                    },
-                )
+            response = None
 
-                drops = mission.get("drops", [])
-                for drop in drops:
-                    neighbors.append(
-                        NodeNeighbor(
-                            id=str(node_id),
-                            name=drop.get("item", "Unknown"),
-                            type="Item",
-                            properties={},
-                            relationship_type="DROPS",
-                            relationship_properties={
-                                "chance": drop.get("chance", ""),
-                                "rotation": drop.get("rotation"),
-                            },
-                            relationship_direction="outgoing",
-                        )
-                    )
-                    node_id += 1
-            
-            if not starting_node:
-                for mission in db["missions"].find({"drops.item": {"$regex": f".*{name}.*", "$options": "i"}}):
-                    if starting_node is None:
-                        starting_node = GraphNode(
-                            id=str(mission.get("_id", "")),
-                            name=name,
-                            type="Item",
-                            label="Item",
-                            properties={},
-                        )
-                    
-                    matching_drop = next(
-                        (d for d in mission.get("drops", []) 
-                         if d.get("item", "").lower() == name.lower()),
-                        {}
-                    )
-                    
-                    neighbors.append(
-                        NodeNeighbor(
-                            id=str(mission.get("_id", "")),
-                            name=mission.get("mission_name", "Unknown"),
-                            type="Mission",
-                            properties={},
-                            relationship_type="DROPPED_BY",
-                            relationship_properties={
-                                "chance": matching_drop.get("chance", ""),
-                                "rotation": matching_drop.get("rotation"),
-                            },
-                            relationship_direction="incoming",
-                        )
-                    )
-
-        if not starting_node:
+        if response is None:
             raise HTTPException(
                 status_code=404, detail=f"No nodes found matching: {name}"
             )
-
-        return NodeNeighborsResponse(
-            starting_node=starting_node,
-            neighbors=neighbors,
-            count=len(neighbors),
-        )
+        return response
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to get node neighbors: {e}"
         )
+
+
+@router.get("/farm", response_model=FarmingResponse)
+async def get_best_farming_sources(
+    item: str = "",
+    limit: int = 20,
+    repository: StaticRepository = Depends(get_static_repository),
+) -> FarmingResponse:
+    """Rank the sources of an item by expected runs to obtain it."""
+    if not search_filter(item):
+        raise HTTPException(status_code=400, detail="Item must be provided")
+
+    try:
+        version, item_name, sources = await best_farming_sources(
+            repository, item, max(1, min(limit, 100))
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to rank farming sources: {e}"
+        )
+
+    if item_name is None:
+        raise HTTPException(status_code=404, detail=f"No item found matching: {item}")
+
+    return FarmingResponse(
+        item=item_name,
+        sources=[FarmingSource(**source) for source in sources],
+        drop_tables_version=version,
+    )
+
+
+@router.get("/relics/ev", response_model=RelicEVResponse)
+async def get_relic_expected_values(
+    relic: Optional[str] = None,
+    reward: Optional[str] = None,
+    limit: int = 50,
+    repository: StaticRepository = Depends(get_static_repository),
+) -> RelicEVResponse:
+    """Precomputed reward chances of a relic, or of every relic giving a reward."""
+    query = relic_ev_query(relic, reward)
+    if query is None:
+        raise HTTPException(status_code=400, detail="Relic or reward must be provided")
+
+    try:
+        relics = await repository.find(
+            RELIC_EV_COLLECTION,
+            query,
+            {"_id": 0},
+            limit=max(1, min(limit, 200)),
+            sort=[("relic", 1)],
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get relic expected values: {e}"
+        )
+
+    return RelicEVResponse(relics=[RelicEV(**relic_ev) for relic_ev in relics])
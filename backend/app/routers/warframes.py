@@ -1,20 +1,26 @@
 from typing import Any, Dict, List
 
-from dependencies import get_static_db_client
+from database.static.catalog import get_catalog
+from database.static.repository import StaticRepository, get_static_repository
 from fastapi import APIRouter, Depends, HTTPException
-from pymongo import MongoClient
 
 router = APIRouter(prefix="/api/warframes", tags=["warframes"])
 
 
 @router.get("/", response_model=List[Dict[str, Any]])
-async def get_all_warframes(client: MongoClient = Depends(get_static_db_client)):
+async def get_all_warframes(
+    repository: StaticRepository = Depends(get_static_repository),
+):
     """Get all warframes with basic info"""
     try:
-        db = client["cephalon_onni"]
-        warframes_collection = db["warframes"]
+        catalog = get_catalog()
+        if catalog is not None:
+            documents = catalog.all("warframes")
+        else:
+            documents = await repository.find("warframes")
+
         warframes = []
-        for w in warframes_collection.find({}):
+        for w in documents:
             w["_id"] = str(w["_id"])
             warframes.append(w)
         return warframes
@@ -26,13 +32,17 @@ async def get_all_warframes(client: MongoClient = Depends(get_static_db_client))
 
 @router.get("/{unique_name}", response_model=Dict[str, Any])
 async def get_warframe_by_unique_name(
-    unique_name: str, client: MongoClient = Depends(get_static_db_client)
+    unique_name: str, repository: StaticRepository = Depends(get_static_repository)
 ):
     """Get a specific warframe by uniqueName with all details including abilities"""
     try:
-        db = client["cephalon_onni"]
-        warframes_collection = db["warframes"]
-        warframe = warframes_collection.find_one({"uniqueName": unique_name})
+        catalog = get_catalog()
+        if catalog is not None:
+            warframe = catalog.get("warframes", unique_name)
+        else:
+            warframe = await repository.find_one(
+                "warframes", {"uniqueName": unique_name}
+            )
 
         if not warframe:
             raise HTTPException(status_code=404, detail="Warframe not found")
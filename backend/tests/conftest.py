@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+# Tests refuse synchronous pymongo calls on the event loop instead of only logging them
+os.environ.setdefault("MONGO_LOOP_GUARD", "raise")
+
+# The application imports its modules relative to backend/app
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "app"))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark", action="store_true", help="also run the wall-clock benchmarks"
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: wall-clock timing, only run with --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # Timings depend on the machine: keep them out of the default run
+    if config.getoption("--benchmark"):
+        return
+    skip = pytest.mark.skip(reason="benchmark, run with --benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,229 @@
+"""In-memory stand-ins for the Motor objects the static repository reads through."""
+
+import copy
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from database.static.repository import StaticRepository
+
+
+def _values(document: dict, path: str) -> List[Any]:
+    """The values at a dotted path; array fields match on any of their elements."""
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return []
+        value = value[part]
+    return list(value) + [value] if isinstance(value, list) else [value]
+
+
+def _matches_condition(values: List[Any], condition: Any) -> bool:
+    if not isinstance(condition, dict) or not any(k.startswith("$") for k in condition):
+        return condition in values
+    for operator, argument in condition.items():
+        if operator == "$in":
+            ok = any(value in argument for value in values)
+        elif operator == "$all":
+            ok = all(item in values for item in argument)
+        elif operator == "$gt":
+            ok = any(value is not None and value > argument for value in values)
+        elif operator == "$lt":
+            ok = any(value is not None and value < argument for value in values)
+        elif operator == "$regex":
+            ok = any(isinstance(v, str) and re.search(argument, v) for v in values)
+        else:
+            raise NotImplementedError(operator)
+        if not ok:
+            return False
+    return True
+
+
+def matches(document: dict, query: Optional[Dict[str, Any]]) -> bool:
+    for field, condition in (query or {}).items():
+        if field == "$and":
+            ok = all(matches(document, part) for part in condition)
+        elif field == "$or":
+            ok = any(matches(document, part) for part in condition)
+        else:
+            ok = _matches_condition(_values(document, field), condition)
+        if not ok:
+            return False
+    return True
+
+
+def _project(document: dict, projection: Optional[Dict[str, Any]]) -> dict:
+    if not projection:
+        return copy.deepcopy(document)
+    if all(not keep for keep in projection.values()):
+        return {k: copy.deepcopy(v) for k, v in document.items() if k not in projection}
+    fields = {k for k, keep in projection.items() if keep}
+    if projection.get("_id", 1):
+        fields.add("_id")
+    return {k: copy.deepcopy(v) for k, v in document.items() if k in fields}
+
+
+def evaluate(expression: Any, document: dict) -> Any:
+    """The aggregation expressions the static pipelines use, evaluated on a document."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        values = _values(document, expression[1:])
+        return values[-1] if values else None
+    if not isinstance(expression, dict):
+        return expression
+
+    (operator, argument), = expression.items()
+    if operator == "$switch":
+        for branch in argument["branches"]:
+            if evaluate(branch["case"], document):
+                return evaluate(branch["then"], document)
+        return evaluate(argument["default"], document)
+
+    values = [evaluate(item, document) for item in argument]
+    if operator == "$eq":
+        return values[0] == values[1]
+    if operator == "$in":
+        return values[0] in values[1]
+    if operator == "$and":
+        return all(values)
+    if operator == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if operator == "$multiply":
+        product = 1
+        for value in values:
+            product *= value
+        return product
+    if operator == "$divide":
+        return values[0] / values[1]
+    raise NotImplementedError(operator)
+
+
+def aggregate(documents: List[dict], pipeline: List[dict]) -> List[dict]:
+    documents = copy.deepcopy(documents)
+    for stage in pipeline:
+        (name, argument), = stage.items()
+        if name == "$match":
+            documents = [d for d in documents if matches(d, argument)]
+        elif name == "$addFields":
+            for document in documents:
+                document.update(
+                    {field: evaluate(e, document) for field, e in argument.items()}
+                )
+        elif name == "$sort":
+            documents = FakeCursor(documents).sort(list(argument.items()))._documents
+        elif name == "$limit":
+            documents = documents[:argument]
+        elif name == "$project":
+            documents = [_project(document, argument) for document in documents]
+        else:
+            raise NotImplementedError(name)
+    return documents
+
+
+class FakeCursor:
+    def __init__(self, documents: List[dict]):
+        self._documents = documents
+        self._limit = 0
+
+    def sort(self, key: Any, direction: int = 1) -> "FakeCursor":
+        keys: List[Tuple[str, int]] = (
+            [(key, direction)] if isinstance(key, str) else key
+        )
+        for field, order in reversed(keys):
+            # Missing and null values sort first, as in MongoDB
+            self._documents.sort(
+                key=lambda doc: (doc.get(field) is not None, doc.get(field)),
+                reverse=order < 0,
+            )
+        return self
+
+    def limit(self, count: int) -> "FakeCursor":
+        self._limit = count
+        return self
+
+    def _selected(self) -> List[dict]:
+        return self._documents[: self._limit] if self._limit else self._documents
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        return list(self._selected())
+
+    def __iter__(self):
+        return iter(self._selected())
+
+    def __aiter__(self):
+        async def documents():
+            for document in self._selected():
+                yield document
+
+        return documents()
+
+
+class FakeCollection:
+    def __init__(self, documents: List[dict]):
+        self.documents = documents
+
+    async def find_one(self, query=None, projection=None) -> Optional[dict]:
+        for document in self.documents:
+            if matches(document, query):
+                return _project(document, projection)
+        return None
+
+    def find(self, query=None, projection=None) -> FakeCursor:
+        return FakeCursor(
+            [_project(d, projection) for d in self.documents if matches(d, query)]
+        )
+
+    def aggregate(self, pipeline: List[dict]) -> FakeCursor:
+        return FakeCursor(aggregate(self.documents, pipeline))
+
+    async def distinct(self, field: str, query=None) -> List[Any]:
+        found = []
+        for document in self.documents:
+            if matches(document, query):
+                for value in _values(document, field):
+                    if value not in found and not isinstance(value, list):
+                        found.append(value)
+        return found
+
+
+class FakeSyncCollection(FakeCollection):
+    """The synchronous calls db_init jobs make, writes kept in written."""
+
+    def __init__(self, documents: List[dict]):
+        super().__init__(documents)
+        self.written: List[Any] = []
+
+    def bulk_write(self, requests: List[Any], ordered: bool = True) -> None:
+        self.written.extend(requests)
+
+    def delete_many(self, query: Dict[str, Any]) -> None:
+        self.documents[:] = [d for d in self.documents if not matches(d, query)]
+
+    def create_index(self, keys: Any, **kwargs) -> None:
+        pass
+
+
+class FakeDatabase(dict):
+    collection_class = FakeCollection
+
+    def __missing__(self, name: str) -> FakeCollection:
+        collection = self[name] = self.collection_class([])
+        return collection
+
+
+class FakeSyncDatabase(FakeDatabase):
+    collection_class = FakeSyncCollection
+
+
+def fake_client(collections: Dict[str, List[dict]], db_name: str = "cephalon_onni"):
+    """A MongoClient-like mapping holding one database of in-memory collections."""
+    return {
+        db_name: FakeSyncDatabase(
+            {name: FakeSyncCollection(docs) for name, docs in collections.items()}
+        )
+    }
+
+
+def fake_repository(collections: Dict[str, List[dict]]) -> StaticRepository:
+    """A StaticRepository over in-memory collections."""
+    return StaticRepository(
+        FakeDatabase({name: FakeCollection(docs) for name, docs in collections.items()})
+    )
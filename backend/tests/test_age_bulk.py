@@ -0,0 +1,59 @@
+import pytest
+
+from database.static.age_bulk import GraphBulkLoader
+
+GRAPH = "loot_tables"
+
+
+def _node(loader: GraphBulkLoader, label: str, **properties) -> None:
+    loader.create_node(graph=GRAPH, label=label, properties=properties)
+
+
+def _drops(loader: GraphBulkLoader, source: str, item: str, **properties) -> None:
+    loader.create_relationship(
+        graph=GRAPH,
+        from_label="Mission",
+        from_match={"name": source},
+        rel_type="DROPS",
+        to_label="Item",
+        to_match={"name": item},
+        rel_props=properties,
+    )
+
+
+def test_vertices_merge_on_label_and_all_properties():
+    loader = GraphBulkLoader()
+    _node(loader, "Item", name="Neurodes", type="Resource")
+    # Same map in another key order: the same vertex
+    loader.create_node(GRAPH, "Item", {"type": "Resource", "name": "Neurodes"})
+    # Same name but another label, or another property: other vertices
+    _node(loader, "Mission", name="Neurodes")
+    _node(loader, "Item", name="Neurodes", type="Blueprint")
+
+    assert loader.pending() == (3, 0)
+
+
+def test_edges_link_every_match_and_merge():
+    loader = GraphBulkLoader()
+    _node(loader, "Mission", name="Earth/Mariana", planet="Earth")
+    _node(loader, "Item", name="Neurodes", type="Resource")
+    _node(loader, "Item", name="Neurodes", type="Blueprint")
+
+    _drops(loader, "Earth/Mariana", "Neurodes", chance="10%")
+    assert loader.pending() == (3, 2)
+
+    # Merging again updates the properties rather than adding edges
+    _drops(loader, "Earth/Mariana", "Neurodes", chance="12.5%", rotation="Rotation A")
+    assert loader.pending() == (3, 2)
+    assert {frozenset(p.items()) for p in loader._edges.values()} == {
+        frozenset({"chance": "12.5%", "rotation": "Rotation A"}.items())
+    }
+
+    # Match maps selecting nothing create nothing
+    _drops(loader, "Earth/Mariana", "Forma")
+    assert loader.pending() == (3, 2)
+
+
+def test_other_graph_is_refused():
+    with pytest.raises(ValueError):
+        GraphBulkLoader().create_node("other", "Item", {"name": "Neurodes"})
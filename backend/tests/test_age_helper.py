@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pytest
+
+from database.static import age_helper
+from database.static.age_helper import (
+    AgeDB,
+    check_cypher_shape,
+    graph_stats_model,
+    graph_stats_refresh_statements,
+    returned_columns,
+)
+from models.age_models import GraphStats
+
+
+class RecordingCursor:
+    def __init__(self, executed: list):
+        self.executed = executed
+        self.description = None
+
+    def execute(self, statement, params=None):
+        self.executed.append(statement)
+
+    def fetchone(self):
+        return {"?column?": 1}
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.executed: list = []
+        self.prepared_statements: OrderedDict = OrderedDict()
+
+    def cursor(self, cursor_factory=None):
+        return RecordingCursor(self.executed)
+
+
+@pytest.fixture
+def age(monkeypatch):
+    monkeypatch.setattr(age_helper, "connect_age", RecordingConnection)
+    age = AgeDB()
+    age.conn.executed.clear()
+    return age
+
+
+@pytest.mark.parametrize(
+    "query, columns",
+    [
+        ("MATCH (n) RETURN n", 1),
+        ("MATCH (n) RETURN DISTINCT n.name, id(n) ORDER BY id(n), n.name", 2),
+        ("MATCH (a)-[r]->(b) RETURN a, r as rel, b LIMIT 5", 3),
+        ("RETURN {a: 1, b: [2, 3]}, 'x, y', coalesce(1, 2)", 3),
+        ("WITH 1 AS a, 2 AS b RETURN a + b", 1),
+        ("MATCH (n) RETURN n.name UNION MATCH (m) RETURN m.name", 1),
+        ("match (n) return n skip 1", 1),
+        ("MATCH (n) DETACH DELETE n", None),
+        ("MATCH (n) RETURN *", None),
+    ],
+)
+def test_returned_columns(query, columns):
+    assert returned_columns(query) == columns
+
+
+def test_shape_checks():
+    check_cypher_shape("MATCH (a), (b) RETURN a, b", "a agtype, b agtype")
+    check_cypher_shape("MERGE (n:Item {name: 'x'})", "_ agtype")
+
+    with pytest.raises(ValueError, match="returns 2 column"):
+        check_cypher_shape("MATCH (a), (b) RETURN a, b", "result agtype")
+    with pytest.raises(ValueError, match="'\\$\\$'"):
+        check_cypher_shape("RETURN '$$'", "n agtype")
+    with pytest.raises(ValueError, match="Invalid column"):
+        check_cypher_shape("RETURN 1", "n text")
+
+
+def test_plain_cypher_is_checked_before_postgres(age):
+    with pytest.raises(ValueError, match="returns 2 column"):
+        age.cypher("loot_tables", "MATCH (a)-[r]->(b) RETURN a, b", "n agtype")
+    with pytest.raises(ValueError):
+        age.cypher("loot_tables", "RETURN 1 $$) AS (n agtype); --", "n agtype")
+    assert age.conn.executed == []
+
+    assert age.cypher("loot_tables", "MATCH (n) RETURN n", "n agtype") == []
+    assert len(age.conn.executed) == 1
+
+
+def test_prepared_cypher_is_checked(age):
+    with pytest.raises(ValueError, match="returns 1 column"):
+        age.cypher("loot_tables", "MATCH (n) RETURN n", "a agtype, b agtype", {})
+    assert age.conn.executed == []
+
+
+def _stats_row(label: str, kind: str, count: int, day: int) -> dict:
+    updated_at = datetime(2024, 5, day, 12, tzinfo=timezone.utc)
+    return {"label": label, "kind": kind, "count": count, "updated_at": updated_at}
+
+
+def test_graph_stats_rows():
+    rows = [
+        _stats_row("Mission", "v", 120, 1),
+        _stats_row("Item", "v", 900, 3),
+        _stats_row("DROPS", "e", 4000, 2),
+        _stats_row("HAS", "e", 35, 1),
+        {"label": "Bounty", "kind": "v", "count": 0, "updated_at": None},
+    ]
+
+    assert graph_stats_model(rows) == GraphStats(
+        totalNodes=1020,
+        totalEdges=4035,
+        nodeTypes={"Mission": 120, "Item": 900, "Bounty": 0},
+        lastUpdated="2024-05-03T12:00:00+00:00",
+    )
+
+
+def test_graph_stats_of_an_empty_table():
+    stats = graph_stats_model([])
+
+    assert stats == GraphStats(totalNodes=0, totalEdges=0, nodeTypes={}, lastUpdated="")
+    # What the stats route takes for never counted, and refreshes
+    assert not stats.lastUpdated
+
+
+def test_graph_stats_refresh_statements():
+    labels = [{"name": "Item", "kind": "v"}, {"name": "DROPS", "kind": "e"}]
+    (delete, _), (insert, params), _ = graph_stats_refresh_statements(
+        "loot_tables", labels
+    )
+
+    assert delete.startswith("DELETE FROM public.graph_stats")
+    assert 'FROM ONLY "loot_tables"."Item"' in insert
+    assert params == ("loot_tables", "Item", "v")
+    assert len(graph_stats_refresh_statements("loot_tables", [])) == 1
@@ -0,0 +1,146 @@
+import random
+import time
+
+import pytest
+
+from database.static.autocomplete import TOP_PER_NODE, AutocompleteIndex, Suggestion
+
+CATALOG_SIZE = 20000
+
+WORDS = [
+    "lith", "meso", "neo", "axi", "prime", "blueprint", "chassis", "systems",
+    "neuroptics", "barrel", "receiver", "stock", "blade", "handle", "riven", "arcane",
+    "energize", "grace", "avenger", "velocity", "serration", "hornet", "strike",
+    "point", "blank", "vitality", "redirection", "streamline", "intensify", "corrupted",
+    "mutalist", "alad", "nitain", "extract", "orokin", "cell", "argon", "crystal",
+    "neural", "sensors", "morphics", "polymer", "plastids", "rubedo", "ferrite",
+    "salvage", "circuits", "gallium", "kuva", "void", "traces", "forma", "catalyst",
+    "reactor", "vandal", "wraith", "survival", "defense", "excavation", "capture",
+    "earth", "venus", "mercury", "mars", "phobos", "ceres", "jupiter", "europa",
+    "saturn", "uranus", "neptune", "pluto", "sedna", "eris", "deimos", "zariman",
+    "grineer", "corpus", "infested", "lancer", "trooper", "butcher", "ballista",
+]
+SYLLABLES = [
+    "ka", "ro", "vi", "nex", "tor", "lu", "mi", "sa", "zen", "qua", "dri", "fel", "gor",
+    "hy", "is", "jax", "ko", "lem", "mor", "nu", "ox", "pra", "ri", "sun", "tal", "ur",
+    "vex", "wyn", "xo", "yr", "zu", "ash", "ber", "cy", "do", "el", "fa", "gi", "ho",
+]
+KINDS = ["item", "mod", "weapon", "relic", "mission", "enemy"]
+
+
+def _catalog(size: int) -> list:
+    """Names shaped like the drop tables': a few words, sometimes a relic-like code."""
+    rng = random.Random(7)
+    words = WORDS + [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(3000)
+    ]
+    names = {}
+    while len(names) < size:
+        name = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.3:
+            name += f" {rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ')}{rng.randint(1, 20)}"
+        names.setdefault(name.title(), None)
+    return [
+        Suggestion(name, rng.choice(KINDS), rng.randint(0, 500)) for name in names
+    ]
+
+
+@pytest.fixture(scope="module")
+def index() -> AutocompleteIndex:
+    return AutocompleteIndex("test", _catalog(CATALOG_SIZE))
+
+
+def test_rare_kind_behind_popular_names():
+    suggestions = [Suggestion(f"Lith Thing {i}", "item", 1000 - i) for i in range(40)]
+    suggestions.append(Suggestion("Lith A1", "relic", 0))
+    index = AutocompleteIndex("test", suggestions)
+
+    assert [s.name for s, _ in index.complete("lith", 10, "relic")] == ["Lith A1"]
+    assert [s.name for s, _ in index.complete("lth", 10, "relic")] == ["Lith A1"]
+
+
+def test_typos_are_ranked_after_exact_prefixes():
+    index = AutocompleteIndex(
+        "test",
+        [
+            Suggestion("Serration", "mod", 10),
+            Suggestion("Seraph", "weapon", 50),
+            Suggestion("Vitality", "mod", 5),
+        ],
+    )
+
+    assert [(s.name, d) for s, d in index.complete("sera", 10)] == [
+        ("Seraph", 0),
+        ("Serration", 1),
+    ]
+    assert [(s.name, d) for s, d in index.complete("seration", 10)] == [
+        ("Serration", 1)
+    ]
+    # Adjacent transposition counts as one typo
+    assert [(s.name, d) for s, d in index.complete("vitaltiy", 10)] == [
+        ("Vitality", 1)
+    ]
+    assert index.complete("qwertyuiop", 10) == []
+
+
+def test_limit_beyond_a_node_ranking():
+    suggestions = [Suggestion(f"Lith Part {i}", "item", 1000 - i) for i in range(60)]
+    # One typo away from "lith": must not take the place of an exact completion
+    suggestions.append(Suggestion("Loth Famous", "item", 5000))
+    index = AutocompleteIndex("test", suggestions)
+
+    results = index.complete("lith", 50)
+    assert len(results) == TOP_PER_NODE
+    assert [s.name for s, _ in results] == [
+        f"Lith Part {i}" for i in range(TOP_PER_NODE)
+    ]
+    assert {distance for _, distance in results} == {0}
+
+    # Fewer exact completions than the limit: typo matches only come after them
+    results = index.complete("lith part 5", 50)
+    assert [s.name for s, _ in results][:11] == ["Lith Part 5"] + [
+        f"Lith Part {i}" for i in range(50, 60)
+    ]
+
+
+@pytest.mark.parametrize("query", ["lith", "neo", "prime", "neurptics", "seration"])
+def test_closest_then_most_popular(index, query):
+    results = index.complete(query, TOP_PER_NODE)
+    ranks = [(distance, -s.popularity) for s, distance in results]
+    assert results and ranks == sorted(ranks)
+
+
+def test_kind_filter(index):
+    for kind in KINDS:
+        results = index.complete("a", TOP_PER_NODE, kind)
+        assert results and {s.kind for s, _ in results} == {kind}
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize(
+    "query",
+    [
+        "lith",
+        "lihtx",
+        "abcdefg",
+        "qwertyuiop",
+        "seration",
+        "vitalty",
+        "neurptics bluep",
+    ],
+)
+@pytest.mark.parametrize("kind", [None, "relic"])
+def test_latency(index, query, kind):
+    index.complete(query, 10, kind)
+    runs = 20
+    best = min(
+        _timed(lambda: index.complete(query, 10, kind)) for _ in range(runs)
+    )
+    assert best < 0.001, f"{query!r} took {best * 1000:.2f} ms"
+
+
+def _timed(call) -> float:
+    started = time.perf_counter()
+    call()
+    return time.perf_counter() - started
@@ -0,0 +1,106 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database.dynamic import crud
+from database.dynamic.auth import create_token
+from database.dynamic.crud import (
+    decode_build_cursor,
+    encode_build_cursor,
+    get_user_builds,
+)
+from routers import builds
+
+from fakes import FakeCollection
+
+CREATED_AT = datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def _encoded(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+class _Database:
+    def __init__(self, documents):
+        self.builds = FakeCollection(documents)
+
+
+@pytest.fixture
+def user_builds(monkeypatch):
+    # Three builds saved in the same instant, between an older and a newer one
+    documents = [
+        {
+            "_id": ObjectId(),
+            "user_id": "user-1",
+            "name": f"Build {i}",
+            "warframe_uniqueName": "Excalibur",
+            "created_at": CREATED_AT + timedelta(minutes=minutes),
+            "updated_at": CREATED_AT,
+        }
+        for i, minutes in enumerate([-5, 0, 0, 0, 5])
+    ]
+    documents.append({**documents[0], "_id": ObjectId(), "user_id": "user-2"})
+    monkeypatch.setattr(crud, "db_manager", _Database(documents))
+    return documents
+
+
+def test_round_trip():
+    build = {"_id": ObjectId(), "created_at": CREATED_AT}
+    cursor = encode_build_cursor(build)
+
+    assert "=" not in cursor
+    assert decode_build_cursor(cursor) == (CREATED_AT, build["_id"])
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not a cursor!",
+        "e30",
+        _encoded([]),
+        _encoded({"created_at": CREATED_AT.isoformat()}),
+        _encoded({"created_at": "yesterday", "id": str(ObjectId())}),
+        _encoded({"created_at": CREATED_AT.isoformat(), "id": "42"}),
+        _encoded({"created_at": 1, "id": str(ObjectId())}),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    ],
+)
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_build_cursor(cursor)
+
+
+def test_tampered_cursor_is_a_bad_request(user_builds):
+    cursor = encode_build_cursor(user_builds[1])
+    app = FastAPI()
+    app.include_router(builds.router)
+    client = TestClient(app, cookies={"access_token": create_token({"sub": "user-1"})})
+
+    for tampered in (cursor[:-3], cursor[1:], "!" + cursor, cursor[:10]):
+        response = client.get("/api/builds", params={"cursor": tampered})
+        assert response.status_code == 400, tampered
+        assert response.json()["detail"] == "Invalid cursor"
+
+    assert client.get("/api/builds", params={"cursor": cursor}).status_code == 200
+
+
+def test_ties_on_created_at_are_broken_by_id(user_builds):
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = asyncio.run(get_user_builds("user-1", cursor, limit=2))
+        seen += page
+        if cursor is None:
+            break
+
+    expected = sorted(
+        user_builds[:5], key=lambda b: (b["created_at"], b["_id"]), reverse=True
+    )
+    assert [b["_id"] for b in seen] == [b["_id"] for b in expected]
@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database.dynamic import crud
+from database.static.catalog import CATALOG_VERSION_ID, META_COLLECTION, build_payload
+from routers import builds
+from routers.builds import accepts_gzip
+
+from fakes import fake_repository
+
+WARFRAMES = [{"uniqueName": "Excalibur", "name": "Excalibur", "masteryReq": 0}]
+
+
+@pytest.fixture
+def payload():
+    return build_payload(WARFRAMES)
+
+
+@pytest.fixture
+def client(monkeypatch, payload):
+    async def get_available_warframes():
+        return payload
+
+    monkeypatch.setattr(builds, "get_available_warframes", get_available_warframes)
+    app = FastAPI()
+    app.include_router(builds.router)
+    return TestClient(app)
+
+
+def _get(client, **headers):
+    return client.get("/api/builds/available/warframes", headers=headers)
+
+
+def test_identity_response(client, payload):
+    response = _get(client, **{"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.json() == WARFRAMES
+    assert response.headers["ETag"] == payload.etag
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert "Content-Encoding" not in response.headers
+
+
+def test_gzip_response_has_its_own_etag(client, payload):
+    response = _get(client, **{"Accept-Encoding": "gzip, deflate"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == payload.etag[:-1] + '-gzip"'
+    assert response.headers["ETag"] != payload.etag
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert gzip.decompress(payload.gzip_body) == payload.body
+    assert response.json() == WARFRAMES
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip"])
+@pytest.mark.parametrize("variant", ["identity", "gzip"])
+def test_matching_etag_is_not_modified(client, payload, encoding, variant):
+    etag = payload.etag if variant == "identity" else payload.etag[:-1] + '-gzip"'
+    for if_none_match in (etag, f'"other", W/{etag}', "*"):
+        response = _get(
+            client, **{"Accept-Encoding": encoding, "If-None-Match": if_none_match}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["Vary"] == "Accept-Encoding"
+
+
+def test_other_etag_is_served(client):
+    response = _get(client, **{"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("GZIP ; Q=1", True),
+        ("*", True),
+        ("", False),
+        ("identity", False),
+        ("gzip;q=0", False),
+        ("gzip;q=0.0, deflate", False),
+        ("*;q=0", False),
+        ("gzip;q=0, *", False),
+        ("*, gzip;q=0", False),
+        ("br, *;q=0.1", True),
+        ("gzip;q=nonsense", False),
+    ],
+)
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def test_refused_gzip_is_served_uncompressed(client, payload):
+    response = _get(client, **{"Accept-Encoding": "gzip;q=0, identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.headers["ETag"] == payload.etag
+
+
+def test_gzip_is_compressed_once(payload, monkeypatch):
+    calls = []
+    compress = gzip.compress
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return compress(*args, **kwargs)
+
+    monkeypatch.setattr(gzip, "compress", counted)
+
+    assert payload.gzip_body is payload.gzip_body
+    assert len(calls) == 1
+
+
+def test_payload_is_built_once_per_catalog_version(monkeypatch):
+    meta = {"_id": CATALOG_VERSION_ID, "version": "v1"}
+    repository = fake_repository({META_COLLECTION: [meta], "warframes": WARFRAMES})
+    monkeypatch.setattr(crud, "get_static_repository", lambda: repository)
+    monkeypatch.setattr(crud, "_available_payloads", {})
+
+    first = asyncio.run(crud.get_available_warframes())
+    assert asyncio.run(crud.get_available_warframes()) is first
+
+    meta["version"] = "v2"
+    second = asyncio.run(crud.get_available_warframes())
+    assert second is not first
+    assert second.etag == first.etag
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from database.static.db_init.init_loot_tables import make_drop
+from database.static.drop_index import DROPS_COLLECTION, DropEntry, DropIndex
+from routers.loottables import _neighbors_from_database, _neighbors_from_index
+
+from fakes import fake_repository
+
+SPECTER = "Ancient Healer Specter"
+DROPS = [
+    {"_id": ObjectId(), **drop}
+    for drop in (
+        make_drop(SPECTER, "Ceres/Gabii", "mission", "5%", "Rotation B"),
+        make_drop(SPECTER, "Lua/Plato", "mission", "10%", "Rotation A"),
+        make_drop("Morphics", "Ancient Healer", "enemy", "3%"),
+        make_drop("Neurodes", "Ancient Healer", "enemy", "8%"),
+        make_drop("Orokin Cell", "Ancient Healer", "enemy", "1%"),
+        make_drop("Argon Crystal", "Void/Mot", "mission", "2%", "Rotation C"),
+        make_drop("Argon Crystal", "Void/Mot", "mission", "4%", "Rotation A"),
+        make_drop("Argon Scope", "Void/Ani", "mission", "1%", "Rotation A"),
+    )
+]
+
+
+def _entry(drop: dict) -> DropEntry:
+    return DropEntry(
+        item=drop["item"],
+        source=drop["source"],
+        source_type=drop["source_type"],
+        source_id=str(drop["_id"]),
+        chance=drop["chance"],
+        rotation=drop["rotation"],
+    )
+
+
+@pytest.fixture(scope="module")
+def drop_index() -> DropIndex:
+    return DropIndex("v1", [_entry(drop) for drop in DROPS])
+
+
+def _resolved(drop_index, name):
+    match = drop_index.resolve(name)
+    if match is None:
+        return None
+    kind, entries = match
+    return kind, [entry.item if kind == "source" else entry.source for entry in entries]
+
+
+def test_exact_source_beats_partial_item(drop_index):
+    assert _resolved(drop_index, "Ancient Healer") == (
+        "source",
+        ["Neurodes", "Morphics", "Orokin Cell"],
+    )
+
+
+def test_exact_item_comes_first(drop_index):
+    assert _resolved(drop_index, "ancient healer specter") == (
+        "item",
+        ["Lua/Plato", "Ceres/Gabii"],
+    )
+
+
+def test_partial_item_beats_partial_source(drop_index):
+    # "Argon Scope" is shorter than "Argon Crystal"; prefixes before substrings
+    assert _resolved(drop_index, "argon")[1] == ["Void/Ani"]
+    assert _resolved(drop_index, "crys") == ("item", ["Void/Mot", "Void/Mot"])
+    assert _resolved(drop_index, "healer spec")[0] == "item"
+    assert _resolved(drop_index, "gabii") == ("source", [SPECTER])
+
+
+def test_short_names_only_match_prefixes(drop_index):
+    assert _resolved(drop_index, "ar")[0] == "item"
+    assert drop_index.resolve("on") is None
+    assert drop_index.resolve("") is None
+    assert drop_index.resolve("zzz") is None
+
+
+def test_source_items_are_sorted_by_rotation_then_chance(drop_index):
+    kind, entries = drop_index.resolve("Void/Mot")
+    assert [(e.rotation, e.chance) for e in entries] == [("A", 4.0), ("C", 2.0)]
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["Ancient Healer", "ancient healer specter", "argon", "crys", "gabii", "ar", "mot"],
+)
+def test_database_resolves_like_the_index(drop_index, name):
+    repository = fake_repository({DROPS_COLLECTION: DROPS})
+    from_database = asyncio.run(_neighbors_from_database(repository, name))
+    from_index = _neighbors_from_index(drop_index, name)
+
+    assert from_database is not None
+    assert from_database.model_dump() == from_index.model_dump()
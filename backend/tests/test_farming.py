@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from database.static import farming
+from database.static.catalog import META_COLLECTION
+from database.static.db_init.init_loot_tables import make_drop
+from database.static.drop_index import DROP_TABLES_VERSION_ID, DROPS_COLLECTION
+from database.static.farming import FarmingCache, best_farming_sources
+
+from fakes import aggregate, fake_repository
+
+DROPS = [
+    {"_id": ObjectId(), **drop}
+    for drop in (
+        make_drop("Neurodes", "Earth/Mariana", "mission", "10%", "Rotation A"),
+        make_drop("Neurodes", "Earth/Tikal", "mission", "20%", "Rotation C"),
+        make_drop("Neurodes", "Earth/Cetus Bounty", "bounty", "10%", "Rotation A"),
+        make_drop("Neurodes", "Sortie", "sortie", "4%"),
+        make_drop("Neurodes", "Lancer", "general_drop", "50%", source_chance=8.0),
+        make_drop("Neurodes", "Earth/Everest", "auxiliary_mission", "2%", "Rotation B"),
+        make_drop("Neurodes", "Nowhere", "mission", "0%", "Rotation A"),
+        make_drop("Neurodes Prime", "Lith N1", "relic", "25%"),
+        make_drop("Neurodes Prime Blueprint", "Lith N2", "relic", "2%"),
+    )
+]
+
+
+def test_ranking():
+    sources = aggregate(DROPS, farming.farming_pipeline("Neurodes", 10))
+
+    assert [
+        (s["source"], s["rotation_weight"], s["probability"], s["expected_runs"])
+        for s in sources
+    ] == [
+        # Bounty rotations are not part of the A, A, B, C cycle
+        ("Earth/Cetus Bounty", 1, pytest.approx(0.1), pytest.approx(10)),
+        ("Earth/Mariana", 0.5, pytest.approx(0.05), pytest.approx(20)),
+        ("Earth/Tikal", 0.25, pytest.approx(0.05), pytest.approx(20)),
+        ("Lancer", 1, pytest.approx(0.04), pytest.approx(25)),
+        ("Sortie", 1, pytest.approx(0.04), pytest.approx(25)),
+        ("Earth/Everest", 0.25, pytest.approx(0.005), pytest.approx(200)),
+    ]
+    assert aggregate(DROPS, farming.farming_pipeline("Neurodes", 2))[1]["source"] == (
+        "Earth/Mariana"
+    )
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    monkeypatch.setattr(farming, "farming_cache", FarmingCache())
+    meta = {"_id": DROP_TABLES_VERSION_ID, "version": "v1"}
+    return fake_repository({DROPS_COLLECTION: list(DROPS), META_COLLECTION: [meta]})
+
+
+def _best(repository, name, limit=20):
+    return asyncio.run(best_farming_sources(repository, name, limit))
+
+
+def test_exact_name_then_shortest_match(repository):
+    assert _best(repository, "neurodes prime")[1] == "Neurodes Prime"
+    assert _best(repository, "Neurodes")[1] == "Neurodes"
+    assert _best(repository, "odes prime")[1] == "Neurodes Prime"
+    assert _best(repository, "prime blue")[1] == "Neurodes Prime Blueprint"
+    assert _best(repository, "argon") == ("v1", None, [])
+
+
+def test_rankings_are_cached_per_version(repository):
+    version, item, sources = _best(repository, "Neurodes")
+    assert version == "v1" and len(sources) == 6
+
+    drops = repository.db[DROPS_COLLECTION].documents
+    drops.clear()
+    assert _best(repository, "neurodes") == (version, item, sources)
+
+    repository.db[META_COLLECTION].documents[0]["version"] = "v2"
+    assert _best(repository, "neurodes") == ("v2", None, [])
+
+
+def test_cache_evicts_the_least_recently_used():
+    cache = FarmingCache(max_size=2)
+    cache.put("v1", ("a", 20), ("A", []))
+    cache.put("v1", ("b", 20), ("B", []))
+    assert cache.get("v1", ("a", 20)) == ("A", [])
+
+    cache.put("v1", ("c", 20), ("C", []))
+    assert cache.get("v1", ("b", 20)) is None
+    assert cache.get("v1", ("a", 20)) == ("A", [])
+    assert cache.get("v1", ("c", 20)) == ("C", [])
+
+
+def test_cache_is_dropped_on_a_new_version():
+    cache = FarmingCache()
+    cache.put("v1", ("a", 20), ("A", []))
+    assert cache.get("v2", ("a", 20)) is None
+
+    cache.put("v2", ("b", 20), ("B", []))
+    assert cache.get("v1", ("a", 20)) is None
+    assert cache.get("v2", ("a", 20)) is None
+    assert cache.get("v2", ("b", 20)) == ("B", [])
+
+
+def test_rotation_weight():
+    assert farming.rotation_weight("mission", "A") == 0.5
+    assert farming.rotation_weight("auxiliary_mission", "C") == 0.25
+    assert farming.rotation_weight("mission", None) == 1
+    assert farming.rotation_weight("bounty", "A") == 1
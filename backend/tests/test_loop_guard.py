@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+import pytest
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from pymongo.monitoring import CommandStartedEvent
+
+from database.loop_guard import (
+    BlockingCallDetector,
+    BlockingCallError,
+    blocking_call_detector,
+)
+
+
+def _find_event() -> CommandStartedEvent:
+    return CommandStartedEvent(
+        {"find": "builds"}, "cephalon_onni", 1, ("localhost", 27017), 1
+    )
+
+
+async def _on_loop(call):
+    return call()
+
+
+def test_guard_raises_under_tests():
+    assert blocking_call_detector.mode == "raise"
+
+
+def test_sync_call_on_event_loop_raises():
+    detector = BlockingCallDetector(mode="raise")
+    with pytest.raises(BlockingCallError):
+        asyncio.run(_on_loop(lambda: detector.check("find")))
+    assert detector.violations == 1
+
+
+def test_sync_command_on_event_loop_is_counted():
+    detector = BlockingCallDetector(mode="warn")
+    asyncio.run(_on_loop(lambda: detector.started(_find_event())))
+    assert detector.violations == 1
+
+
+def test_sync_command_off_event_loop_is_allowed():
+    detector = BlockingCallDetector(mode="raise")
+    detector.check("find")
+    detector.started(_find_event())
+    assert detector.violations == 0
+
+
+def test_guard_off():
+    detector = BlockingCallDetector(mode="off")
+    asyncio.run(_on_loop(lambda: detector.check("find")))
+    assert detector.violations == 0
+
+
+def test_pymongo_command_on_event_loop_is_counted():
+    detector = BlockingCallDetector(mode="raise")
+    client = MongoClient(
+        os.getenv("MONGO_URL", "mongodb://localhost:27017"),
+        serverSelectionTimeoutMS=500,
+        event_listeners=[detector],
+    )
+    try:
+        try:
+            client.admin.command("ping")
+        except PyMongoError:
+            pytest.skip("No MongoDB server to run commands against")
+        assert detector.violations == 0
+
+        asyncio.run(_on_loop(lambda: client.admin.command("ping")))
+        assert detector.violations == 1
+    finally:
+        client.close()
@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from database.static import relic_ev
+from database.static.db_init.init_loot_tables import make_drop
+from database.static.drop_index import DROPS_COLLECTION
+from database.static.relic_ev import (
+    REFINEMENTS,
+    RELIC_EV_COLLECTION,
+    compute_relic_ev,
+    relic_ev_query,
+    reward_chances,
+)
+
+from fakes import fake_client
+
+COMMON, UNCOMMON, RARE = range(3)
+
+
+def _reward(name: str, rarity: str) -> dict:
+    return {"rewardName": f"/Lotus/StoreItems/Types/{name}", "rarity": rarity}
+
+
+LITH_A1 = {
+    "uniqueName": "/Lotus/Types/Game/Projections/T1VoidProjectionA1",
+    "name": "Lith A1 Intact",
+    "relicRewards": [
+        _reward("AshPrimeBlueprint", "COMMON"),
+        _reward("BoPrimeHandle", "COMMON"),
+        _reward("FormaBlueprint", "COMMON"),
+        _reward("AshPrimeChassis", "UNCOMMON"),
+        _reward("LexPrimeBarrel", "UNCOMMON"),
+        _reward("AshPrimeSystems", "RARE"),
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "rarities",
+    [
+        [COMMON] * 3 + [UNCOMMON] * 2 + [RARE],
+        [COMMON] * 3 + [UNCOMMON] * 2,
+        [COMMON, COMMON],
+        [RARE],
+    ],
+)
+def test_chances_of_a_relic_sum_to_one(rarities):
+    chances = reward_chances(np.zeros(len(rarities), dtype=int), np.array(rarities), 1)
+
+    assert chances.shape == (len(REFINEMENTS), len(rarities))
+    assert chances.sum(axis=1) == pytest.approx(np.ones(len(REFINEMENTS)))
+
+
+def test_chances_of_several_relics():
+    relics = np.array([0, 0, 0, 0, 0, 0, 1, 1])
+    rarities = np.array([0, 0, 0, 1, 1, 2, 0, 0])
+    chances = reward_chances(relics, rarities, 2)
+
+    assert chances[:, :6].sum(axis=1) == pytest.approx(np.ones(len(REFINEMENTS)))
+    # Two commons only: they share the whole table
+    assert chances[:, 6:] == pytest.approx(np.full((len(REFINEMENTS), 2), 0.5))
+
+
+def test_standard_relic_by_hand():
+    chances = reward_chances(np.zeros(6, dtype=int), np.array([0, 0, 0, 1, 1, 2]), 1)
+
+    # Intact: 3 x 25.33% + 2 x 11% + 2% = 99.99%, renormalized
+    assert chances[0, COMMON] == pytest.approx(25.33 / 99.99)
+    assert chances[0, 3] == pytest.approx(11 / 99.99)
+    assert chances[0, 5] == pytest.approx(2 / 99.99)
+    # Radiant: 3 x 16.67% + 2 x 20% + 10% = 100.01%
+    assert chances[3, 5] == pytest.approx(10 / 100.01)
+
+
+def test_relic_ev_documents(monkeypatch):
+    # Keep the replaced documents themselves as the bulk write requests
+    monkeypatch.setattr(relic_ev, "ReplaceOne", lambda query, doc, upsert: doc)
+    client = fake_client(
+        {
+            "relics": [LITH_A1, {**LITH_A1, "name": "Lith A1 Radiant"}],
+            "warframes": [
+                {
+                    "uniqueName": "/Lotus/Types/AshPrimeSystems",
+                    "name": "Ash Prime Systems",
+                }
+            ],
+            DROPS_COLLECTION: [
+                make_drop("Lith A1 Relic", "Void/Hepit", "mission", "10%", "Rotation C"),
+                make_drop("Lith A1 Relic", "Cetus Bounty", "bounty", "5%", "Rotation A"),
+            ],
+        }
+    )
+
+    assert compute_relic_ev(client) == 1
+    (doc,) = client["cephalon_onni"][RELIC_EV_COLLECTION].written
+
+    assert doc["relic"] == "Lith A1"
+    assert doc["era"] == "Lith"
+    # Mission rotation C: 10% x 0.25 -> 40 runs; bounty rotation A: 5% -> 20 runs
+    assert doc["best_source"]["source"] == "Cetus Bounty"
+    assert doc["best_source"]["expected_runs"] == pytest.approx(20)
+
+    rare = doc["refinements"]["Intact"][5]
+    assert rare["reward"] == "Ash Prime Systems"
+    assert rare["rarity"] == "RARE"
+    assert rare["probability"] == pytest.approx(2 / 99.99)
+    assert rare["expected_openings"] == pytest.approx(99.99 / 2)
+    assert rare["expected_farm_runs"] == pytest.approx(20 * 99.99 / 2)
+    assert doc["refinements"]["Intact"][0]["reward"] == "AshPrimeBlueprint"
+
+    for refinement in REFINEMENTS:
+        rewards = doc["refinements"][refinement]
+        assert sum(r["probability"] for r in rewards) == pytest.approx(1)
+    assert relic_ev_query("Lith A1 Relic", None) == {"search_key": "lith a1"}
+    assert relic_ev_query(None, "Ash Prime Systems") == {
+        "reward_keys": "ash prime systems"
+    }
+    assert "ash prime systems" in doc["reward_keys"]
@@ -0,0 +1,70 @@
+import pytest
+
+from database.static.search import (
+    normalize_search_key,
+    search_fields,
+    search_filter,
+    search_grams,
+)
+
+from fakes import matches
+
+
+@pytest.mark.parametrize(
+    "text, key",
+    [
+        ("Lith A1 Relic", "lith a1 relic"),
+        ("  Ash  Prime\t", "ash prime"),
+        ("Ash/Prime (Blueprint)", "ash prime blueprint"),
+        ("Kuva Bramma's Barrel", "kuva bramma s barrel"),
+        ("Éxcalibur Prímé", "excalibur prime"),
+        ("Ｆｕｌｌ Ｗｉｄｔｈ", "full width"),
+        ("Straße", "strasse"),
+        ("...", ""),
+        ("", ""),
+        (None, ""),
+    ],
+)
+def test_normalize_search_key(text, key):
+    assert normalize_search_key(text) == key
+
+
+def test_search_grams():
+    assert search_grams("Ash!") == ["ash"]
+    assert search_grams("Ember") == ["ber", "emb", "mbe"]
+    # Repeated grams are stored once
+    assert search_grams("aaaa") == ["aaa"]
+    # Shorter than a gram: the key itself
+    assert search_grams("A1") == ["a1"]
+    assert search_grams("?") == []
+
+
+def test_short_queries_are_prefix_matches():
+    assert search_filter("a") == {"search_key": {"$regex": "^a"}}
+    assert search_filter("Li", "source_") == {"source_search_key": {"$regex": "^li"}}
+    assert search_filter(" -- ") == {}
+
+
+def test_filter_escapes_the_query():
+    query = search_filter("Ash (Prime)")
+    assert query["search_grams"] == {"$all": search_grams("ash prime")}
+    assert query["search_key"] == {"$regex": r"ash\ prime"}
+
+
+@pytest.mark.parametrize(
+    "query, found",
+    [
+        ("lith", True),
+        ("LITH a1", True),
+        ("a1 rel", True),
+        ("Relic", True),
+        ("li", True),
+        ("th", False),
+        ("lith a2", False),
+        ("lith  relic", False),
+        ("lïth-a1", True),
+    ],
+)
+def test_filter_matches_stored_fields(query, found):
+    document = {"item": "Lith A1 Relic", **search_fields("Lith A1 Relic")}
+    assert matches(document, search_filter(query)) is found
@@ -0,0 +1,83 @@
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database.db import db_manager
+from database.loop_guard import BlockingCallError, blocking_call_detector
+from database.static.db_init.init_loot_tables import make_drop
+from database.static.drop_index import DROPS_COLLECTION
+from database.static.repository import get_static_repository
+from routers import loottables, warframes
+
+from fakes import fake_repository
+
+DROPS = [
+    {"_id": ObjectId(), **drop}
+    for drop in (
+        make_drop("Neurodes", "Earth/Mariana", "mission", "12.5%", "Rotation A"),
+        make_drop("Neurodes", "Eximus", "enemy", "1.5%"),
+        make_drop("Neural Sensors", "Jupiter/Io", "mission", "10%", "Rotation C"),
+    )
+]
+WARFRAMES = [
+    {"_id": ObjectId(), "uniqueName": "Excalibur", "name": "Excalibur"},
+    {"_id": ObjectId(), "uniqueName": "Mag", "name": "Mag"},
+]
+
+
+@pytest.fixture
+def client():
+    repository = fake_repository({DROPS_COLLECTION: DROPS, "warframes": WARFRAMES})
+
+    app = FastAPI()
+    app.include_router(loottables.router)
+    app.include_router(warframes.router)
+    app.dependency_overrides[get_static_repository] = lambda: repository
+
+    @app.get("/sync")
+    async def sync_read():
+        return db_manager.sync_db["warframes"].find_one()
+
+    with TestClient(app) as client:
+        yield client
+
+
+def test_sync_client_is_refused_on_the_event_loop(client):
+    assert blocking_call_detector.mode == "raise"
+    with pytest.raises(BlockingCallError):
+        client.get("/sync")
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/warframes/",
+        "/api/warframes/Mag",
+        "/api/loottables/neighbors?name=Neurodes",
+        "/api/loottables/search/nodes?name=neur",
+        "/api/loottables/autocomplete?q=neur",
+    ],
+)
+def test_static_reads_use_the_async_repository(client, url):
+    violations = blocking_call_detector.violations
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    assert blocking_call_detector.violations == violations
+
+
+def test_static_read_results(client):
+    assert [w["name"] for w in client.get("/api/warframes/").json()] == [
+        "Excalibur",
+        "Mag",
+    ]
+
+    neighbors = client.get("/api/loottables/neighbors?name=neurodes").json()
+    assert neighbors["starting_node"]["name"] == "Neurodes"
+    assert [n["name"] for n in neighbors["neighbors"]] == [
+        "Earth/Mariana",
+        "Eximus",
+    ]
+
+    names = client.get("/api/loottables/autocomplete?q=neur").json()["suggestions"]
+    assert [s["name"] for s in names] == ["Neurodes", "Neural Sensors"]
@@ -118,6 +118,11 @@ export interface BuildPublic {
   isLocal?: boolean;
 }
 
+export interface BuildPage {
+  builds: BuildPublic[];
+  next_cursor?: string | null;
+}
+
 export interface BuildWithDetails {
   id: string;
   name: string;
@@ -273,17 +278,28 @@ export function useBuilds() {
     try {
       const isAuth = await checkAuthStatus();
       if (isAuth) {
-        const response = await fetch("/api/builds?include_details=true", {
-          credentials: "include",
-        });
-        console.log("Fetch builds URL:", "/api/builds?include_details=true");
-        console.log("Fetch builds response status:", response.status);
+        // The list is paginated: follow next_cursor until the last page
+        const fetchedBuilds: BuildPublic[] = [];
+        let cursor: string | null = null;
+        do {
+          const params = new URLSearchParams({ include_details: "true" });
+          if (cursor) params.set("cursor", cursor);
+
+          const response = await fetch(`/api/builds?${params}`, {
+            credentials: "include",
+          });
+          console.log("Fetch builds response status:", response.status);
 
-        if (!response.ok) {
-          throw new Error("Failed to fetch builds");
-        }
+          if (!response.ok) {
+            throw new Error("Failed to fetch builds");
+          }
+
+          const page: BuildPage = await response.json();
+          fetchedBuilds.push(...page.builds);
+          cursor = page.next_cursor ?? null;
+        } while (cursor);
 
-        builds.value = await response.json();
+        builds.value = fetchedBuilds;
       } else {
         // Clear remote builds if not authenticated
         builds.value = [];